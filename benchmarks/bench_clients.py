@@ -0,0 +1,90 @@
+'''bench_clients.py counts how many Sheets clients and HTTP connections each menu operation creates.
+
+It runs every menu operation against the real googleapiclient stack, but the
+HTTP layer (httplib2.Http.request) is replaced with canned responses so no
+network access or Google account is needed.
+
+Run with:
+    PYTHONPATH=src python benchmarks/bench_clients.py
+'''
+import builtins
+import json
+import time
+from unittest.mock import patch
+
+import httplib2
+from google.oauth2.credentials import Credentials
+
+from package_lab13 import google_sheets, row_cache, sheets_client
+from package_lab13.ratelimit import configure_rate_limits
+
+SHEET_ROWS = [["Drink water", "2025-04-23T14:37", "2025-05-01T14:30", "❌", ""]]
+
+'''fake_response returns a plausible Sheets API response for the request URI.'''
+def fake_response(uri, method):
+    if "/values/" in uri and method == "GET":
+        body = {"values": SHEET_ROWS}
+    elif method == "GET":
+        body = {"sheets": [{"properties": {"title": "Habit Tracker", "sheetId": 0}}]}
+    elif method == "POST" and uri.split("?")[0].endswith("/spreadsheets"):
+        body = {"spreadsheetId": "bench", "sheets": [{"properties": {"sheetId": 0}}]}
+    else:
+        body = {}
+    return httplib2.Response({"status": "200", "content-type": "application/json"}), json.dumps(body).encode()
+
+'''run_operation runs one menu operation and returns (clients built, connections opened, seconds).'''
+def run_operation(creds, func, inputs):
+    transports = set()
+
+    def fake_request(self, uri, method="GET", body=None, headers=None, *args, **kwargs):
+        # every distinct httplib2.Http object would open its own keep-alive connection
+        transports.add(id(self))
+        return fake_response(uri, method)
+
+    answers = iter(inputs)
+    before = sheets_client.client_stats["builds"]
+    with patch.object(httplib2.Http, "request", fake_request), \
+         patch.object(builtins, "input", lambda _="": next(answers)), \
+         patch.object(builtins, "print", lambda *a, **k: None):
+        start = time.perf_counter()
+        func(creds)
+        elapsed = time.perf_counter() - start
+    return sheets_client.client_stats["builds"] - before, len(transports), elapsed
+
+OPERATIONS = [
+    ("create_sheet", lambda creds: google_sheets.create_sheet(creds, "Bench"), []),
+    ("add_habit", lambda creds: google_sheets.add_habit(creds, "bench", "Stretch"), ["2025-05-01", "02:30 PM"]),
+    ("edit_habit", lambda creds: google_sheets.edit_habit(creds, "bench"), ["1", "Drink tea", "2025-05-01", "02:30 PM", "y"]),
+    ("mark_habit_complete", lambda creds: google_sheets.mark_habit_complete(creds, "bench"), ["1"]),
+    ("delete_habit", lambda creds: google_sheets.delete_habit(creds, "bench"), ["1"]),
+    ("show_habits", lambda creds: google_sheets.show_habits(creds, "bench"), []),
+]
+
+'''bench runs every operation with client sharing on or off and returns the results per operation.'''
+def bench(share_clients):
+    row_cache.ENABLED = False  # every operation does its own reads, as it would on a cold cache
+    sheets_client.SHARE_CLIENTS = share_clients
+    sheets_client.reset_clients()
+    creds = Credentials(token="benchmark-token")
+    results = {}
+    for name, func, inputs in OPERATIONS:
+        # the first call in a shared process pays for the build; measure a warm call
+        run_operation(creds, func, inputs)
+        results[name] = run_operation(creds, func, inputs)
+    return results
+
+def main():
+    configure_rate_limits()  # measure the operations, not the client-side quota pacing
+    before = bench(share_clients=False)
+    after = bench(share_clients=True)
+    sheets_client.SHARE_CLIENTS = True
+
+    print(f"{'operation':<22}{'clients (before/after)':>24}{'connections (before/after)':>30}{'ms (before/after)':>22}")
+    for name in before:
+        b_clients, b_conns, b_time = before[name]
+        a_clients, a_conns, a_time = after[name]
+        print(f"{name:<22}{f'{b_clients} / {a_clients}':>24}{f'{b_conns} / {a_conns}':>30}"
+              f"{f'{b_time * 1000:.1f} / {a_time * 1000:.1f}':>22}")
+
+if __name__ == "__main__":
+    main()
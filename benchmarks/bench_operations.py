@@ -0,0 +1,151 @@
+'''bench_operations measures what each habit operation costs against the local fake Sheets server.
+
+For every sheet size and operation it records the number of API requests, request and
+response bytes, wall time and peak Python memory, and writes everything to a JSON file
+so results from two releases can be compared. The fake server runs in the same
+process, so its JSON encoding is included in the time and memory figures; request
+counts and bytes are exactly what would go over the wire.
+
+Run with:
+    PYTHONPATH=src python benchmarks/bench_operations.py [--sizes 10 1000 10000 100000]
+        [--repeat 3] [--output benchmarks/results.json] [--compare old_results.json]
+'''
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from package_lab13 import google_sheets
+from package_lab13.fake_sheets import FakeSheetsServer
+from package_lab13.ratelimit import configure_rate_limits
+from package_lab13.row_cache import habit_rows
+
+DEFAULT_SIZES = [10, 1_000, 10_000, 100_000]
+CREDS = "benchmark"
+
+'''seed_rows generates `size` habit rows like the ones add_habit writes.'''
+def seed_rows(size):
+    for i in range(size):
+        status = "✅" if i % 3 == 0 else "❌"
+        yield [f"Habit {i}", "2025-04-23T14:37", "2025-05-01T14:30", status, ""]
+
+'''operations returns (name, function, scripted input answers) for every benchmarked operation on a sheet of `size` rows.'''
+def operations(size):
+    middle = str(max(size // 2, 1))
+    return [
+        ("create_sheet", lambda sid: google_sheets.create_sheet(CREDS, "Benchmark"), []),
+        ("add_habit", lambda sid: google_sheets.add_habit(CREDS, sid, "Stretch"), ["2025-05-01", "02:30 PM"]),
+        ("edit_habit", lambda sid: google_sheets.edit_habit(CREDS, sid), [middle, "Edited habit", "", "", "y"]),
+        ("mark_habit_complete", lambda sid: google_sheets.mark_habit_complete(CREDS, sid), [str(size)]),
+        ("delete_habit", lambda sid: google_sheets.delete_habit(CREDS, sid), [middle]),
+        ("show_habits", lambda sid: google_sheets.show_habits(CREDS, sid), ["q"]),  # quit after the first page
+    ]
+
+'''run_once runs one operation on a freshly seeded sheet and returns its measurements.'''
+def run_once(size, func, inputs, trace_memory, warm_cache):
+    server = FakeSheetsServer()
+    spreadsheet_id = server.add_spreadsheet(rows=seed_rows(size))
+    habit_rows.invalidate()
+    google_sheets._sheet_ids.clear()
+
+    answers = iter(inputs)
+    with server.install(), open(os.devnull, "w") as devnull, \
+         contextlib.redirect_stdout(devnull), \
+         patch.object(builtins, "input", lambda _="": next(answers)):
+        # The shared client is built once per process, so keep its one-off cost out of the numbers
+        google_sheets.get_service(CREDS)
+        if warm_cache:
+            google_sheets.get_sheet_data(CREDS, spreadsheet_id)
+            google_sheets.get_sheet_id(CREDS, spreadsheet_id)
+            server.reset_log()
+
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        func(spreadsheet_id)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+
+    return {
+        "requests": len(server.log),
+        "request_bytes": sum(entry["request_bytes"] for entry in server.log),
+        "response_bytes": sum(entry["response_bytes"] for entry in server.log),
+        "seconds": elapsed,
+        "peak_memory_bytes": peak,
+        "api_calls": sorted(entry["op"] for entry in server.log),
+    }
+
+'''bench_operation times an operation `repeat` times (median), then runs it once more under tracemalloc for peak memory.'''
+def bench_operation(size, func, inputs, repeat, warm_cache):
+    runs = [run_once(size, func, inputs, False, warm_cache) for _ in range(repeat)]
+    result = dict(runs[0])
+    result["seconds"] = statistics.median(run["seconds"] for run in runs)
+    result["peak_memory_bytes"] = run_once(size, func, inputs, True, warm_cache)["peak_memory_bytes"]
+    return result
+
+'''run_suite benchmarks every operation at every size.'''
+def run_suite(sizes, repeat=1, warm_cache=False):
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "warm_cache": warm_cache,
+        },
+        "results": {},
+    }
+    for size in sizes:
+        for name, func, inputs in operations(size):
+            result = bench_operation(size, func, inputs, repeat, warm_cache)
+            results["results"].setdefault(name, {})[str(size)] = result
+            print(f"{name:<22}{size:>8} rows  {result['requests']:>3} req  "
+                  f"{result['request_bytes']:>10,} B out  {result['response_bytes']:>12,} B in  "
+                  f"{result['seconds'] * 1000:>9.1f} ms  {result['peak_memory_bytes'] / 1e6:>8.1f} MB peak")
+    return results
+
+'''compare prints the relative change of every metric between an older results file and the new results.'''
+def compare(old, new):
+    print("\nChange vs. baseline (negative is better):")
+    for name, sizes in new["results"].items():
+        for size, result in sizes.items():
+            before = old.get("results", {}).get(name, {}).get(size)
+            if not before:
+                continue
+            changes = []
+            for metric in ("requests", "response_bytes", "seconds", "peak_memory_bytes"):
+                if before.get(metric):
+                    changes.append(f"{metric} {100 * (result[metric] - before[metric]) / before[metric]:+.0f}%")
+            print(f"  {name:<22}{size:>8} rows  " + "  ".join(changes))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark habit operations against the fake Sheets server.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="sheet sizes in rows")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per operation (median is kept)")
+    parser.add_argument("--warm-cache", action="store_true", help="prime the row and sheetId caches before each operation")
+    parser.add_argument("--output", default="benchmarks/results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    configure_rate_limits()  # measure the operations, not the client-side quota pacing
+    results = run_suite(args.sizes, args.repeat, args.warm_cache)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+'''bench_startup measures how long the command-line entry points take to start.
+
+Each case runs in a fresh interpreter (so nothing is already imported) and is timed
+from process start to exit. It compares `habit-tracker --help` (the lazy-importing
+cli module) with importing the interactive main module, which loads googleapiclient
+and google-auth up front, and reports how long the heavy imports themselves take.
+
+Run with:
+    PYTHONPATH=src python benchmarks/bench_startup.py [--repeat 10]
+'''
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+CASES = [
+    ("python (empty)", ["-c", "pass"]),
+    ("habit-tracker --help", ["-m", "package_lab13.cli", "--help"]),
+    ("import package_lab13.cli", ["-c", "import package_lab13.cli"]),
+    ("import package_lab13.main", ["-c", "import package_lab13.main"]),
+    ("import googleapiclient.discovery", ["-c", "import googleapiclient.discovery"]),
+    ("import google_auth_oauthlib.flow", ["-c", "import google_auth_oauthlib.flow"]),
+]
+
+'''time_case returns the wall time of each of `repeat` fresh interpreter runs.'''
+def time_case(args, repeat):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, env=env, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure CLI startup time.")
+    parser.add_argument("--repeat", type=int, default=10, help="runs per case (median and min are reported)")
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<36}{'median ms':>11}{'min ms':>9}")
+    for name, case_args in CASES:
+        times = time_case(case_args, args.repeat)
+        print(f"{name:<36}{statistics.median(times) * 1000:>11.1f}{min(times) * 1000:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+'''bench_stores times the same habit operations on every HabitStore backend, side by side.
+
+Each backend is seeded with `size` habits, then every operation runs on it: the memory
+store shows what the tracker logic costs on its own, SQLite adds a local indexed
+database, and the Sheets store adds the API requests (against the in-process fake
+server, so request counts are real but network latency is only what --latency adds).
+
+Run with:
+    PYTHONPATH=src python benchmarks/bench_stores.py [--sizes 100 10000 100000] [--repeat 3]
+        [--latency 0.05] [--output stores.json]
+'''
+import argparse
+import json
+import statistics
+import time
+
+from package_lab13 import google_sheets, sheets_client, stores
+from package_lab13.fake_sheets import FakeSheetsServer
+from package_lab13.ratelimit import configure_rate_limits
+from package_lab13.row_cache import habit_index, habit_rows
+
+DEFAULT_SIZES = [100, 10_000, 100_000]
+CREDS = "benchmark"
+
+'''seed_rows generates `size` habit rows like the ones add_habit writes.'''
+def seed_rows(size):
+    return [[f"Habit {i}", "2025-04-23T14:37", "2025-05-01T14:30",
+             "✅" if i % 3 == 0 else "❌", "", f"{i:012x}"] for i in range(size)]
+
+'''operations returns (name, function of a store) for every benchmarked operation on `size` habits.'''
+def operations(size):
+    middle = max(size // 2, 1)
+    return [
+        ("list", lambda store: store.list()),
+        ("add", lambda store: store.add("Stretch")),
+        ("append_100", lambda store: store.append([google_sheets.new_habit_row(f"New {i}") for i in range(100)])),
+        ("update", lambda store: store.update(middle, name="Edited habit")),
+        ("complete_100", lambda store: store.complete(list(range(1, min(size, 100) + 1)))),
+        ("delete_10", lambda store: store.delete(list(range(middle, min(middle + 10, size + 1))))),
+    ]
+
+'''open_seeded returns (store, server) for a backend seeded with rows; server is None for local backends.'''
+def open_seeded(kind, rows, latency):
+    habit_rows.invalidate()
+    habit_index.invalidate()
+    google_sheets._sheet_ids.clear()
+    if kind == "sheets":
+        server = FakeSheetsServer(latency=latency)
+        spreadsheet_id = server.add_spreadsheet(rows=rows)
+        return stores.open_store("sheets", CREDS, spreadsheet_id), server
+    store = stores.open_store(kind)
+    store.append(rows)
+    return store, None
+
+'''run_once times one operation on a freshly seeded backend and returns (seconds, requests).'''
+def run_once(kind, rows, func, latency):
+    store, server = open_seeded(kind, rows, latency)
+    if server is None:
+        start = time.perf_counter()
+        func(store)
+        return time.perf_counter() - start, 0
+    with server.install():
+        google_sheets.get_service(CREDS)  # keep the one-off client build out of the numbers
+        start = time.perf_counter()
+        func(store)
+        elapsed = time.perf_counter() - start
+    sheets_client.reset_clients()
+    return elapsed, len(server.log)
+
+'''run_suite benchmarks every operation on every backend and size; returns {operation: {size: {backend: result}}}.'''
+def run_suite(sizes, backends, repeat=1, latency=0.0):
+    results = {}
+    for size in sizes:
+        rows = seed_rows(size)
+        for name, func in operations(size):
+            line = [f"{name:<14}{size:>8} rows"]
+            for kind in backends:
+                runs = [run_once(kind, rows, func, latency) for _ in range(repeat)]
+                result = {"seconds": statistics.median(seconds for seconds, _ in runs), "requests": runs[0][1]}
+                results.setdefault(name, {}).setdefault(str(size), {})[kind] = result
+                line.append(f"{kind} {result['seconds'] * 1000:>9.2f} ms ({result['requests']} req)")
+            print("  ".join(line))
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare habit operations across HabitStore backends.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="habits seeded before each operation")
+    parser.add_argument("--backends", nargs="+", choices=stores.BACKENDS, default=list(stores.BACKENDS))
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per operation (median is kept)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the fake Sheets server waits per request")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    configure_rate_limits()  # measure the backends, not the client-side quota pacing
+    results = run_suite(args.sizes, args.backends, args.repeat, args.latency)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
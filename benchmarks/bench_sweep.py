@@ -0,0 +1,53 @@
+'''bench_sweep times a nightly sweep (report + complete today's habits) over many spreadsheets with different worker counts.
+
+Runs against the local fake Sheets server with a fixed per-request latency standing in
+for the network round trip. Client-side quota pacing is off by default, so the numbers
+show how much of the latency the thread pool hides; pass --quota to pace at the real
+60 requests/minute and see the quota-bound duration instead (that run takes minutes).
+
+Run with:
+    PYTHONPATH=src python benchmarks/bench_sweep.py [--sheets 500] [--latency 0.15] [--workers 1 8 32]
+'''
+import argparse
+from datetime import datetime
+
+import pytz
+
+from package_lab13 import multi_sheet, sheets_client
+from package_lab13.fake_sheets import FakeSheetsServer
+from package_lab13.ratelimit import configure_rate_limits, reset_rate_limits
+from package_lab13.row_cache import habit_rows
+
+CREDS = "benchmark"
+
+'''tracker_rows returns a small tracker whose first habit is due today.'''
+def tracker_rows():
+    today = datetime.now(pytz.timezone('US/Eastern')).date().isoformat()
+    return [[f"Habit {i}", "2025-04-23T14:37", f"{today}T20:00" if i == 0 else "", "❌", ""]
+            for i in range(20)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time multi_sheet.sweep over many fake spreadsheets.")
+    parser.add_argument("--sheets", type=int, default=500, help="number of spreadsheets")
+    parser.add_argument("--latency", type=float, default=0.15, help="seconds per simulated request")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32], help="worker counts to compare")
+    parser.add_argument("--quota", action="store_true", help="pace requests at the default per-minute quotas")
+    args = parser.parse_args(argv)
+
+    if args.quota:
+        reset_rate_limits()
+    else:
+        configure_rate_limits()
+
+    print(f"{'workers':>8}{'sheets':>8}{'requests':>10}{'seconds':>10}{'sheets/s':>10}")
+    for workers in args.workers:
+        server = FakeSheetsServer(latency=args.latency)
+        sheets = [server.add_spreadsheet(rows=tracker_rows()) for _ in range(args.sheets)]
+        habit_rows.invalidate()
+        sheets_client.reset_clients()
+        with server.install():
+            result = multi_sheet.sweep(CREDS, sheets, complete_today=True, workers=workers)
+        print(f"{workers:>8}{len(sheets):>8}{len(server.log):>10}{result['seconds']:>10.1f}{len(sheets) / result['seconds']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+'''batching sends many independent Sheets API calls as multipart batch requests (googleapiclient's new_batch_http_request).
+
+A batch carries up to BATCH_SIZE calls in one HTTP exchange, which saves a round trip
+(and connection set-up) per call when validating or reading many spreadsheets. Google
+still counts every inner call against the quota, so each one takes a token from the
+ratelimit buckets, and each is recorded in metrics.api_metrics under its own operation
+name. Inner calls that fail with a retryable status are sent again in the next batch
+(same policy as sheets_client.execute); a failure of the batch as a whole retries the
+whole batch.
+
+    batch = RequestBatch(service)
+    for sid in spreadsheet_ids:
+        batch.add(service.spreadsheets().get(spreadsheetId=sid, fields="spreadsheetId"),
+                  "spreadsheets.get", callback=lambda result, error, sid=sid: ...)
+    batch.execute()
+'''
+import time
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MAX_BATCH_LIMIT
+
+from package_lab13 import ratelimit, sheets_client
+from package_lab13.metrics import api_metrics
+
+# Calls per batch request. The batch endpoint accepts up to MAX_BATCH_LIMIT (1000), but
+# Google recommends staying at or below 100, and larger batches only delay every answer.
+BATCH_SIZE = 100
+
+class RequestBatch:
+    '''Independent API calls queued to go out together.
+
+    Every call gets a callback(result, error): exactly one of them is set once execute()
+    has run. execute() also returns the (result, error) pairs in the order calls were added.
+    '''
+
+    def __init__(self, service, size=None):
+        size = BATCH_SIZE if size is None else size
+        if not 1 <= size <= MAX_BATCH_LIMIT:
+            raise ValueError(f"Batch size must be between 1 and {MAX_BATCH_LIMIT}")
+        self.service = service
+        self.size = size
+        self._calls = []
+
+    def __len__(self):
+        return len(self._calls)
+
+    '''add queues one request (built but not executed) under an operation name, like sheets_client.execute.'''
+    def add(self, request, operation, range_name=None, callback=None):
+        call = {"request": request, "operation": operation, "range": range_name, "callback": callback,
+                "bytes": None, "seconds": 0.0, "retries": 0}
+        postproc = request.postproc
+        # The batch hands each part's body to its request's postproc, so that is where we measure it
+        def measuring_postproc(resp, content):
+            call["bytes"] = len(content or b"")
+            return postproc(resp, content)
+        request.postproc = measuring_postproc
+        self._calls.append(call)
+
+    '''execute sends every queued call in batches of `size`, retrying retryable failures, and returns [(result, error), ...] in the order the calls were added.'''
+    def execute(self):
+        calls, self._calls = self._calls, []
+        outcomes = [None] * len(calls)
+        pending = list(range(len(calls)))
+        attempt = 0
+        while pending:
+            retry, delays = [], []
+            for start in range(0, len(pending), self.size):
+                for index, outcome, delay in self._send(calls, pending[start:start + self.size]):
+                    call = calls[index]
+                    if call["retries"] < sheets_client.MAX_RETRIES and _should_retry(call["operation"], outcome[1]):
+                        call["retries"] += 1
+                        retry.append(index)
+                        delays.append(delay if delay is not None else sheets_client._backoff(attempt))
+                    else:
+                        outcomes[index] = outcome
+                        _record(call, outcome[1])
+            pending = retry
+            if pending:
+                sheets_client._sleep(max(delays))
+                attempt += 1
+
+        for call, (result, error) in zip(calls, outcomes):
+            if call["callback"] is not None:
+                call["callback"](result, error)
+        return outcomes
+
+    '''_send runs one batch and yields (index, (result, error), Retry-After delay or None) for each call in it.'''
+    def _send(self, calls, chunk):
+        responses = {}
+
+        def on_response(request_id, response, exception):
+            responses[int(request_id)] = (response, exception)
+
+        for index in chunk:
+            bucket = ratelimit.bucket_for(calls[index]["operation"])
+            if bucket is not None:
+                bucket.acquire()  # Google counts each call in a batch against the quota
+
+        batch = self.service.new_batch_http_request(callback=on_response)
+        for index in chunk:
+            batch.add(calls[index]["request"], request_id=str(index))
+
+        start = time.perf_counter()
+        try:
+            http = sheets_client._thread_http(calls[chunk[0]]["request"].http) if sheets_client.PER_THREAD_HTTP else None
+            batch.execute(http=http)
+            failure = None
+        except (HttpError, ConnectionError, TimeoutError) as error:
+            failure = error  # the batch itself failed: every call in it gets this error
+        elapsed = time.perf_counter() - start
+        api_metrics.record("batch", None, elapsed, None, 0, _status(failure))
+
+        for index in chunk:
+            calls[index]["seconds"] = elapsed
+            result, error = (None, failure) if failure is not None else responses.get(index, (None, None))
+            delay = sheets_client._retry_after(error) if isinstance(error, HttpError) else None
+            yield index, (result, error), delay
+
+'''_should_retry applies sheets_client's retry policy to the error of one call in a batch.'''
+def _should_retry(operation, error):
+    if isinstance(error, HttpError):
+        return sheets_client._is_retryable(operation, error.resp.status)
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return sheets_client._is_retryable_drop(operation)
+    return False
+
+'''_status turns an error (or None) into the status string used by api_metrics.'''
+def _status(error):
+    if error is None:
+        return "ok"
+    if isinstance(error, HttpError):
+        return str(error.resp.status)
+    return "error"
+
+'''_record adds one finished call to the metrics; its latency is that of the batch that answered it.'''
+def _record(call, error):
+    api_metrics.record(call["operation"], call["range"], call["seconds"], call["bytes"], call["retries"], _status(error))
+
+'''execute_batched runs (request, operation, range_name) triples through RequestBatch and returns [(result, error), ...] in the same order.'''
+def execute_batched(service, calls, size=None):
+    batch = RequestBatch(service, size)
+    for request, operation, range_name in calls:
+        batch.add(request, operation, range_name)
+    return batch.execute()
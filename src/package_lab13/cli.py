@@ -0,0 +1,370 @@
+'''cli is the non-interactive, scriptable front end: one subcommand per habit operation, no prompts.
+
+The Google client libraries take most of a second to import, so this module only imports
+argparse at load time; google_sheets / main (and through them googleapiclient and
+google-auth) are imported inside the command handlers, so `--help` and argument errors
+return immediately.
+
+Usage:
+    habit-tracker --sheet SPREADSHEET_ID list [--incomplete] [--name TEXT] [--updated-since YYYY-MM-DD] [--json]
+    habit-tracker --sheet SPREADSHEET_ID add "Stretch" [--date 2025-05-01] [--time "02:30 PM"]
+    habit-tracker --sheet SPREADSHEET_ID complete 1-3,5 | --today | --id ID [--id ID ...]
+    habit-tracker --sheet SPREADSHEET_ID edit 2 | --id ID [--name NAME] [--date DATE] [--time TIME] [--status done|todo]
+    habit-tracker --sheet SPREADSHEET_ID delete 4,7 | --id ID [--id ID ...]
+    habit-tracker --sheet SPREADSHEET_ID import habits.csv [--chunk-size 500]
+    habit-tracker --sheet SPREADSHEET_ID due [--days 7]
+    habit-tracker --sheet SPREADSHEET_ID migrate-dates
+    habit-tracker --sheet SPREADSHEET_ID streaks [--weeks 8]
+    habit-tracker sweep [ID ...] [--sheets-file FILE] [--complete-today] [--workers 8] [--batch]
+    habit-tracker check [ID ...] [--sheets-file FILE]
+    habit-tracker serve
+
+The sheet ID may also come from the HABIT_TRACKER_SHEET environment variable. While
+`habit-tracker serve` is running (see daemon.py), the other commands are sent to it
+instead of signing in and reading the sheet themselves; without a daemon they run
+in-process.
+
+Numbers are positions in the list as it is now. For scripts that keep a habit around
+between runs, use its ID instead (`list --json` shows it): --id finds the habit even
+after other rows were added or deleted, without reading the whole sheet first.
+'''
+import argparse
+import json
+import os
+import sys
+
+COLUMNS = ("task", "created", "target", "status", "updated")
+
+'''habit_record turns a sheet row into a dict for --json output.'''
+def habit_record(number, row):
+    row = list(row) + [""] * (len(COLUMNS) - len(row))
+    record = dict(zip(COLUMNS, row))
+    record["number"] = number
+    record["complete"] = record["status"] == "✅"
+    record["id"] = row[len(COLUMNS)] if len(row) > len(COLUMNS) else ""
+    return record
+
+'''_credentials signs in with the cached token (importing the Google auth stack only now).'''
+def _credentials():
+    from package_lab13.main import authenticate_user
+    return authenticate_user()
+
+'''_target builds the target cell ("2025-05-01T14:30") for edit, keeping whichever half was not given from the current value (which may still be in the older display format).'''
+def _target(current, date=None, time=None):
+    from package_lab13 import google_sheets, records
+    from package_lab13.importer import normalize_time
+
+    old_date, old_time = records.split_target(current or "")
+    new_date = google_sheets.format_target_date(date) if date is not None else (old_date.isoformat() if old_date else "TBD")
+    new_time = (normalize_time(time) if time.strip() else "TBD") if time is not None else (old_time.strftime("%H:%M") if old_time else "TBD")
+    return google_sheets.format_target(new_date, new_time)
+
+def cmd_list(args, creds):
+    from package_lab13 import google_sheets
+    if args.incomplete or args.name is not None or args.updated_since is not None:
+        from datetime import datetime
+        from package_lab13 import queries
+        since = datetime.strptime(args.updated_since, "%Y-%m-%d") if args.updated_since is not None else None
+        matches = queries.find_habits(creds, args.sheet, args.incomplete, args.name, since)
+        return {"habits": [habit_record(index + 1, row) for index, row in matches]}
+    data = google_sheets.get_sheet_data(creds, args.sheet)
+    return {"habits": [habit_record(n, row) for n, row in enumerate(data, start=1)]}
+
+def cmd_add(args, creds):
+    from package_lab13 import google_sheets
+    from package_lab13.importer import normalize_time
+    target_date = google_sheets.format_target_date(args.date or "")
+    target_time = normalize_time(args.time) if args.time else "TBD"
+    row = google_sheets.append_habit(creds, args.sheet, args.name, target_date, target_time)
+    return {"added": habit_record(None, row)}
+
+def cmd_complete(args, creds):
+    from package_lab13 import google_sheets
+    if args.ids:
+        completed, already = google_sheets.mark_habits_complete(creds, args.sheet, habit_ids=args.ids)
+        return {"completed": completed, "already_complete": already}
+    data = google_sheets.get_sheet_data(creds, args.sheet, columns=(google_sheets.TASK_COLUMN, google_sheets.TARGET_COLUMN,
+                                                                    google_sheets.STATUS_COLUMN, google_sheets.ID_COLUMN))
+    numbers = None if args.today else google_sheets.parse_selection(args.selection, len(data))
+    completed, already = google_sheets.mark_habits_complete(creds, args.sheet, numbers, due_today=args.today, data=data)
+    return {"completed": completed, "already_complete": already}
+
+def cmd_edit(args, creds):
+    from package_lab13 import google_sheets
+    status = {"done": "✅", "todo": "❌", None: None}[args.status]
+    if args.id:
+        target = None
+        if args.date is not None or args.time is not None:
+            _, current = google_sheets.locate_habits(creds, args.sheet, [args.id])[args.id]
+            target = _target(current[2] if len(current) > 2 else "", args.date, args.time)
+        row = google_sheets.update_habit(creds, args.sheet, None, args.name, target, status, habit_id=args.id)
+        return {"updated": habit_record(None, row)}
+
+    data = google_sheets.get_sheet_data(creds, args.sheet, columns=(google_sheets.TASK_COLUMN, google_sheets.CREATED_COLUMN, google_sheets.TARGET_COLUMN,
+                                                                    google_sheets.STATUS_COLUMN, google_sheets.ID_COLUMN))
+    if args.number < 1 or args.number > len(data):
+        raise ValueError(f"Habit number must be between 1 and {len(data)}")
+
+    current = data[args.number - 1]
+    target = None
+    if args.date is not None or args.time is not None:
+        target = _target(current[2] if len(current) > 2 else "", args.date, args.time)
+    row = google_sheets.update_habit(creds, args.sheet, args.number, args.name, target, status, data=data)
+    return {"updated": habit_record(args.number, row)}
+
+def cmd_delete(args, creds):
+    from package_lab13 import google_sheets
+    if args.ids:
+        return {"deleted": google_sheets.delete_habits(creds, args.sheet, None, habit_ids=args.ids)}
+    data = google_sheets.get_sheet_data(creds, args.sheet, columns=(google_sheets.TASK_COLUMN, google_sheets.ID_COLUMN))
+    numbers = google_sheets.parse_selection(args.selection, len(data))
+    return {"deleted": google_sheets.delete_habits(creds, args.sheet, numbers, data=data)}
+
+def cmd_due(args, creds):
+    from package_lab13 import stores
+    store = stores.sheets_store(creds, args.sheet)  # shared, so the daemon keeps one due index per sheet
+    return {"overdue": [habit_record(None, row) for row in store.overdue()],
+            "upcoming": [habit_record(None, row) for row in store.upcoming(args.days)]}
+
+def cmd_migrate_dates(args, creds):
+    from package_lab13 import google_sheets
+    return {"migrated": google_sheets.migrate_dates(creds, args.sheet)}
+
+def cmd_streaks(args, creds):
+    from package_lab13 import streaks
+    stats = streaks.engine_for(creds, args.sheet)
+    return {"habits": stats.summary(), "weekly": [{"week": week, "completions": count} for week, count in stats.weekly_rollup()[-args.weeks:]]}
+
+def cmd_serve(args, creds):
+    from package_lab13 import daemon
+    daemon.serve(args.daemon, creds, args.workers)
+    return None
+
+'''spreadsheet_id_from accepts a bare spreadsheet ID or a Google Sheets URL.'''
+def spreadsheet_id_from(text):
+    text = text.strip()
+    return text.split("/d/")[1].split("/")[0] if "/d/" in text else text
+
+'''read_sheet_list reads spreadsheet IDs or URLs from a file, one per line; blank lines and # comments are skipped.'''
+def read_sheet_list(path):
+    with open(path, encoding="utf-8") as f:
+        return [spreadsheet_id_from(line) for line in (l.split("#")[0] for l in f) if line.strip()]
+
+'''_sheet_arguments collects the spreadsheets named on the command line and in --sheets-file (or --sheet when there are none).'''
+def _sheet_arguments(args):
+    sheets = [spreadsheet_id_from(s) for s in args.sheets]
+    if args.sheets_file:
+        sheets += read_sheet_list(args.sheets_file)
+    if not sheets and args.sheet:
+        sheets = [args.sheet]
+    if not sheets:
+        raise ValueError("No spreadsheets given (pass IDs or --sheets-file)")
+    return sheets
+
+def cmd_check(args, creds):
+    from package_lab13 import google_sheets
+    problems = google_sheets.check_spreadsheets(creds, _sheet_arguments(args))
+    return {"sheets": {sid: {"ok": error is None, "error": None if error is None else str(error)}
+                       for sid, error in problems.items()}}
+
+def cmd_sweep(args, creds):
+    from package_lab13 import multi_sheet
+    sheets = _sheet_arguments(args)
+
+    def progress(done, total):
+        if not args.json and (done == total or done % 50 == 0):
+            print(f"  {done}/{total} sheets done", file=sys.stderr)
+    return multi_sheet.sweep(creds, sheets, args.complete_today, args.workers, progress, batch_reads=args.batch)
+
+def cmd_import(args, creds):
+    from package_lab13 import importer
+    report = importer.import_habits(creds, args.sheet, args.path, chunk_size=args.chunk_size)
+    report["skipped"] = [{"line": line, "reason": reason} for line, reason in report["skipped"]]
+    return report
+
+'''print_result prints a command's result as a short human-readable summary.'''
+def print_result(command, result):
+    if command == "list":
+        if not result["habits"]:
+            print("No habits found.")
+        for habit in result["habits"]:
+            print(f"{habit['number']}. {habit['task']} | Target: {habit['target']} | Status: {habit['status']}")
+    elif command == "add":
+        print(f"✅ Added '{result['added']['task']}' (target {result['added']['target']})")
+    elif command == "complete":
+        for name in result["completed"]:
+            print(f"✅ Marked '{name}' complete")
+        for name in result["already_complete"]:
+            print(f"'{name}' was already complete")
+        if not result["completed"] and not result["already_complete"]:
+            print("No habits to mark complete.")
+    elif command == "edit":
+        print(f"✅ Updated habit {result['updated']['number'] or result['updated']['id']}: {result['updated']['task']}")
+    elif command == "delete":
+        print(f"✅ Deleted {len(result['deleted'])} habit(s): {', '.join(result['deleted'])}")
+    elif command == "due":
+        from package_lab13.records import display_target
+        for title, key in (("Overdue", "overdue"), ("Upcoming", "upcoming")):
+            for habit in result[key]:
+                print(f"{title}: {habit['task']} | Target: {display_target(habit['target'])}")
+        if not result["overdue"] and not result["upcoming"]:
+            print("Nothing is due.")
+    elif command == "streaks":
+        if not result["habits"]:
+            print("No completions logged yet.")
+        for habit in result["habits"]:
+            print(f"{habit['task']} | streak {habit['current_streak']} (best {habit['longest_streak']}) | "
+                  f"{habit['completion_rate']:.0%} of days, {habit['rate_30d']:.0%} in the last 30")
+        for week in result["weekly"]:
+            print(f"Week of {week['week']}: {week['completions']} completion(s)")
+    elif command == "migrate-dates":
+        print(f"✅ Rewrote the dates of {result['migrated']} habit(s) as ISO-8601")
+    elif command == "check":
+        for sid, outcome in result["sheets"].items():
+            print(f"{sid}: ✅ accessible" if outcome["ok"] else f"{sid}: ❌ {outcome['error']}")
+    elif command == "sweep":
+        for sid, outcome in result["sheets"].items():
+            if outcome["ok"]:
+                report = outcome["result"]
+                done = f", completed {len(report['completed_now'])} now" if "completed_now" in report else ""
+                print(f"{sid}: {report['habits']} habits, {report['complete']} complete, {report['due_today_open']}/{report['due_today']} due today open{done}")
+            else:
+                print(f"{sid}: ❌ {outcome['error']}")
+        totals = result["totals"]
+        print(f"\n{totals['sheets']} sheets ({totals['failed']} failed), {totals['habits']} habits, "
+              f"{totals['completed_now']} completed now, in {result['seconds']:.1f}s")
+    elif command == "import":
+        from package_lab13.importer import print_report
+        print_report(dict(result, skipped=[(s["line"], s["reason"]) for s in result["skipped"]]))
+
+'''build_parser defines the global options and one subparser per command.'''
+def build_parser():
+    parser = argparse.ArgumentParser(prog="habit-tracker", description="Manage the Google Sheets habit tracker from scripts and cron.")
+    parser.add_argument("--sheet", default=os.environ.get("HABIT_TRACKER_SHEET"),
+                        help="spreadsheet ID of the Habit Tracker sheet (default: $HABIT_TRACKER_SHEET)")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    parser.add_argument("--daemon", metavar="ADDRESS", default=None,
+                        help="Unix socket path or HOST:PORT of the daemon (default: $HABIT_TRACKER_DAEMON or ~/.habit-tracker.sock)")
+    parser.add_argument("--no-daemon", action="store_true", help="run in this process even if a daemon is running")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+
+    p = commands.add_parser("list", help="show every habit (or only those matching the filters)")
+    p.add_argument("--incomplete", action="store_true", help="only habits not marked complete")
+    p.add_argument("--name", help="only habits whose name contains this text")
+    p.add_argument("--updated-since", metavar="YYYY-MM-DD", help="only habits updated on or after this date")
+    p.set_defaults(handler=cmd_list)
+
+    p = commands.add_parser("add", help="add a habit")
+    p.add_argument("name", help="habit to track")
+    p.add_argument("--date", help="target date (YYYY-MM-DD)")
+    p.add_argument("--time", help="target time (HH:MM AM/PM or 24-hour HH:MM)")
+    p.set_defaults(handler=cmd_add)
+
+    p = commands.add_parser("complete", help="mark habits complete")
+    group = p.add_mutually_exclusive_group(required=True)
+    group.add_argument("selection", nargs="?", help='habit numbers, e.g. "2" or "1-5,8"')
+    group.add_argument("--today", action="store_true", help="every habit due today")
+    group.add_argument("--id", dest="ids", action="append", metavar="ID", help="habit ID (repeatable)")
+    p.set_defaults(handler=cmd_complete)
+
+    p = commands.add_parser("edit", help="change a habit's name, target or status")
+    group = p.add_mutually_exclusive_group(required=True)
+    group.add_argument("number", type=int, nargs="?", help="habit number as shown by list")
+    group.add_argument("--id", help="habit ID")
+    p.add_argument("--name", help="new habit name")
+    p.add_argument("--date", help="new target date (YYYY-MM-DD, empty for TBD)")
+    p.add_argument("--time", help="new target time (HH:MM AM/PM, empty for TBD)")
+    p.add_argument("--status", choices=("done", "todo"), help="new completion status")
+    p.set_defaults(handler=cmd_edit)
+
+    p = commands.add_parser("delete", help="delete habits")
+    group = p.add_mutually_exclusive_group(required=True)
+    group.add_argument("selection", nargs="?", help='habit numbers, e.g. "2" or "1-5,8"')
+    group.add_argument("--id", dest="ids", action="append", metavar="ID", help="habit ID (repeatable)")
+    p.set_defaults(handler=cmd_delete)
+
+    p = commands.add_parser("import", help="bulk-load habits from a CSV or JSONL file")
+    p.add_argument("path", help="CSV (with a header row) or JSONL file of habits")
+    p.add_argument("--chunk-size", type=int, default=500, help="rows per append request")
+    p.set_defaults(handler=cmd_import)
+
+    p = commands.add_parser("due", help="show overdue habits and those due soon")
+    p.add_argument("--days", type=int, default=7, help="how far ahead counts as upcoming")
+    p.set_defaults(handler=cmd_due)
+
+    p = commands.add_parser("streaks", help="show streaks, completion rates and weekly totals from the completion history")
+    p.add_argument("--weeks", type=int, default=8, help="how many recent weeks to total")
+    p.set_defaults(handler=cmd_streaks)
+
+    p = commands.add_parser("migrate-dates", help="rewrite dates stored in the old display format as ISO-8601")
+    p.set_defaults(handler=cmd_migrate_dates)
+
+    p = commands.add_parser("sweep", help="report on (and optionally complete today's habits in) many spreadsheets at once")
+    p.add_argument("sheets", nargs="*", help="spreadsheet IDs or URLs")
+    p.add_argument("--sheets-file", help="file with one spreadsheet ID or URL per line")
+    p.add_argument("--complete-today", action="store_true", help="mark every habit due today complete")
+    p.add_argument("--workers", type=int, default=8, help="spreadsheets processed at once")
+    p.add_argument("--batch", action="store_true", help="read the sheets with batched requests (100 per HTTP exchange) first")
+    p.set_defaults(handler=cmd_sweep, in_process=True)
+
+    p = commands.add_parser("check", help="check that spreadsheets exist and are shared with you (batched)")
+    p.add_argument("sheets", nargs="*", help="spreadsheet IDs or URLs")
+    p.add_argument("--sheets-file", help="file with one spreadsheet ID or URL per line")
+    p.set_defaults(handler=cmd_check, in_process=True)
+
+    p = commands.add_parser("serve", help="run the daemon that keeps a signed-in client and cached habits warm")
+    p.add_argument("--workers", type=int, default=4, help="commands run at once (for different spreadsheets)")
+    p.set_defaults(handler=cmd_serve)
+    return parser
+
+'''_via_daemon sends the command to a running daemon and returns its result, or None when no daemon is listening.'''
+def _via_daemon(argv, args):
+    from package_lab13 import daemon
+    try:
+        return daemon.request(argv, args.sheet, args.daemon)
+    except daemon.DaemonError:
+        raise
+    except OSError:
+        return None
+
+'''main runs one command and returns the process exit code (0 ok, 1 failed request or bad input, 2 usage error).'''
+def main(argv=None, creds=None):
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = parser.parse_args(argv)
+    if args.daemon is None:
+        from package_lab13.daemon import DEFAULT_ADDRESS
+        args.daemon = DEFAULT_ADDRESS
+    if args.command == "serve":
+        args.handler(args, creds)
+        return 0
+    in_process = getattr(args, "in_process", False)  # sweep takes its own list of sheets
+    if not args.sheet and not in_process:
+        parser.error("--sheet (or HABIT_TRACKER_SHEET) is required")
+
+    try:
+        result = None
+        if not args.no_daemon and not in_process and creds is None:
+            result = _via_daemon(argv, args)
+        if result is None:
+            if creds is None:
+                creds = _credentials()
+            result = args.handler(args, creds)
+            from package_lab13.history import history_log
+            history_log.flush_all()  # the completions this command logged (see history)
+    except Exception as error:  # ValueError for bad input, HttpError for failed requests
+        if args.json:
+            print(json.dumps({"error": str(error)}))
+        else:
+            print(f"❌ {error}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print_result(args.command, result)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+'''daemon keeps one signed-in process with warm Sheets clients and habit caches, and serves habit-tracker commands to thin clients.
+
+A normal `habit-tracker` invocation pays for interpreter start-up, the Google imports,
+loading the token, building a client and a full read of the sheet. With the daemon
+running, the CLI only parses its arguments and sends them over a local socket: the
+daemon runs the same command handlers against its in-memory state and sends the result
+back as JSON.
+
+Protocol: one JSON object per line in each direction.
+    request:  {"argv": [...], "sheet": "SPREADSHEET_ID", "cwd": "/client/working/dir"}
+    response: {"ok": true, "result": {...}} or {"ok": false, "error": "..."}
+
+The address is a Unix socket path (created 0600), or HOST:PORT for a TCP socket, which
+must be a loopback address because the protocol has no authentication.
+
+Usage:
+    habit-tracker serve [--daemon ~/.habit-tracker.sock]
+'''
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Where the daemon listens and the CLI looks for it (TCP on platforms without Unix sockets)
+HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+DEFAULT_ADDRESS = os.environ.get("HABIT_TRACKER_DAEMON",
+                                 os.path.expanduser("~/.habit-tracker.sock") if HAS_UNIX_SOCKETS else "127.0.0.1:8765")
+
+# Worker threads running commands; each sends its requests over its own connection (see sheets_client.PER_THREAD_HTTP)
+DEFAULT_WORKERS = 4
+
+# How long the thin client waits for an answer before giving up, in seconds
+CLIENT_TIMEOUT = 120.0
+
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+# Pending connections the listening socket queues (socketserver's default of 5 makes
+# bursts of parallel script invocations fail with EAGAIN on Unix sockets)
+LISTEN_BACKLOG = 128
+
+class DaemonError(Exception):
+    '''The daemon answered, but the command failed (bad input or a failed API request).'''
+
+'''parse_address turns an address into (socket family, address): "HOST:PORT" is TCP, anything else is a Unix socket path.'''
+def parse_address(address):
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        host = host.strip("[]") or "127.0.0.1"
+        if host not in LOOPBACK_HOSTS:
+            raise ValueError(f"The daemon only listens on loopback addresses, not {host}")
+        return (socket.AF_INET6 if ":" in host else socket.AF_INET), (host, int(port))
+    if not HAS_UNIX_SOCKETS:
+        raise ValueError("Unix sockets are not available on this platform; use a HOST:PORT address")
+    return socket.AF_UNIX, address
+
+'''request sends one command to a running daemon and returns its result. Raises OSError when no daemon is listening and DaemonError when the command failed.'''
+def request(argv, sheet, address=DEFAULT_ADDRESS, timeout=CLIENT_TIMEOUT):
+    family, addr = parse_address(address)
+    if isinstance(addr, str) and not os.path.exists(addr):
+        raise FileNotFoundError(addr)  # skip the connect attempt when there is clearly no daemon
+
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(addr)
+        payload = {"argv": list(argv), "sheet": sheet, "cwd": os.getcwd()}
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("The daemon closed the connection without answering")
+
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise DaemonError(response.get("error", "unknown error"))
+    return response["result"]
+
+class HabitDaemon:
+    '''Runs CLI commands for many clients with one set of credentials.
+
+    Commands for the same spreadsheet run one at a time (so a list never sees half of an
+    edit and two deletes can't shift each other's rows); different spreadsheets run in
+    parallel on the worker threads.
+    '''
+
+    def __init__(self, creds, workers=DEFAULT_WORKERS):
+        from package_lab13 import cli, sheets_client
+        sheets_client.PER_THREAD_HTTP = True  # worker threads must not share an httplib2 connection
+        self.creds = creds
+        self._parser = cli.build_parser()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="habit-daemon")
+        self._sheet_locks = {}
+        self._lock = threading.Lock()
+        self.requests_served = 0
+
+    '''_sheet_lock returns the lock serializing commands for one spreadsheet.'''
+    def _sheet_lock(self, spreadsheet_id):
+        with self._lock:
+            return self._sheet_locks.setdefault(spreadsheet_id, threading.Lock())
+
+    '''run parses one request's argv and runs its command on a worker thread. Returns the response dict.'''
+    def run(self, payload):
+        try:
+            args = self._parser.parse_args(payload.get("argv", []))
+        except SystemExit:
+            return {"ok": False, "error": f"invalid arguments: {' '.join(payload.get('argv', []))}"}
+        if args.command == "serve" or getattr(args, "in_process", False):
+            return {"ok": False, "error": f"{args.command} cannot be run through the daemon"}
+
+        args.sheet = payload.get("sheet") or args.sheet
+        if not args.sheet:
+            return {"ok": False, "error": "--sheet (or HABIT_TRACKER_SHEET) is required"}
+        if getattr(args, "path", None) and payload.get("cwd"):
+            args.path = os.path.join(payload["cwd"], args.path)  # relative to the client, not the daemon
+
+        return self._executor.submit(self._run_locked, args).result()
+
+    def _run_locked(self, args):
+        from package_lab13.history import history_log
+        with self._sheet_lock(args.sheet):
+            try:
+                result = args.handler(args, self.creds)
+            except Exception as error:  # ValueError for bad input, HttpError for failed requests
+                return {"ok": False, "error": str(error)}
+            finally:
+                history_log.flush_all()  # like an in-process command, so a killed daemon loses no completions
+        with self._lock:
+            self.requests_served += 1
+        return {"ok": True, "result": result}
+
+    '''listen binds a threaded socketserver on address and returns it; call serve_forever() on it to start answering requests.'''
+    def listen(self, address=DEFAULT_ADDRESS):
+        family, addr = parse_address(address)
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        response = daemon.run(json.loads(line))
+                    except ValueError:
+                        response = {"ok": False, "error": "request is not valid JSON"}
+                    self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+        if isinstance(addr, str):
+            _remove_stale_socket(addr)
+            server_class = type("Server", (socketserver.ThreadingMixIn, socketserver.UnixStreamServer),
+                                {"daemon_threads": True, "request_queue_size": LISTEN_BACKLOG})
+            # Only the current user may talk to the daemon: it acts with their Google credentials
+            old_umask = os.umask(0o177)
+            try:
+                server = server_class(addr, Handler)
+            finally:
+                os.umask(old_umask)
+        else:
+            server_class = type("Server", (socketserver.ThreadingMixIn, socketserver.TCPServer),
+                                {"daemon_threads": True, "allow_reuse_address": True, "address_family": family,
+                                 "request_queue_size": LISTEN_BACKLOG})
+            server = server_class(addr, Handler)
+        return server
+
+    '''close stops the worker threads.'''
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+'''_remove_stale_socket deletes a socket file left behind by a daemon that is no longer running. Raises OSError if another daemon is still listening there.'''
+def _remove_stale_socket(path):
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            os.unlink(path)
+            return
+    raise OSError(f"A habit-tracker daemon is already listening on {path}")
+
+'''_stop_on_sigterm makes SIGTERM (e.g. from a service manager) shut the daemon down like Ctrl+C does. Returns the previous handler, or None when not called from the main thread.'''
+def _stop_on_sigterm():
+    if threading.current_thread() is not threading.main_thread() or not hasattr(signal, "SIGTERM"):
+        return None
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    return signal.signal(signal.SIGTERM, stop)
+
+'''serve signs in once, then answers CLI requests on address until interrupted (Ctrl+C or SIGTERM).'''
+def serve(address=DEFAULT_ADDRESS, creds=None, workers=DEFAULT_WORKERS):
+    if creds is None:
+        from package_lab13.main import authenticate_user
+        creds = authenticate_user()
+
+    daemon = HabitDaemon(creds, workers)
+    server = daemon.listen(address)
+    print(f"habit-tracker daemon listening on {address} (Ctrl+C to stop)")
+    previous_handler = _stop_on_sigterm()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if previous_handler is not None:
+            signal.signal(signal.SIGTERM, previous_handler)
+        server.server_close()
+        daemon.close()
+        from package_lab13.history import history_log
+        history_log.flush_all()  # completions logged since the last full batch
+        _, addr = parse_address(address)
+        if isinstance(addr, str) and os.path.exists(addr):
+            os.unlink(addr)
+        print(f"\nServed {daemon.requests_served} request(s). Goodbye!")
@@ -0,0 +1,91 @@
+'''due_index answers "what is overdue / due soon / due between these dates" without scanning every habit.
+
+DueIndex keeps the incomplete habits that have a target date in a list sorted by
+(due time, habit ID), so a range query is two bisections plus the matches it returns:
+O(log n + k) instead of decoding and comparing all n rows. A target without a time
+("2025-05-01") is due at the end of that day; habits that are ✅ or have no target date
+are not indexed.
+
+The index follows the store it belongs to: stores.HabitStore calls update and remove as
+habits are appended, edited, completed and deleted, each costing one bisection plus a
+list insert or delete. Habits are keyed by their ID (column F). Rows written before IDs
+existed are indexed by list position instead (counted in `unkeyed`); positions move when
+rows are deleted, so a store holding such rows rebuilds its index rather than updating it.
+
+    index = DueIndex(store.list())
+    index.overdue(records.now())
+    index.upcoming(records.now(), timedelta(days=7))
+'''
+import bisect
+from datetime import datetime, time, timedelta
+
+from package_lab13 import records
+
+# Row columns (as in google_sheets; records and this module don't depend on the Sheets client)
+TARGET_COLUMN = 2
+STATUS_COLUMN = 3
+ID_COLUMN = 5
+
+'''due_at returns when a habit row is due (a datetime; end of day for a date-only target), or None when it is complete or has no target date.'''
+def due_at(row, reference=None):
+    if len(row) <= TARGET_COLUMN or (len(row) > STATUS_COLUMN and row[STATUS_COLUMN] == "✅"):
+        return None
+    target = records.parse_target(row[TARGET_COLUMN], reference)
+    if target is None:
+        return None
+    return target if isinstance(target, datetime) else datetime.combine(target, time.max)
+
+class DueIndex:
+    '''Incomplete habits with a target date, sorted by when they are due.'''
+
+    def __init__(self, rows=(), reference=None):
+        self.reference = reference  # for year inference on rows not yet migrated to ISO dates
+        self.rebuild(rows)
+
+    def __len__(self):
+        return len(self._keys)
+
+    '''rebuild replaces the index with the given rows (one sort).'''
+    def rebuild(self, rows):
+        self._rows = {}  # habit ID (or "#position" for rows without one) -> (due, row)
+        self.unkeyed = 0
+        for position, row in enumerate(rows):
+            due = due_at(row, self.reference)
+            if due is None:
+                continue
+            key = row[ID_COLUMN] if len(row) > ID_COLUMN and row[ID_COLUMN] else f"#{position}"
+            self.unkeyed += key.startswith("#")
+            self._rows[key] = (due, list(row))
+        self._keys = sorted((due, habit_id) for habit_id, (due, _) in self._rows.items())
+
+    '''update adds or re-files rows after they were appended or changed; rows that are now complete or without a target date drop out. Rows without an ID are skipped.'''
+    def update(self, rows):
+        for row in rows:
+            if len(row) <= ID_COLUMN or not row[ID_COLUMN]:
+                continue
+            self.remove([row[ID_COLUMN]])
+            due = due_at(row, self.reference)
+            if due is not None:
+                self._rows[row[ID_COLUMN]] = (due, list(row))
+                bisect.insort(self._keys, (due, row[ID_COLUMN]))
+
+    '''remove drops the habits with the given IDs (unknown IDs are ignored).'''
+    def remove(self, habit_ids):
+        for habit_id in habit_ids:
+            entry = self._rows.pop(habit_id, None)
+            if entry is not None:
+                del self._keys[bisect.bisect_left(self._keys, (entry[0], habit_id))]
+
+    '''between returns the rows due in [start, end), soonest first.'''
+    def between(self, start, end):
+        first = bisect.bisect_left(self._keys, (start, ""))
+        last = bisect.bisect_left(self._keys, (end, ""), first)
+        return [list(self._rows[habit_id][1]) for _, habit_id in self._keys[first:last]]
+
+    '''overdue returns the rows that were due before now, oldest first.'''
+    def overdue(self, now):
+        return self.between(datetime.min, now)
+
+    '''upcoming returns the rows due from now until now + within (default a week), soonest first.'''
+    def upcoming(self, now, within=timedelta(days=7)):
+        return self.between(now, now + within)
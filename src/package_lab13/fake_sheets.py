@@ -0,0 +1,659 @@
+'''fake_sheets is a stateful, in-process stand-in for the parts of the Sheets v4 API this project uses.
+
+FakeSheetsServer answers HTTP requests the way sheets.googleapis.com would, and its
+http() method returns an httplib2-compatible transport. Installing it with
+sheets_client.use_transport (or the install() context manager) makes every client
+built by get_service talk to it, so the real googleapiclient request building and
+JSON handling still run. Nothing leaves the process and no credentials are needed.
+
+Supported: spreadsheets.create / get / batchUpdate (deleteDimension, addSheet, and the
+values of updateCells / appendCells; formatting requests are accepted and ignored) and values.get / batchGet / update /
+append / batchUpdate, plus multipart/mixed batches on /batch (the framing is checked strictly,
+so malformed batches fail with 400). Latency, quota (429) errors and replies lost after a request was applied are configurable. add_spreadsheet can seed
+sheets with any number of rows (100k+ is fine).
+
+Values written with valueInputOption=USER_ENTERED that start with "=" are kept as
+formulas. The only formulas evaluated are the FILTER formulas queries.py uses:
+=IFERROR(FILTER({ROW(range),range},condition,...),), with conditions range<>"text"
+and range="text". Their result spills over the cells to the right and below the formula
+on every read. Any other formula reads as #ERROR!.
+
+    server = FakeSheetsServer(latency=0.05)
+    spreadsheet_id = server.add_spreadsheet(rows=[["Drink water", "", "", "❌", ""]] * 100_000)
+    with server.install():
+        google_sheets.show_habits(creds, spreadsheet_id)
+    print(server.summary())
+'''
+import contextlib
+import email.parser
+import http.client
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import httplib2
+
+from package_lab13 import sheets_client
+
+# Most calls one batch request may carry
+MAX_BATCH_PARTS = 1000
+
+_A1_CELL = re.compile(r"^([A-Z]*)(\d*)$")
+
+'''parse_batch splits a multipart/mixed batch body into (content id, method, uri, body bytes) per inner request. Raises ValueError when the framing is wrong.'''
+def parse_batch(content_type, body):
+    if not content_type.startswith("multipart/mixed") or "boundary=" not in content_type:
+        raise ValueError("Batch requests must be multipart/mixed with a boundary")
+    message = email.parser.BytesParser().parsebytes(b"Content-Type: " + content_type.encode("ascii") + b"\r\n\r\n" + body)
+    if not message.is_multipart() or message.defects:
+        raise ValueError("Malformed multipart batch body")
+
+    parts = message.get_payload()
+    if not parts:
+        raise ValueError("Batch request has no parts")
+    if len(parts) > MAX_BATCH_PARTS:
+        raise ValueError(f"A batch may contain at most {MAX_BATCH_PARTS} requests")
+
+    calls = []
+    for part in parts:
+        content_id = part.get("Content-ID", "")
+        if part.get_content_type() != "application/http":
+            raise ValueError("Every batch part must be Content-Type: application/http")
+        if not (content_id.startswith("<") and content_id.endswith(">")):
+            raise ValueError("Every batch part needs a Content-ID")
+
+        request_line, _, rest = part.get_payload().replace("\r\n", "\n").partition("\n")
+        pieces = request_line.split(" ")
+        if len(pieces) != 3 or not pieces[2].startswith("HTTP/"):
+            raise ValueError(f"Bad request line in batch part: {request_line!r}")
+        method, path = pieces[0], pieces[1]
+        inner = email.parser.Parser().parsestr(rest)
+        host = inner.get("Host", "sheets.googleapis.com")
+        inner_body = inner.get_payload()
+        calls.append((content_id[1:-1], method, f"https://{host}{path}", inner_body.encode("utf-8") if inner_body else None))
+    return calls
+
+'''column_index converts column letters to a 0-based index ("A" -> 0, "AA" -> 26).'''
+def column_index(letters):
+    index = 0
+    for letter in letters:
+        index = index * 26 + (ord(letter) - ord("A") + 1)
+    return index - 1
+
+'''column_letters converts a 0-based column index back to letters.'''
+def column_letters(index):
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+'''parse_a1 splits an A1 range into (sheet title, first row, end row, first column, end column). Rows and columns are 0-based, ends are exclusive and None means "to the end of the sheet".'''
+def parse_a1(a1_range):
+    if "!" in a1_range:
+        title, cells = a1_range.rsplit("!", 1)
+    else:
+        title, cells = a1_range, ""
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+    if not cells:
+        return title, 0, None, 0, None
+
+    start, _, end = cells.partition(":")
+    start_col, start_row = _A1_CELL.match(start).groups()
+    first_col = column_index(start_col) if start_col else 0
+    first_row = int(start_row) - 1 if start_row else 0
+    if not end:
+        # A single cell such as "E5"; a bare column such as "A" is the whole column
+        return (title, first_row, first_row + 1 if start_row else None,
+                first_col, first_col + 1 if start_col else None)
+
+    end_col, end_row = _A1_CELL.match(end).groups()
+    return (title, first_row, int(end_row) if end_row else None,
+            first_col, column_index(end_col) + 1 if end_col else None)
+
+'''a1 formats a range the way the API echoes it back ("'Habit Tracker'!A2:E7").'''
+def a1(title, first_row, last_row, first_col, last_col):
+    quoted = "'" + title.replace("'", "''") + "'" if re.search(r"\W", title) else title
+    return f"{quoted}!{column_letters(first_col)}{first_row + 1}:{column_letters(last_col)}{last_row + 1}"
+
+_FILTER_FORMULA = re.compile(r"^=IFERROR\(FILTER\(\{ROW\((?P<rows>[^)]*)\),(?P<data>[^}]*)\},(?P<conditions>.*)\),\)$", re.S)
+_COMPARE_CONDITION = re.compile(r'^(?P<range>.+?)(?P<op><>|=)"(?P<text>[^"]*)"$')
+
+'''_split_arguments splits a formula argument list at top-level commas.'''
+def _split_arguments(text):
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char in "({":
+            depth += 1
+        elif not quoted and char in ")}":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    parts.append(current)
+    return parts
+
+'''_cell_value turns a CellData's userEnteredValue into the string a values read returns.'''
+def _cell_value(cell):
+    value = cell.get("userEnteredValue", {})
+    for kind in ("stringValue", "formulaValue"):
+        if kind in value:
+            return value[kind]
+    if "boolValue" in value:
+        return "TRUE" if value["boolValue"] else "FALSE"
+    if "numberValue" in value:
+        number = value["numberValue"]
+        return str(int(number)) if float(number).is_integer() else str(number)
+    return ""
+
+'''_user_entered tells whether a valueInputOption makes "=..." strings formulas.'''
+def _user_entered(value_input_option):
+    return value_input_option == "USER_ENTERED"
+
+'''_trim drops trailing empty cells and trailing empty rows, as the API does in values responses.'''
+def _trim(rows):
+    trimmed = []
+    for row in rows:
+        end = len(row)
+        while end and row[end - 1] in ("", None):
+            end -= 1
+        trimmed.append(row[:end])
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+'''_split_top splits a field mask on commas that are not inside parentheses.'''
+def _split_top(mask):
+    parts, depth, current = [], 0, ""
+    for char in mask:
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current += char
+    parts.append(current)
+    return [part.strip() for part in parts if part.strip()]
+
+'''parse_fields turns a partial-response mask such as "spreadsheetId,sheets.properties(sheetId,title)" into a nested dict (True = keep everything below).'''
+def parse_fields(mask):
+    tree = {}
+    for part in _split_top(mask):
+        sub = None
+        if part.endswith(")") and "(" in part:
+            part, sub = part[:part.index("(")], part[part.index("(") + 1:-1]
+        keys = part.split(".")
+        node = tree
+        for key in keys[:-1]:
+            child = node.setdefault(key, {})
+            if child is True:
+                break
+            node = child
+        else:
+            if sub is None:
+                node[keys[-1]] = True
+            elif node.get(keys[-1]) is not True:
+                node.setdefault(keys[-1], {}).update(parse_fields(sub))
+    return tree
+
+'''apply_fields keeps only the parts of a response selected by a parsed field mask.'''
+def apply_fields(tree, value):
+    if tree is True:
+        return value
+    if isinstance(value, list):
+        return [apply_fields(tree, item) for item in value]
+    if isinstance(value, dict):
+        return {key: apply_fields(sub, value[key]) for key, sub in tree.items() if key in value}
+    return value
+
+class FakeSheetsError(Exception):
+    '''Raised inside a handler to produce an API error response.'''
+
+    def __init__(self, status, message, reason="FAILED_PRECONDITION", headers=None):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.headers = headers or {}
+
+class FakeHttp:
+    '''httplib2.Http look-alike that sends every request to a FakeSheetsServer.'''
+
+    def __init__(self, server):
+        self.server = server
+        self.timeout = None
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        return self.server.request(uri, method, body, headers or {})
+
+class FakeSheetsServer:
+    '''In-memory Sheets v4 backend.
+
+    latency        seconds to sleep per request (a float, or a callable returning one)
+    quota_error_rate  probability (0-1) that a request fails with 429 RESOURCE_EXHAUSTED
+    retry_after    value of the Retry-After header sent with quota errors (None = no header)
+    seed           seed for the error-rate random generator, for repeatable runs
+    '''
+
+    def __init__(self, latency=0.0, quota_error_rate=0.0, retry_after=None, seed=None):
+        self.latency = latency
+        self.quota_error_rate = quota_error_rate
+        self.retry_after = retry_after
+        self.spreadsheets = {}  # spreadsheet_id -> {"properties": {...}, "sheets": {title: sheet}}
+        self.log = []  # one dict per request: op, method, uri, status, request_bytes, response_bytes
+        self._forced_errors = []  # statuses to return for the next requests, in order
+        self._dropped_replies = 0  # next requests that are applied but answered with a timeout
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._sheet_ids = itertools.count(0)
+        self._lock = threading.RLock()
+
+    # ----- setup helpers -----
+
+    '''add_spreadsheet creates a spreadsheet directly (no request is logged). rows are the data rows under the header; returns the spreadsheet ID.'''
+    def add_spreadsheet(self, title="Habit Tracker", rows=(), sheet_name="Habit Tracker", header=True, spreadsheet_id=None):
+        with self._lock:
+            spreadsheet_id = spreadsheet_id or f"fake-{next(self._ids)}"
+            self.spreadsheets[spreadsheet_id] = {"properties": {"title": title}, "sheets": {}}
+            sheet = self._add_sheet(spreadsheet_id, sheet_name)
+            if header:
+                sheet["rows"].append(["Task", "Date Created", "Target Completion Date", "Completion Status", "Updated", "ID"])
+            sheet["rows"].extend(list(row) for row in rows)
+            return spreadsheet_id
+
+    '''rows returns the stored rows of one tab (including the header row), for assertions.'''
+    def rows(self, spreadsheet_id, sheet_name="Habit Tracker"):
+        return self.spreadsheets[spreadsheet_id]["sheets"][sheet_name]["rows"]
+
+    '''fail_next makes the next `count` requests fail with the given HTTP status.'''
+    def fail_next(self, count=1, status=429):
+        with self._lock:
+            self._forced_errors.extend([status] * count)
+
+    '''drop_reply_next applies the next `count` requests but raises TimeoutError instead of answering them, as when a reply is lost on the way back.'''
+    def drop_reply_next(self, count=1):
+        with self._lock:
+            self._dropped_replies += count
+
+    '''http returns a transport for googleapiclient.discovery.build(http=...).'''
+    def http(self):
+        return FakeHttp(self)
+
+    '''install routes every client built by sheets_client to this server until the block exits.'''
+    @contextlib.contextmanager
+    def install(self):
+        previous = sheets_client.use_transport(self.http())
+        try:
+            yield self
+        finally:
+            sheets_client.use_transport(previous)
+
+    '''summary aggregates the request log into per-operation counts and byte totals.'''
+    def summary(self):
+        totals = {}
+        for entry in self.log:
+            op = totals.setdefault(entry["op"], {"requests": 0, "request_bytes": 0, "response_bytes": 0, "errors": 0})
+            op["requests"] += 1
+            op["request_bytes"] += entry["request_bytes"]
+            op["response_bytes"] += entry["response_bytes"]
+            op["errors"] += entry["status"] >= 400
+        return totals
+
+    '''reset_log clears the request log (the spreadsheets are kept).'''
+    def reset_log(self):
+        with self._lock:
+            self.log.clear()
+
+    # ----- HTTP entry point -----
+
+    '''request handles one HTTP request and returns (httplib2.Response, body bytes) like httplib2.Http.request.'''
+    def request(self, uri, method="GET", body=None, headers=None):
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        request_bytes = len(uri) + len(body or b"")
+        override = {key.lower(): value for key, value in (headers or {}).items()}.get("x-http-method-override")
+        if method == "POST" and override == "GET":
+            # googleapiclient sends GETs with very long URLs (e.g. many batchGet ranges) this way
+            uri, method, body = f"{uri}?{body.decode('utf-8')}", "GET", None
+        if method == "POST" and urlsplit(uri).path == "/batch":
+            op, status, response_headers, content = self._batch(body, headers or {})
+        else:
+            op, status, response_headers, content = self._dispatch(uri, method, body)
+
+        self.log.append({
+            "op": op,
+            "method": method,
+            "uri": uri,
+            "status": status,
+            "request_bytes": request_bytes,
+            "response_bytes": len(content),
+        })
+        with self._lock:
+            dropped, self._dropped_replies = self._dropped_replies > 0, max(self._dropped_replies - 1, 0)
+        if dropped:
+            raise TimeoutError("timed out waiting for the reply (fake_sheets.drop_reply_next)")
+        response_headers["status"] = str(status)
+        return httplib2.Response(response_headers), content
+
+    '''_dispatch runs one API call and returns (op, status, response headers, body bytes).'''
+    def _dispatch(self, uri, method, body):
+        parts = urlsplit(uri)
+        query = parse_qs(parts.query)
+        op = "unknown"
+        response_headers = {"content-type": "application/json; charset=UTF-8"}
+        try:
+            with self._lock:
+                op, handler, args = self._route(method, parts.path)
+                self._maybe_fail()
+                payload = handler(query, json.loads(body) if body else {}, *args)
+            if "fields" in query:
+                payload = apply_fields(parse_fields(query["fields"][0]), payload)
+            status = 200
+        except FakeSheetsError as error:
+            status = error.status
+            response_headers.update(error.headers)
+            payload = {"error": {"code": error.status, "message": str(error), "status": error.reason}}
+        return op, status, response_headers, json.dumps(payload).encode("utf-8")
+
+    # ----- batch requests -----
+
+    '''_batch answers a multipart/mixed batch: every part must be an application/http request with a Content-ID. Each inner call is handled (and can fail) on its own and is logged with batched=True and zero bytes, since its bytes travel inside the "batch" entry.'''
+    def _batch(self, body, headers):
+        content_type = {k.lower(): v for k, v in headers.items()}.get("content-type", "")
+        try:
+            calls = parse_batch(content_type, body or b"")
+        except ValueError as error:
+            payload = {"error": {"code": 400, "message": str(error), "status": "INVALID_ARGUMENT"}}
+            return "batch", 400, {"content-type": "application/json; charset=UTF-8"}, json.dumps(payload).encode("utf-8")
+
+        boundary = f"batch_{self._random.getrandbits(64):016x}"
+        out = []
+        for content_id, method, uri, inner_body in calls:
+            op, status, inner_headers, content = self._dispatch(uri, method, inner_body)
+            self.log.append({"op": op, "method": method, "uri": uri, "status": status,
+                             "request_bytes": 0, "response_bytes": 0, "batched": True})
+            header_lines = "".join(f"{name}: {value}\r\n" for name, value in inner_headers.items())
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {http.client.responses.get(status, '')}\r\n{header_lines}\r\n"
+                f"{content.decode('utf-8')}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        return "batch", 200, {"content-type": f"multipart/mixed; boundary={boundary}"}, "".join(out).encode("utf-8")
+
+    def _maybe_fail(self):
+        if self._forced_errors:
+            status = self._forced_errors.pop(0)
+        elif self.quota_error_rate and self._random.random() < self.quota_error_rate:
+            status = 429
+        else:
+            return
+        headers = {}
+        if self.retry_after is not None:
+            headers["retry-after"] = str(self.retry_after)
+        if status == 429:
+            raise FakeSheetsError(429, "Quota exceeded for quota metric 'Requests' (fake).", "RESOURCE_EXHAUSTED", headers)
+        raise FakeSheetsError(status, "The service is currently unavailable (fake).", "UNAVAILABLE", headers)
+
+    def _route(self, method, path):
+        path = unquote(path)
+        if not path.startswith("/v4/spreadsheets"):
+            raise FakeSheetsError(404, f"Unknown path {path}", "NOT_FOUND")
+        rest = path[len("/v4/spreadsheets"):].lstrip("/")
+
+        if not rest:
+            if method == "POST":
+                return "spreadsheets.create", self._create, ()
+            raise FakeSheetsError(405, "Method not allowed", "INVALID_ARGUMENT")
+
+        spreadsheet_id, _, rest = rest.partition("/")
+        if ":" in spreadsheet_id:
+            spreadsheet_id, action = spreadsheet_id.split(":", 1)
+            if action == "batchUpdate" and method == "POST":
+                return "spreadsheets.batchUpdate", self._batch_update, (self._spreadsheet(spreadsheet_id), spreadsheet_id)
+            raise FakeSheetsError(404, f"Unknown action {action}", "NOT_FOUND")
+
+        spreadsheet = self._spreadsheet(spreadsheet_id)
+        if not rest:
+            return "spreadsheets.get", self._get, (spreadsheet, spreadsheet_id)
+
+        if rest.startswith("values:"):
+            action = rest[len("values:"):]
+            if action == "batchUpdate":
+                return "values.batchUpdate", self._values_batch_update, (spreadsheet, spreadsheet_id)
+            if action == "batchGet" and method == "GET":
+                return "values.batchGet", self._values_batch_get, (spreadsheet, spreadsheet_id)
+            raise FakeSheetsError(404, f"Unknown action {action}", "NOT_FOUND")
+
+        if rest.startswith("values/"):
+            a1_range = rest[len("values/"):]
+            if a1_range.endswith(":append"):
+                return "values.append", self._values_append, (spreadsheet, spreadsheet_id, a1_range[:-len(":append")])
+            if method == "GET":
+                return "values.get", self._values_get, (spreadsheet, a1_range)
+            if method == "PUT":
+                return "values.update", self._values_update, (spreadsheet, spreadsheet_id, a1_range)
+
+        raise FakeSheetsError(404, f"Unknown path {path}", "NOT_FOUND")
+
+    # ----- spreadsheets -----
+
+    def _spreadsheet(self, spreadsheet_id):
+        spreadsheet = self.spreadsheets.get(spreadsheet_id)
+        if spreadsheet is None:
+            raise FakeSheetsError(404, "Requested entity was not found.", "NOT_FOUND")
+        return spreadsheet
+
+    def _add_sheet(self, spreadsheet_id, title, sheet_id=None):
+        sheets = self.spreadsheets[spreadsheet_id]["sheets"]
+        if title in sheets:
+            raise FakeSheetsError(400, f"A sheet with the name \"{title}\" already exists.", "INVALID_ARGUMENT")
+        sheet = {
+            "properties": {"sheetId": next(self._sheet_ids) if sheet_id is None else sheet_id, "title": title, "index": len(sheets)},
+            "rows": [],
+            "formulas": {},  # (row, col) -> formula text, for cells written as USER_ENTERED formulas
+        }
+        sheets[title] = sheet
+        return sheet
+
+    def _sheet(self, spreadsheet, title):
+        sheet = spreadsheet["sheets"].get(title)
+        if sheet is None:
+            raise FakeSheetsError(400, f"Unable to parse range: {title}", "INVALID_ARGUMENT")
+        return sheet
+
+    def _sheet_by_id(self, spreadsheet, sheet_id):
+        for sheet in spreadsheet["sheets"].values():
+            if sheet["properties"]["sheetId"] == sheet_id:
+                return sheet
+        raise FakeSheetsError(400, f"No grid with id: {sheet_id}", "INVALID_ARGUMENT")
+
+    def _resource(self, spreadsheet, spreadsheet_id):
+        sheets = []
+        for sheet in spreadsheet["sheets"].values():
+            properties = dict(sheet["properties"])
+            properties["gridProperties"] = {
+                "rowCount": max(len(sheet["rows"]), 1000),
+                "columnCount": max((len(row) for row in sheet["rows"]), default=26),
+            }
+            sheets.append({"properties": properties})
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "properties": spreadsheet["properties"],
+            "sheets": sheets,
+            "spreadsheetUrl": f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit",
+        }
+
+    def _create(self, query, body):
+        spreadsheet_id = f"fake-{next(self._ids)}"
+        properties = body.get("properties", {"title": "Untitled spreadsheet"})
+        self.spreadsheets[spreadsheet_id] = {"properties": dict(properties), "sheets": {}}
+        for sheet in body.get("sheets") or [{"properties": {"title": "Sheet1"}}]:
+            self._add_sheet(spreadsheet_id, sheet["properties"]["title"], sheet["properties"].get("sheetId"))
+        return self._resource(self.spreadsheets[spreadsheet_id], spreadsheet_id)
+
+    def _get(self, query, body, spreadsheet, spreadsheet_id):
+        return self._resource(spreadsheet, spreadsheet_id)
+
+    def _batch_update(self, query, body, spreadsheet, spreadsheet_id):
+        replies = []
+        for request in body.get("requests", []):
+            (kind, params), = request.items()
+            if kind == "deleteDimension":
+                grid = params["range"]
+                if grid.get("dimension") == "ROWS":
+                    rows = self._sheet_by_id(spreadsheet, grid["sheetId"])["rows"]
+                    del rows[grid.get("startIndex", 0):grid.get("endIndex", len(rows))]
+                replies.append({})
+            elif kind == "addSheet":
+                properties = params.get("properties", {})
+                sheet = self._add_sheet(spreadsheet_id, properties.get("title", f"Sheet{len(spreadsheet['sheets']) + 1}"), properties.get("sheetId"))
+                replies.append({"addSheet": {"properties": sheet["properties"]}})
+            elif kind in ("updateCells", "appendCells") and "userEnteredValue" in params.get("fields", ""):
+                sheet = self._sheet_by_id(spreadsheet, params["start"]["sheetId"] if kind == "updateCells" else params["sheetId"])
+                if kind == "updateCells":
+                    first_row, first_col = params["start"].get("rowIndex", 0), params["start"].get("columnIndex", 0)
+                else:
+                    first_row, first_col = len(_trim(sheet["rows"])), 0
+                values = [[_cell_value(cell) for cell in row.get("values", [])] for row in params.get("rows", [])]
+                self._write(spreadsheet, a1(sheet["properties"]["title"], first_row, first_row, first_col, first_col), values)
+                replies.append({})
+            elif kind in ("repeatCell", "updateSheetProperties", "updateDimensionProperties", "updateCells"):
+                replies.append({})  # formatting only; nothing to store
+            else:
+                raise FakeSheetsError(400, f"Unsupported request {kind} (fake)", "INVALID_ARGUMENT")
+        return {"spreadsheetId": spreadsheet_id, "replies": replies}
+
+    # ----- values -----
+
+    '''_grid returns the rows of a sheet as a reader sees them, with formula results spilled in.'''
+    def _grid(self, spreadsheet, title):
+        sheet = self._sheet(spreadsheet, title)
+        if not sheet["formulas"]:
+            return sheet["rows"]
+        rows = [list(row) for row in sheet["rows"]]
+        for (row_index, col), formula in sorted(sheet["formulas"].items()):
+            for offset, values in enumerate(self._evaluate(spreadsheet, title, formula)):
+                while len(rows) <= row_index + offset:
+                    rows.append([])
+                row = rows[row_index + offset]
+                if len(row) < col + len(values):
+                    row.extend([""] * (col + len(values) - len(row)))
+                row[col:col + len(values)] = values
+        return rows
+
+    '''_evaluate computes a FILTER formula (see the module docstring) and returns its result rows.'''
+    def _evaluate(self, spreadsheet, title, formula):
+        match = _FILTER_FORMULA.match(formula)
+        if not match:
+            return [["#ERROR!"]]
+
+        def column(a1_range):
+            sheet_title, first_row, _, first_col, _ = parse_a1(a1_range if "!" in a1_range else f"{title}!{a1_range}")
+            rows = self._sheet(spreadsheet, sheet_title)["rows"]
+            return lambda i: (rows[first_row + i][first_col] if first_row + i < len(rows) and first_col < len(rows[first_row + i]) else "")
+
+        data_title, first_row, _, first_col, end_col = parse_a1(match.group("data"))
+        data_rows = self._sheet(spreadsheet, data_title)["rows"]
+        tests = []
+        for condition in _split_arguments(match.group("conditions")):
+            condition = condition.strip()
+            compare = _COMPARE_CONDITION.match(condition)
+            if compare:
+                values, text, equal = column(compare.group("range")), compare.group("text"), compare.group("op") == "="
+                tests.append(lambda i, values=values, text=text, equal=equal: (values(i) == text) == equal)
+            else:
+                return [["#ERROR!"]]
+
+        result = []
+        for i in range(max(len(data_rows) - first_row, 0)):
+            if all(test(i) for test in tests):
+                row = data_rows[first_row + i][first_col:end_col]
+                width = (end_col - first_col) if end_col is not None else len(row)
+                result.append([str(first_row + i + 1)] + list(row) + [""] * (width - len(row)))
+        return result or [[""]]
+
+    def _read(self, spreadsheet, a1_range):
+        title, first_row, end_row, first_col, end_col = parse_a1(a1_range)
+        rows = self._grid(spreadsheet, title)
+        selected = [row[first_col:end_col] for row in rows[first_row:end_row]]
+        return _trim(selected)
+
+    def _write(self, spreadsheet, a1_range, values, user_entered=False):
+        title, first_row, _, first_col, _ = parse_a1(a1_range)
+        sheet = self._sheet(spreadsheet, title)
+        rows, formulas = sheet["rows"], sheet["formulas"]
+        for offset, new_values in enumerate(values):
+            index = first_row + offset
+            while len(rows) <= index:
+                rows.append([])
+            row = rows[index]
+            if len(row) < first_col + len(new_values):
+                row.extend([""] * (first_col + len(new_values) - len(row)))
+            row[first_col:first_col + len(new_values)] = ["" if v is None else v for v in new_values]
+            for col, value in enumerate(new_values, start=first_col):
+                if user_entered and isinstance(value, str) and value.startswith("="):
+                    formulas[(index, col)] = value
+                else:
+                    formulas.pop((index, col), None)
+        width = max((len(v) for v in values), default=0)
+        return {
+            "spreadsheetId": None,
+            "updatedRange": a1(title, first_row, first_row + max(len(values), 1) - 1, first_col, first_col + max(width, 1) - 1),
+            "updatedRows": len(values),
+            "updatedColumns": width,
+            "updatedCells": sum(len(v) for v in values),
+        }
+
+    def _values_get(self, query, body, spreadsheet, a1_range):
+        return {"range": a1_range, "majorDimension": "ROWS", "values": self._read(spreadsheet, a1_range)}
+
+    def _values_batch_get(self, query, body, spreadsheet, spreadsheet_id):
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "valueRanges": [self._values_get(query, body, spreadsheet, a1_range) for a1_range in query.get("ranges", [])],
+        }
+
+    def _values_update(self, query, body, spreadsheet, spreadsheet_id, a1_range):
+        result = self._write(spreadsheet, a1_range, body.get("values", []), _user_entered(query.get("valueInputOption", [""])[0]))
+        result["spreadsheetId"] = spreadsheet_id
+        return result
+
+    def _values_append(self, query, body, spreadsheet, spreadsheet_id, a1_range):
+        title, first_row, _, first_col, _ = parse_a1(a1_range)
+        rows = self._sheet(spreadsheet, title)["rows"]
+        # The table is the sheet's data; new rows go after the last non-empty row
+        last = len(rows)
+        while last and not any(cell not in ("", None) for cell in rows[last - 1]):
+            last -= 1
+        start = max(last, first_row)
+        target = a1(title, start, start, first_col, first_col)
+        updates = self._write(spreadsheet, target, body.get("values", []), _user_entered(query.get("valueInputOption", [""])[0]))
+        updates["spreadsheetId"] = spreadsheet_id
+        return {"spreadsheetId": spreadsheet_id, "tableRange": a1(title, first_row, max(last - 1, first_row), first_col, first_col), "updates": updates}
+
+    def _values_batch_update(self, query, body, spreadsheet, spreadsheet_id):
+        user_entered = _user_entered(body.get("valueInputOption"))
+        responses = [self._write(spreadsheet, data["range"], data.get("values", []), user_entered) for data in body.get("data", [])]
+        for response in responses:
+            response["spreadsheetId"] = spreadsheet_id
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "totalUpdatedRows": sum(r["updatedRows"] for r in responses),
+            "totalUpdatedCells": sum(r["updatedCells"] for r in responses),
+            "responses": responses,
+        }
@@ -1,14 +1,150 @@
-from datetime import datetime
+import os
+import uuid
+from datetime import date, datetime
+from itertools import islice
 import pytz
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from datetime import datetime
-from googleapiclient.discovery import build
+from package_lab13 import records, sheets_client
+from package_lab13.row_cache import first_updated_row, habit_index, habit_rows
+from package_lab13.write_buffer import COLUMNS, WriteBuffer
+
+# Column indices of a habit row (0 = column A), for projected reads (see get_sheet_data)
+TASK_COLUMN = 0
+CREATED_COLUMN = 1
+TARGET_COLUMN = 2
+STATUS_COLUMN = 3
+UPDATED_COLUMN = 4
+# Hidden column F holds a stable ID per habit, so writes can find a habit after other rows moved
+ID_COLUMN = 5
+HABIT_RANGE = 'Habit Tracker!A2:F'
+
+# Habits per page in show_habits, and rows per request when streaming with iter_habit_rows
+PAGE_SIZE = int(os.environ.get("HABIT_TRACKER_PAGE_SIZE", "20"))
+
+'''new_habit_id returns a fresh random habit ID.'''
+def new_habit_id():
+    return uuid.uuid4().hex[:12]
+
+'''habit_id_of returns the ID stored in a habit row, or "" for rows written before IDs existed.'''
+def habit_id_of(row):
+    return row[ID_COLUMN] if len(row) > ID_COLUMN else ""
+
+'''build is googleapiclient.discovery.build, imported on first use so that importing this module (and main) stays fast.'''
+def build(*args, **kwargs):
+    from googleapiclient.discovery import build
+    return build(*args, **kwargs)
+
+'''get_service returns the shared Sheets client for creds (built once per credential, see sheets_client).'''
+def get_service(creds):
+    return sheets_client.get_service(creds, build)
+
+# Sheet title -> sheetId for every spreadsheet we have seen, so deletes don't need a metadata fetch
+_sheet_ids = {}
+
+'''remember_sheet_ids records the title -> sheetId mapping from a spreadsheets().get/create response.'''
+def remember_sheet_ids(spreadsheet_id, spreadsheet):
+    ids = _sheet_ids.setdefault(spreadsheet_id, {})
+    for sheet in spreadsheet.get("sheets", []):
+        properties = sheet.get("properties", {})
+        if "title" in properties and "sheetId" in properties:
+            ids[properties["title"]] = properties["sheetId"]
+
+'''get_sheet_id returns the sheetId of the named tab, asking the API for only sheets.properties(sheetId,title) on a cache miss. Returns None if there is no such tab.'''
+def get_sheet_id(creds, spreadsheet_id, sheet_name='Habit Tracker'):
+    ids = _sheet_ids.get(spreadsheet_id, {})
+    if sheet_name not in ids:
+        spreadsheet = sheets_client.execute(get_service(creds).spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields='sheets.properties(sheetId,title)'
+        ), "spreadsheets.get")
+        _sheet_ids.pop(spreadsheet_id, None)  # tabs may have been renamed; start from the fresh listing
+        remember_sheet_ids(spreadsheet_id, spreadsheet)
+        ids = _sheet_ids[spreadsheet_id]
+    return ids.get(sheet_name)
+
+'''check_spreadsheets looks up many spreadsheets with batched spreadsheets().get calls (see batching). Returns {spreadsheet_id: None if accessible, else the error}; the tab IDs of accessible ones are remembered like is_valid_spreadsheet does.'''
+def check_spreadsheets(creds, spreadsheet_ids):
+    from package_lab13.batching import RequestBatch
+    service = get_service(creds)
+    batch = RequestBatch(service)
+    problems = {}
+
+    def on_result(spreadsheet_id, result, error):
+        problems[spreadsheet_id] = error
+        if error is None:
+            remember_sheet_ids(spreadsheet_id, result)
+
+    for spreadsheet_id in dict.fromkeys(spreadsheet_ids):
+        batch.add(service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields='sheets.properties(sheetId,title)'
+        ), "spreadsheets.get", callback=lambda result, error, sid=spreadsheet_id: on_result(sid, result, error))
+    batch.execute()
+    return problems
+
+'''get_many_sheet_data reads the habit rows of many spreadsheets with batched values().get calls, skipping ones already cached. Returns {spreadsheet_id: rows or the error}.'''
+def get_many_sheet_data(creds, spreadsheet_ids):
+    from package_lab13.batching import RequestBatch
+    service = get_service(creds)
+    batch = RequestBatch(service)
+    range_name = HABIT_RANGE
+    data = {}
+
+    def on_result(spreadsheet_id, result, error):
+        if error is not None:
+            data[spreadsheet_id] = error
+            return
+        data[spreadsheet_id] = result.get('values', [])
+        _remember_rows(spreadsheet_id, data[spreadsheet_id])
+
+    for spreadsheet_id in dict.fromkeys(spreadsheet_ids):
+        cached = habit_rows.get(spreadsheet_id)
+        if cached is not None:
+            data[spreadsheet_id] = cached
+            continue
+        batch.add(service.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=range_name
+        ), "values.get", range_name, callback=lambda result, error, sid=spreadsheet_id: on_result(sid, result, error))
+    batch.execute()
+    return data
+
+# Writes this process made to each spreadsheet's habit rows, so state derived from the rows
+# (e.g. stores.SheetsStore's due index) can tell when it has gone stale
+_write_counts = {}
+
+'''write_count returns how many writes this process has made to a spreadsheet's habit rows so far.'''
+def write_count(spreadsheet_id):
+    return _write_counts.get(spreadsheet_id, 0)
+
+'''_wrote counts one write to a spreadsheet's habit rows (see write_count).'''
+def _wrote(spreadsheet_id):
+    _write_counts[spreadsheet_id] = _write_counts.get(spreadsheet_id, 0) + 1
+
+'''_remember_rows caches a full read of the habit rows and rebuilds the ID -> row index map from it.'''
+def _remember_rows(spreadsheet_id, rows):
+    habit_rows.store(spreadsheet_id, rows)
+    habit_index.rebuild(spreadsheet_id, [habit_id_of(row) for row in rows])
+
+'''record_append applies rows written with values().append to the row cache and the ID index.'''
+def record_append(spreadsheet_id, rows, response):
+    _wrote(spreadsheet_id)
+    habit_rows.append(spreadsheet_id, rows, response)
+    first_row = first_updated_row(response)
+    if first_row is not None:
+        habit_index.add(spreadsheet_id, first_row - 2, [habit_id_of(row) for row in rows])
+
+'''_flush sends the buffered writes in one batchUpdate and applies them to the row cache.'''
+def _flush(service, spreadsheet_id, buffer):
+    runs = buffer.runs()
+    response = buffer.flush(service, spreadsheet_id)
+    _wrote(spreadsheet_id)
+    for row, col, values in runs:
+        habit_rows.update_cells(spreadsheet_id, row - 2, col, values)
+    return response
 
 def create_sheet(creds, title: str):
     """Create a new Google Sheet with formatted headers of equal width and centered text."""
-    service = build('sheets', 'v4', credentials=creds)
+    service = get_service(creds)
 
     # Create a new spreadsheet
     spreadsheet_body = {
@@ -16,25 +152,26 @@ def create_sheet(creds, title: str):
         'sheets': [{'properties': {'title': 'Habit Tracker'}}]
     }
 
-    spreadsheet = service.spreadsheets().create(
+    spreadsheet = sheets_client.execute(service.spreadsheets().create(
         body=spreadsheet_body,
         fields='spreadsheetId,sheets.properties.sheetId'
-    ).execute()
+    ), "spreadsheets.create")
 
     spreadsheet_id = spreadsheet['spreadsheetId']
     sheet_id = spreadsheet['sheets'][0]['properties']['sheetId']
     sheet_name = 'Habit Tracker'
+    _sheet_ids[spreadsheet_id] = {sheet_name: sheet_id}
 
     # Header values
-    headers = [["Task", "Date Created", "Target Completion Date", "Completion Status", "Updated"]]
-    header_range = f"{sheet_name}!A1:E1"
+    headers = [["Task", "Date Created", "Target Completion Date", "Completion Status", "Updated", "ID"]]
+    header_range = f"{sheet_name}!A1:F1"
 
-    service.spreadsheets().values().update(
+    sheets_client.execute(service.spreadsheets().values().update(
         spreadsheetId=spreadsheet_id,
         range=header_range,
         valueInputOption="RAW",
         body={"values": headers}
-    ).execute()
+    ), "values.update", header_range)
 
     # Apply formatting and fixed column widths
     requests = [
@@ -83,100 +220,313 @@ def create_sheet(creds, title: str):
             }
         })
 
+    # The habit ID column (F) is bookkeeping, so keep it out of sight
+    requests.append({
+        "updateDimensionProperties": {
+            "range": {
+                "sheetId": sheet_id,
+                "dimension": "COLUMNS",
+                "startIndex": ID_COLUMN,
+                "endIndex": ID_COLUMN + 1
+            },
+            "properties": {"hiddenByUser": True},
+            "fields": "hiddenByUser"
+        }
+    })
+
     # Send batch update
-    service.spreadsheets().batchUpdate(
+    sheets_client.execute(service.spreadsheets().batchUpdate(
         spreadsheetId=spreadsheet_id,
         body={"requests": requests}
-    ).execute()
+    ), "spreadsheets.batchUpdate")
+
+    habit_rows.store(spreadsheet_id, [])  # a brand-new sheet has no habits yet
 
     return spreadsheet_id
 
 
-'''get_sheet_data retrieves data from a Google Sheet using the Google Sheets API.'''
-def get_sheet_data(creds, spreadsheet_id):
-    service = build('sheets', 'v4', credentials=creds)
+'''get_sheet_data retrieves data from a Google Sheet using the Google Sheets API, serving it from the row cache when possible. Pass columns (column indices such as STATUS_COLUMN) and/or a row window (start = first data row index, count = number of rows) to fetch only that part of the sheet, see read_projection.'''
+def get_sheet_data(creds, spreadsheet_id, columns=None, start=0, count=None):
+    if columns is not None or start or count is not None:
+        return read_projection(creds, spreadsheet_id, columns, start, count)
 
-    range_name = 'Habit Tracker!A2:E'  # Adjust range as needed
+    cached = habit_rows.get(spreadsheet_id)
+    if cached is not None:
+        return cached
+
+    service = get_service(creds)
+
+    range_name = HABIT_RANGE  # A-E plus the hidden habit ID column
     sheet = service.spreadsheets()
-    result = sheet.values().get(
+    result = sheets_client.execute(sheet.values().get(
         spreadsheetId=spreadsheet_id,
         range=range_name
-    ).execute()
+    ), "values.get", range_name)
 
     values = result.get('values', [])
+    _remember_rows(spreadsheet_id, values)
     return values
 
-def show_habits(creds, spreadsheet_id):
-    data = get_sheet_data(creds, spreadsheet_id)
-    if is_habits_empty(data):
+'''read_projection reads only the given columns of data rows [start, start + count) (count None = to the end). Rows are shaped like get_sheet_data's, with index 0 being data row `start` and unrequested columns left empty, so row[STATUS_COLUMN] works as usual. Adjacent columns share one range and separate groups go out together in one values().batchGet. Served from the row cache when it holds those columns; a read of every row is cached as a projection (row_cache.RowCache.store), a window is not.'''
+def read_projection(creds, spreadsheet_id, columns=None, start=0, count=None, sheet_name='Habit Tracker'):
+    columns = sorted(set(range(ID_COLUMN + 1) if columns is None else columns))
+    if start < 0 or (count is not None and count < 0):
+        raise ValueError("start and count must not be negative")
+    end = None if count is None else start + count
+    if end == start:
+        return []
+
+    cached = habit_rows.get(spreadsheet_id, columns)
+    if cached is not None:
+        return [_project(row, columns) for row in cached[start:end]]
+
+    # The row count comes from the longest requested column (the API drops trailing empty rows)
+    runs = _column_runs(columns)
+    last_row = "" if end is None else end + 1
+    ranges = [f"{sheet_name}!{COLUMNS[first]}{start + 2}:{COLUMNS[last]}{last_row}" for first, last in runs]
+    values = get_service(creds).spreadsheets().values()
+    if len(ranges) == 1:
+        result = sheets_client.execute(values.get(
+            spreadsheetId=spreadsheet_id,
+            range=ranges[0]
+        ), "values.get", ranges[0])
+        blocks = [result.get('values', [])]
+    else:
+        result = sheets_client.execute(values.batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=ranges
+        ), "values.batchGet", ",".join(ranges))
+        blocks = [value_range.get('values', []) for value_range in result.get('valueRanges', [])]
+
+    rows = [[""] * (columns[-1] + 1) for _ in range(max((len(block) for block in blocks), default=0))]
+    for (first, _), block in zip(runs, blocks):
+        for row, values_row in zip(rows, block):
+            row[first:first + len(values_row)] = values_row
+    rows = [_trim_row(row) for row in rows]
+
+    if start == 0 and end is None:
+        habit_rows.store(spreadsheet_id, rows, columns)
+    if ID_COLUMN in columns:
+        ids = [habit_id_of(row) for row in rows]
+        if start == 0 and end is None:
+            habit_index.rebuild(spreadsheet_id, ids)
+        else:
+            habit_index.add(spreadsheet_id, start, ids)
+    return rows
+
+'''iter_habit_rows yields habit rows from data row `start` on, fetching `window` rows per request only as the caller asks for them, so memory stays at one window however long the sheet is. columns works as in read_projection; include TASK_COLUMN so a row with empty projected cells does not end the stream early.'''
+def iter_habit_rows(creds, spreadsheet_id, columns=None, start=0, window=None):
+    window = window or PAGE_SIZE
+    while True:
+        rows = read_projection(creds, spreadsheet_id, columns, start, window)
+        yield from rows
+        if len(rows) < window:
+            return
+        start += window
+
+'''_column_runs groups sorted column indices into (first, last) runs of adjacent columns.'''
+def _column_runs(columns):
+    runs = []
+    for col in columns:
+        if runs and runs[-1][1] == col - 1:
+            runs[-1][1] = col
+        else:
+            runs.append([col, col])
+    return [tuple(run) for run in runs]
+
+'''_project keeps only the given columns of a full row, blanking the rest.'''
+def _project(row, columns):
+    projected = [""] * (columns[-1] + 1)
+    for col in columns:
+        if col < len(row):
+            projected[col] = row[col]
+    return _trim_row(projected)
+
+'''_trim_row drops trailing empty cells, as the API does.'''
+def _trim_row(row):
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+'''locate_habits finds the current row of each habit ID and returns {habit_id: (data row index, row)}. Known positions are confirmed with one values().batchGet of just those rows; only when a habit has moved (or was never seen) is the whole sheet read again. Raises ValueError for IDs that are not in the sheet.'''
+def locate_habits(creds, spreadsheet_id, habit_ids, sheet_name='Habit Tracker'):
+    habit_ids = list(dict.fromkeys(habit_ids))
+    located = {}
+    known = [(hid, habit_index.get(spreadsheet_id, hid)) for hid in habit_ids]
+    known = [(hid, index) for hid, index in known if index is not None]
+    if known:
+        ranges = [f"{sheet_name}!A{index + 2}:F{index + 2}" for _, index in known]
+        result = sheets_client.execute(get_service(creds).spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=ranges
+        ), "values.batchGet", ",".join(ranges))
+        for (hid, index), value_range in zip(known, result.get("valueRanges", [])):
+            rows = value_range.get("values", [])
+            if rows and habit_id_of(rows[0]) == hid:
+                located[hid] = (index, rows[0])
+
+    missing = [hid for hid in habit_ids if hid not in located]
+    if missing:
+        # Rows moved under us (or this process never read the sheet): cached positions are stale
+        habit_rows.invalidate(spreadsheet_id)
+        data = get_sheet_data(creds, spreadsheet_id)
+        for hid in missing:
+            index = habit_index.get(spreadsheet_id, hid)
+            if index is None:
+                raise ValueError(f"No habit with ID {hid}")
+            located[hid] = (index, data[index])
+    return located
+
+'''_resolve_rows turns habit numbers (1-based positions in data, as shown in the menu) into [(data row index, row)] in number order. Habits with an ID are looked up with locate_habits, so a row that moved since data was read is still found; rows from before IDs existed keep their position.'''
+def _resolve_rows(creds, spreadsheet_id, numbers, data, sheet_name='Habit Tracker'):
+    numbers = sorted(set(numbers))
+    located = locate_habits(creds, spreadsheet_id, [habit_id_of(data[n - 1]) for n in numbers if habit_id_of(data[n - 1])], sheet_name)
+    targets = []
+    for number in numbers:
+        row = data[number - 1]
+        hid = habit_id_of(row)
+        targets.append(located[hid] if hid else (number - 1, row))
+    return targets
+
+'''_ensure_id queues a new ID in column F for a row that has none and returns the ID the row has once the buffer is flushed.'''
+def _ensure_id(buffer, index, row):
+    hid = habit_id_of(row)
+    if not hid:
+        hid = new_habit_id()
+        buffer.set(index + 2, ID_COLUMN, [hid])
+    return hid
+
+'''show_habits prints the habit list a page (page_size habits, default PAGE_SIZE) at a time. Only the page on screen is fetched, so the first page appears as quickly for 100k habits as for 10; longer lists can be paged through with next / prev / jump.'''
+def show_habits(creds, spreadsheet_id, page_size=None):
+    page_size = page_size or PAGE_SIZE
+    page = 0
+    rows = _habit_page(creds, spreadsheet_id, page, page_size)
+    if is_habits_empty(rows):
         print("\nNo habits found.\n")
         return
-    
-    print("\nHabit List:")
-    for row in data:
-        # assuming columns are Date, Habit, …
-        print("  " + " | ".join(row))
-    print() # print a newline
+
+    while True:
+        has_next = len(rows) > page_size
+        print(f"\nHabit List (page {page + 1}):" if page or has_next else "\nHabit List:")
+        for number, row in enumerate(rows[:page_size], start=page * page_size + 1):
+            # assuming columns are Date, Habit, … (the habit ID stays hidden; dates are shown readably)
+            print(f"  {number}. " + " | ".join(records.display_row(row)))
+        print() # print a newline
+        if page == 0 and not has_next:
+            return
+
+        choice = input("[n]ext, [p]rev, [j]ump to page, [q]uit: ").strip().lower()
+        if choice in ("", "q"):
+            return
+        if choice == "n" and has_next:
+            target = page + 1
+        elif choice == "p" and page > 0:
+            target = page - 1
+        elif choice.startswith("j") or choice.isdigit():
+            try:
+                target = int(choice.lstrip("j").strip() or input("Page number: ")) - 1
+            except ValueError:
+                print("Invalid page number.")
+                continue
+        else:
+            print("No such page." if choice in ("n", "p") else "Invalid choice.")
+            continue
+
+        new_rows = _habit_page(creds, spreadsheet_id, target, page_size) if target >= 0 else []
+        if not new_rows:
+            print(f"There is no page {target + 1}.")
+            continue
+        page, rows = target, new_rows
+
+'''_habit_page returns the rows of one page of show_habits plus the first row of the next one (which tells whether there is a next page).'''
+def _habit_page(creds, spreadsheet_id, page, page_size):
+    stream = iter_habit_rows(creds, spreadsheet_id, columns=range(ID_COLUMN), start=page * page_size, window=page_size + 1)
+    return list(islice(stream, page_size + 1))
+
+'''format_target_date checks a YYYY-MM-DD date and returns it as stored in the sheet ("2025-04-23"); blank means 'TBD'. Raises ValueError for anything else.'''
+def format_target_date(target_date_input):
+    if target_date_input:
+        return date.fromisoformat(target_date_input.strip()).isoformat()  # "2025-04-23"
+    return "TBD"  # Default if no date is provided
+
+'''format_target_time converts an HH:MM AM/PM (or 24-hour HH:MM) time to the form stored in the sheet ("14:37"); blank means 'TBD'. Raises ValueError for anything else.'''
+def format_target_time(target_time_input):
+    if target_time_input:
+        at = records.parse_time(target_time_input)
+        if at is None:
+            raise ValueError(f"Invalid time: {target_time_input!r}")
+        return at.strftime("%H:%M")  # "14:37"
+    return "TBD"  # Default if no time is provided
+
+'''format_target builds the target cell from a formatted date and time (see format_target_date / format_target_time): "2025-04-23T14:37", "2025-04-23", "T14:37" or "" when both are TBD. None counts as TBD.'''
+def format_target(target_date="TBD", target_time="TBD"):
+    day = date.fromisoformat(target_date) if target_date not in (None, "TBD") else None
+    at = records.parse_time(target_time) if target_time not in (None, "TBD") else None
+    return records.format_target(day, at)
+
+'''format_creation_date returns the current time in the format stored in the "Date Created" column ("2025-04-23T14:37").'''
+def format_creation_date():
+    # Set your time zone (you can change 'US/Eastern' to your specific time zone)
+    local_tz = pytz.timezone('US/Eastern')  # Change this to your desired time zone (e.g., 'Europe/London', 'Asia/Tokyo')
+
+    # Get the current time in your time zone
+    return records.format_timestamp(datetime.now(local_tz))  # "2025-04-23T14:37"
 
 '''set_target_completion_date prompts the user to input a date that they hope to complete the habit by.'''
 def set_target_completion_date():
     target_date_input = input("Enter target date for completion (YYYY-MM-DD), or leave blank for 'TBD': ")
-    if target_date_input:
-        target_date = datetime.strptime(target_date_input, "%Y-%m-%d").strftime("%A, %B %d")  # "Wednesday, April 23"
-    else:
-        target_date = "TBD"  # Default if no date is provided
-
-    return target_date
+    return format_target_date(target_date_input)
 
 '''set_target_completion_time prompts the user to input a time that they hope to complete the habit by.'''
 def set_target_completion_time():
     # Ask the user for a target time
     target_time_input = input("Enter target time (HH:MM AM/PM), or leave blank for 'TBD': ")
-    if target_time_input:
-        try:
-            target_time = datetime.strptime(target_time_input, "%I:%M %p").strftime("%I:%M %p")  # "02:37 PM"
-        except ValueError:
-            print("Invalid time format. Please enter time in the format HH:MM AM/PM.")
-            return
-    else:
-        target_time = "TBD"  # Default if no time is provided
-
-    return target_time
+    try:
+        return format_target_time(target_time_input)
+    except ValueError:
+        print("Invalid time format. Please enter time in the format HH:MM AM/PM.")
+        return
 
 '''add_habit adds a new habit to the Google Sheet.'''
 def add_habit(creds, spreadsheet_id, habit):
-    service = build('sheets', 'v4', credentials=creds)
-    sheet_name = 'Habit Tracker'
-
-    # Set your time zone (you can change 'US/Eastern' to your specific time zone)
-    local_tz = pytz.timezone('US/Eastern')  # Change this to your desired time zone (e.g., 'Europe/London', 'Asia/Tokyo')
-
-    # Get the current time in your time zone
-    creation_date = datetime.now(local_tz).strftime("%A, %B %d at %I:%M %p")  # "Wednesday, April 23 at 2:37 PM"
-
     # Ask the user for a target completion date
     target_date = set_target_completion_date()
 
     target_time = set_target_completion_time()
 
+    append_habit(creds, spreadsheet_id, habit, target_date, target_time)
+
+    print(f"\n✅ Habit '{habit}' added successfully with creation date, target date and time, and completion status!\n")
+
+'''append_habit adds one habit row without prompting. target_date/target_time are already formatted (see format_target_date / format_target_time). Returns the new row.'''
+def append_habit(creds, spreadsheet_id, habit, target_date="TBD", target_time="TBD", sheet_name='Habit Tracker'):
+    new_row = new_habit_row(habit, target_date, target_time)
+    append_rows(creds, spreadsheet_id, [new_row], sheet_name)
+    return new_row
+
+'''new_habit_row builds the row for a new habit: created now, not complete, no Updated time, a fresh ID.'''
+def new_habit_row(habit, target_date="TBD", target_time="TBD"):
+    creation_date = format_creation_date()  # "2025-04-23T14:37"
+
     # Set the default completion status to "❌" (incomplete)
     completion_status = "❌"
 
-    # The new row to be added
-    new_row = [habit, creation_date, f"{target_date} at {target_time}", completion_status, ""]  # Empty Updated column
+    return [habit, creation_date, format_target(target_date, target_time), completion_status, "", new_habit_id()]  # Empty Updated column
 
+'''append_rows appends complete habit rows (see new_habit_row) after the last habit with one values().append request.'''
+def append_rows(creds, spreadsheet_id, rows, sheet_name='Habit Tracker'):
     range_name = f'{sheet_name}!A2'
-    body = {'values': [new_row]}
+    body = {'values': rows}
 
     # Append the new habit data to the Google Sheet
-    service.spreadsheets().values().append(
+    response = sheets_client.execute(get_service(creds).spreadsheets().values().append(
         spreadsheetId=spreadsheet_id,
         range=range_name,
         valueInputOption="RAW",
         body=body
-    ).execute()
-
-    print(f"\n✅ Habit '{habit}' added successfully with creation date, target date and time, and completion status!\n")
+    ), "values.append", range_name)
+    record_append(spreadsheet_id, rows, response)
+    return response
 
 '''is_habits_empty checks if the Habit Tracker spreadsheet is empty and returns True or False accordingly.'''
 def is_habits_empty(data):
@@ -193,10 +543,10 @@ def print_current_habits(data):
 
 '''edit_habit allows the user to modify an existing habit in the Google Sheet.'''
 def edit_habit(creds, spreadsheet_id):
-    service = build('sheets', 'v4', credentials=creds)
     sheet_name = 'Habit Tracker'
 
-    data = get_sheet_data(creds, spreadsheet_id)
+    # The old target and Updated columns are replaced, so they are not read
+    data = get_sheet_data(creds, spreadsheet_id, columns=(TASK_COLUMN, CREATED_COLUMN, STATUS_COLUMN, ID_COLUMN))
 
     if is_habits_empty(data):
         print("\nNo habits found to edit.\n")
@@ -247,117 +597,207 @@ def edit_habit(creds, spreadsheet_id):
             print("Invalid input. Please enter either y or n.\n")
     
     # The new row to be added
-    new_row = [new_habit, creation_date, f"{new_target_date} at {new_target_time}", new_completion_status, ""]
-    
-    # Row number in the sheet = index + 2 (1-based sheet rows, plus header)
-    row_number = row_number + 1
-    cell_range = f"{sheet_name}!A{row_number}"
-    update_body = {'values': [new_row]}
+    new_row = [new_habit, creation_date, format_target(new_target_date, new_target_time), new_completion_status, "", habit_id_of(old_habit_row)]
 
     try:
-        service.spreadsheets().values().update(
-            spreadsheetId=spreadsheet_id,
-            range=cell_range,
-            valueInputOption="RAW",
-            body=update_body
-        ).execute()
+        now, new_row[ID_COLUMN] = write_habit_row(creds, spreadsheet_id, row_number, new_row, sheet_name, data=data)
+        _record_history(creds, spreadsheet_id, [(old_habit_row, new_row)], now)
         print(f"\n✅ Habit '{new_habit}' updated successfully!")
-
-        # Update the updated timestamp upon successful edit
-        update_timestamp(creds,spreadsheet_id, row_number)
+        print(f"Timestamp updated in E{row_number + 1}: {now}\n")
     except Exception as e:
         print(f"❌ Error updating habit: {e}")
 
-'''update_timestamp modifies the updated timestamp field when a habit is successfully edited.'''
-def update_timestamp(creds, spreadsheet_id, row_index):
-    service = build('sheets', 'v4', credentials=creds)
-
-    # Current date and time formatted as "04/21/2025 at 8:29 PM"
+'''write_habit_row overwrites habit number `number` (1-based, as shown in the menu) with new_row and stamps its Updated column, in one batchUpdate. The habit is found by its ID (see locate_habits), so it is the row written even if rows moved since data was read. Returns (timestamp written, habit ID), the ID being a new one if the row had none.'''
+def write_habit_row(creds, spreadsheet_id, number, new_row, sheet_name='Habit Tracker', data=None):
+    if data is None:
+        data = get_sheet_data(creds, spreadsheet_id, columns=(TASK_COLUMN, ID_COLUMN))
+    (index, row), = _resolve_rows(creds, spreadsheet_id, [number], data, sheet_name)
+    return _write_row(creds, spreadsheet_id, index, row, new_row, sheet_name)
+
+'''_write_row writes new_row (A:E) over data row index, gives the row an ID if it has none and stamps its Updated column, all in one batchUpdate. Returns (timestamp, habit ID).'''
+def _write_row(creds, spreadsheet_id, index, old_row, new_row, sheet_name='Habit Tracker'):
+    # Row number in the sheet = index + 2 (0-based data rows, plus 1-based sheet rows and the header)
+    row_number = index + 2
+
+    # Queue the row, its ID and its updated timestamp so all go out in a single batchUpdate (A:F)
+    buffer = WriteBuffer(sheet_name)
+    buffer.set(row_number, 0, new_row[:ID_COLUMN])
+    hid = _ensure_id(buffer, index, old_row)
+    now = update_timestamp(creds, spreadsheet_id, row_number, buffer=buffer)
+    _flush(get_service(creds), spreadsheet_id, buffer)
+    habit_index.add(spreadsheet_id, index, [hid])
+    return now, hid
+
+'''write_habit_rows writes full rows (A:E) over the habits with the same IDs (column F), all in one batchUpdate. Raises ValueError for an ID that isn't in the sheet.'''
+def write_habit_rows(creds, spreadsheet_id, rows, sheet_name='Habit Tracker'):
+    located = locate_habits(creds, spreadsheet_id, [habit_id_of(row) for row in rows], sheet_name)
+    buffer = WriteBuffer(sheet_name)
+    for row in rows:
+        index, _ = located[habit_id_of(row)]
+        buffer.set(index + 2, 0, list(row[:ID_COLUMN]))
+    _flush(get_service(creds), spreadsheet_id, buffer)
+
+'''update_habit changes selected fields of habit number `number` (or of the habit with ID habit_id) without prompting; fields left as None keep their current value. target is the full "date at time" cell and status is "✅" or "❌". Returns the row written.'''
+def update_habit(creds, spreadsheet_id, number, name=None, target=None, status=None, data=None, sheet_name='Habit Tracker', habit_id=None):
+    if habit_id is not None:
+        index, row = locate_habits(creds, spreadsheet_id, [habit_id], sheet_name)[habit_id]
+    else:
+        if data is None:
+            data = get_sheet_data(creds, spreadsheet_id, columns=(TASK_COLUMN, CREATED_COLUMN, TARGET_COLUMN, STATUS_COLUMN, ID_COLUMN))
+        if number < 1 or number > len(data):
+            raise ValueError(f"Habit number must be between 1 and {len(data)}")
+        (index, row), = _resolve_rows(creds, spreadsheet_id, [number], data, sheet_name)
+
+    old_row = list(row) + [""] * (ID_COLUMN + 1 - len(row))
+    new_row = [
+        name if name is not None else old_row[0],
+        old_row[1] or "Unknown",
+        target if target is not None else old_row[2],
+        status if status is not None else (old_row[3] or "❌"),
+        "",
+    ]
+    new_row[4], hid = _write_row(creds, spreadsheet_id, index, row, new_row, sheet_name)
+    new_row.append(hid)
+    if status is not None:
+        _record_history(creds, spreadsheet_id, [(old_row, new_row)], new_row[4])
+    return new_row
+
+'''format_updated_time returns the current time in the format stored in the "Updated" column ("2025-04-21T20:29").'''
+def format_updated_time():
     local_tz = pytz.timezone('US/Eastern') # set timezone
-    now = datetime.now(local_tz).strftime('%m/%d/%Y at %I:%M %p').lstrip("0").replace(" 0", " ")
+    return records.format_timestamp(datetime.now(local_tz))
 
-    # Target range in column E for the given row
-    range_to_update = f'Habit Tracker!E{row_index}'
+'''update_timestamp modifies the updated timestamp field when a habit is successfully edited. When a WriteBuffer is passed, the write is only queued so the caller can send it together with its own changes.'''
+def update_timestamp(creds, spreadsheet_id, row_index, buffer=None):
+    now = format_updated_time()
 
-    body = {
-        'values': [[now]]
-    }
+    if buffer is not None:
+        buffer.set(row_index, 4, [now])  # column E for the given row
+        return now
 
-    service.spreadsheets().values().update(
-        spreadsheetId=spreadsheet_id,
-        range=range_to_update,
-        valueInputOption='RAW',
-        body=body
-    ).execute()
+    buffer = WriteBuffer()
+    buffer.set(row_index, 4, [now])
+    _flush(get_service(creds), spreadsheet_id, buffer)
 
     print(f"Timestamp updated in E{row_index}: {now}\n")
+    return now
+
+'''parse_selection turns input such as "1-5,8,12" into a sorted list of unique habit numbers between 1 and count. Raises ValueError for malformed or out-of-range input.'''
+def parse_selection(text, count):
+    numbers = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = (int(n) for n in part.split("-", 1))
+            if first > last:
+                first, last = last, first
+            numbers.update(range(first, last + 1))
+        else:
+            numbers.add(int(part))
+
+    if not numbers:
+        raise ValueError("No habits selected")
+    if min(numbers) < 1 or max(numbers) > count:
+        raise ValueError(f"Selection must be between 1 and {count}")
+    return sorted(numbers)
+
+'''row_ranges collapses habit numbers into contiguous [start, end) data-row index ranges, last range first so earlier deletions don't shift later ones.'''
+def row_ranges(numbers):
+    ranges = []
+    for number in sorted(set(numbers)):
+        index = number - 1
+        if ranges and ranges[-1][1] == index:
+            ranges[-1][1] = index + 1
+        else:
+            ranges.append([index, index + 1])
+    return [tuple(r) for r in reversed(ranges)]
+
+'''delete_habits deletes the given habit numbers (1-based, as shown in the menu), or the habits with the given IDs, with a single batchUpdate and returns the names of the deleted habits.'''
+def delete_habits(creds, spreadsheet_id, numbers, sheet_name='Habit Tracker', data=None, habit_ids=None):
+    sheet_id = get_sheet_id(creds, spreadsheet_id, sheet_name)
+    if sheet_id is None:
+        raise ValueError(f"Could not find the sheet ID of '{sheet_name}'")
+
+    if habit_ids is not None:
+        targets = sorted(locate_habits(creds, spreadsheet_id, habit_ids, sheet_name).values(), key=lambda target: target[0])
+    else:
+        if data is None:
+            data = get_sheet_data(creds, spreadsheet_id, columns=(TASK_COLUMN, ID_COLUMN))
+        targets = _resolve_rows(creds, spreadsheet_id, numbers, data, sheet_name)
+    names = [row[0] if row else "" for _, row in targets]
+
+    # One deleteDimension per contiguous block, highest rows first (sheet index = data index + 1 for the header)
+    ranges = row_ranges(index + 1 for index, _ in targets)
+    requests = [{
+        "deleteDimension": {
+            "range": {
+                "sheetId": sheet_id,
+                "dimension": "ROWS",
+                "startIndex": start + 1,
+                "endIndex": end + 1
+            }
+        }
+    } for start, end in ranges]
+
+    sheets_client.execute(get_service(creds).spreadsheets().batchUpdate(
+        spreadsheetId=spreadsheet_id,
+        body={"requests": requests}
+    ), "spreadsheets.batchUpdate")
+    _wrote(spreadsheet_id)
+
+    for start, end in ranges:
+        habit_rows.delete_rows(spreadsheet_id, start, end)
+        habit_index.delete_rows(spreadsheet_id, start, end)
+    return names
 
 def delete_habit(creds, spreadsheet_id):
-    service = build('sheets', 'v4', credentials=creds)
+    from googleapiclient.errors import HttpError
     sheet_name = 'Habit Tracker'
 
-    # Get the correct sheetId by name
-    spreadsheet = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-    sheets = spreadsheet.get("sheets", "")
-    sheet_id = None
-    for sheet in sheets:
-        if sheet["properties"]["title"] == sheet_name:
-            sheet_id = sheet["properties"]["sheetId"]
-            break
+    # Get the correct sheetId by name (cached after the first lookup)
+    sheet_id = get_sheet_id(creds, spreadsheet_id, sheet_name)
 
     if sheet_id is None:
         print("❌ Could not find the sheet ID.\n")
         return
 
-    # Get habit data
-    values = get_sheet_data(creds, spreadsheet_id)
+    # Get habit names (and IDs, to find the rows again when deleting)
+    values = get_sheet_data(creds, spreadsheet_id, columns=(TASK_COLUMN, ID_COLUMN))
     if is_habits_empty(values):
         print("\nNo habits found to delete.\n")
         return
 
-    habits = [row[0] for row in values if row]
-
     print("\nCurrent Habits:")
-    for idx, habit in enumerate(habits, 1):
-        print(f"{idx}. {habit}")
+    for idx, row in enumerate(values, 1):
+        print(f"{idx}. {row[0] if row else ''}")
 
     try:
-        index = int(input("\nEnter the number of the habit to delete: ")) - 1
-        habit_to_delete = habits[index]
-    except (ValueError, IndexError):
+        selection = input("\nEnter the number(s) of the habit(s) to delete (e.g. 2 or 1-5,8,12): ")
+        numbers = parse_selection(selection, len(values))
+    except ValueError:
         print("Invalid selection.\n")
         return
 
     try:
-        # Delete the entire row (accounting for header row)
-        requests = [{
-            "deleteDimension": {
-                "range": {
-                    "sheetId": sheet_id,
-                    "dimension": "ROWS",
-                    "startIndex": index + 1,
-                    "endIndex": index + 2
-                }
-            }
-        }]
+        # Delete every selected row in one request (accounting for header row)
+        deleted = delete_habits(creds, spreadsheet_id, numbers, sheet_name, data=values)
 
-        service.spreadsheets().batchUpdate(
-            spreadsheetId=spreadsheet_id,
-            body={"requests": requests}
-        ).execute()
-
-        print(f"✅ Habit '{habit_to_delete}' deleted successfully!\n")
+        if len(deleted) == 1:
+            print(f"✅ Habit '{deleted[0]}' deleted successfully!\n")
+        else:
+            print(f"✅ {len(deleted)} habits deleted successfully: {', '.join(deleted)}\n")
     except HttpError as error:
         print(f"❌ Failed to delete row: {error}\n")
 
 
 '''mark_habit_complete changes the completion status of a habit.'''
 def mark_habit_complete(creds, spreadsheet_id):
-    service = build('sheets', 'v4', credentials=creds)
+    service = get_service(creds)
     sheet_name = 'Habit Tracker'
 
-    # Get sheet data
-    data = get_sheet_data(creds, spreadsheet_id)
+    # Get the names and statuses (and IDs, to find the row again when writing)
+    data = get_sheet_data(creds, spreadsheet_id, columns=(TASK_COLUMN, STATUS_COLUMN, ID_COLUMN))
 
     # Check if the habit list is empty before proceeding
     if is_habits_empty(data):
@@ -377,8 +817,12 @@ def mark_habit_complete(creds, spreadsheet_id):
         print("Invalid input. Please enter a number.\n")
         return
 
-    # Get habit name for confirmation message
-    selected_row = data[choice - 1]
+    # Find where the habit is now (by its ID) and get its name for the confirmation message
+    try:
+        (index, selected_row), = _resolve_rows(creds, spreadsheet_id, [choice], data, sheet_name)
+    except ValueError as e:
+        print(f"❌ {e}\n")
+        return
     habit_name = selected_row[0] if len(selected_row) > 0 else "Unknown Habit"
 
     # Check if the habit is already marked complete
@@ -387,19 +831,115 @@ def mark_habit_complete(creds, spreadsheet_id):
         print(f"Habit '{habit_name}' is already marked complete.\n")
         return
 
-    # Row number in the sheet = index + 2 (1-based sheet rows, plus header)
-    row_number = choice + 1
-    cell_range = f"{sheet_name}!D{row_number}"
-    update_body = {'values': [["✅"]]}
+    # Row number in the sheet = index + 2 (0-based data rows, plus 1-based sheet rows and the header)
+    row_number = index + 2
+
+    # Status (D), updated timestamp (E) and, for old rows, the ID (F) are adjacent, so this is one range in one request
+    buffer = WriteBuffer(sheet_name)
+    buffer.set(row_number, 3, ["✅"])
+    now = update_timestamp(creds, spreadsheet_id, row_number, buffer=buffer)
+    hid = _ensure_id(buffer, index, selected_row)
 
     try:
-        service.spreadsheets().values().update(
-            spreadsheetId=spreadsheet_id,
-            range=cell_range,
-            valueInputOption="RAW",
-            body=update_body
-        ).execute()
+        _flush(service, spreadsheet_id, buffer)
+        habit_index.add(spreadsheet_id, index, [hid])
+        _record_history(creds, spreadsheet_id, [(selected_row, [habit_name, "", "", "✅", now, hid])], now)
         print(f"\n✅ Habit '{habit_name}' marked complete!\n")
     except Exception as e:
         print(f"❌ Error updating habit: {e}\n")
 
+'''is_due_today checks whether a habit row's target date (column C, e.g. "2025-04-23T14:30", or an older "Wednesday, April 23 at 02:30 PM") is today.'''
+def is_due_today(row, today=None):
+    if today is None:
+        today = datetime.now(pytz.timezone('US/Eastern'))
+    if isinstance(today, datetime):
+        today = today.date()
+    day, _ = records.split_target(row[2] if len(row) > 2 else "", today)
+    return day == today
+
+'''migrate_dates rewrites the created, target and updated cells still in the older display formats ("Wednesday, April 23 at 02:37 PM", "4/21/2025 at 8:29 PM") as ISO-8601, with one read and one values().batchUpdate. The year of year-less dates is inferred from the weekday (see records.infer_year). Returns how many rows changed.'''
+def migrate_dates(creds, spreadsheet_id, sheet_name='Habit Tracker'):
+    data = get_sheet_data(creds, spreadsheet_id, columns=(CREATED_COLUMN, TARGET_COLUMN, UPDATED_COLUMN))
+    reference = records.today()
+    buffer = WriteBuffer(sheet_name)
+    changed = 0
+    for index, row in enumerate(data):
+        changes = records.migrate_row(row, reference)
+        for column, value in changes.items():
+            buffer.set(index + 2, column, [value])
+        changed += bool(changes)
+    _flush(get_service(creds), spreadsheet_id, buffer)
+    return changed
+
+'''mark_habits_complete marks many habits complete in one values().batchUpdate. Pass habit numbers (1-based, as shown in the menu), habit IDs or due_today=True. Rows already marked ✅ are skipped. Returns (completed names, already complete names).'''
+def mark_habits_complete(creds, spreadsheet_id, numbers=None, due_today=False, sheet_name='Habit Tracker', data=None, habit_ids=None):
+    if habit_ids is not None:
+        targets = sorted(locate_habits(creds, spreadsheet_id, habit_ids, sheet_name).values(), key=lambda target: target[0])
+    else:
+        if data is None:
+            data = get_sheet_data(creds, spreadsheet_id, columns=(TASK_COLUMN, TARGET_COLUMN, STATUS_COLUMN, ID_COLUMN))
+        if due_today:
+            numbers = [i for i, row in enumerate(data, start=1) if is_due_today(row)]
+        targets = _resolve_rows(creds, spreadsheet_id, numbers or [], data, sheet_name)
+
+    buffer = WriteBuffer(sheet_name)
+    completed, already_complete, assigned = [], [], []
+    changed = []  # (old row, new row) for the completion history
+    timestamp = None
+    for index, row in targets:
+        habit_name = row[0] if len(row) > 0 else "Unknown Habit"
+        if len(row) > 3 and row[3] == "✅":
+            already_complete.append(habit_name)
+            continue
+
+        # Row number in the sheet = index + 2 (0-based data rows, plus 1-based sheet rows and the header); status D, timestamp E
+        buffer.set(index + 2, 3, ["✅"])
+        if timestamp is None:
+            timestamp = update_timestamp(creds, spreadsheet_id, index + 2, buffer=buffer)
+        else:
+            buffer.set(index + 2, 4, [timestamp])
+        assigned.append((index, _ensure_id(buffer, index, row)))
+        completed.append(habit_name)
+        changed.append((row, [habit_name, "", "", "✅", timestamp, assigned[-1][1]]))
+
+    _flush(get_service(creds), spreadsheet_id, buffer)
+    for index, hid in assigned:
+        habit_index.add(spreadsheet_id, index, [hid])
+    _record_history(creds, spreadsheet_id, changed, timestamp)
+    return completed, already_complete
+
+'''_record_history logs the status changes among (old row, new row) pairs in the completion history (see history).'''
+def _record_history(creds, spreadsheet_id, changes, at):
+    from package_lab13 import history  # history is built on this module
+    history.record_changes(creds, spreadsheet_id, changes, at)
+
+'''bulk_mark_habits_complete lets the user tick off several habits at once, by number ("1-5,8") or everything due today ("today").'''
+def bulk_mark_habits_complete(creds, spreadsheet_id):
+    data = get_sheet_data(creds, spreadsheet_id, columns=(TASK_COLUMN, TARGET_COLUMN, STATUS_COLUMN, ID_COLUMN))
+
+    if is_habits_empty(data):
+        print("\nNo habits found to mark complete.\n")
+        return
+
+    print_current_habits(data)
+
+    selection = input("\nEnter the numbers of the habits to mark complete (e.g. 1-5,8) or 'today' for all due today: ").strip().lower()
+    try:
+        if selection == "today":
+            completed, already_complete = mark_habits_complete(creds, spreadsheet_id, due_today=True, data=data)
+        else:
+            numbers = parse_selection(selection, len(data))
+            completed, already_complete = mark_habits_complete(creds, spreadsheet_id, numbers, data=data)
+    except ValueError:
+        print("Invalid selection.\n")
+        return
+    except Exception as e:
+        print(f"❌ Error updating habits: {e}\n")
+        return
+
+    if already_complete:
+        print(f"Already complete: {', '.join(already_complete)}")
+    if completed:
+        print(f"\n✅ Marked {len(completed)} habit(s) complete: {', '.join(completed)}\n")
+    else:
+        print("\nNo habits needed marking.\n")
@@ -0,0 +1,146 @@
+'''history keeps an append-only log of completions in a second tab, "Habit History".
+
+Column D of the Habit Tracker only holds the current ✅ / ❌, so marking a habit complete
+(or toggling it back) overwrites what was there. Every such status change is also written
+as one event row:
+
+    A At                 B Habit ID      C Task         D Status
+    2025-05-01T07:02     3f9c0a1b2c4d    Stretch        ✅
+
+Events are never edited or deleted, so streaks and completion rates can be computed
+from them later (see streaks). They are buffered by history_log and sent with one
+values().append per batch: when BATCH_SIZE events are waiting, when the interactive app
+exits (however it ends) and when a CLI command finishes, in-process or in the daemon. Reads of the history include the
+events still buffered. The tab is added, with its header row, by the first append. If an
+append fails, its events stay buffered and go out with the next one.
+'''
+import os
+import sys
+import threading
+
+from googleapiclient.errors import HttpError
+
+from package_lab13 import google_sheets, sheets_client
+from package_lab13.google_sheets import ID_COLUMN, STATUS_COLUMN, TASK_COLUMN
+
+HISTORY_SHEET = 'Habit History'
+HISTORY_RANGE = f'{HISTORY_SHEET}!A2:D'
+HEADER = ["At", "Habit ID", "Task", "Status"]
+
+# Events sent per values().append at most; reaching it flushes the buffer straight away
+BATCH_SIZE = int(os.environ.get("HABIT_TRACKER_HISTORY_BATCH", "500"))
+
+'''event_row builds the history row for a habit row whose status changed at `at` (an ISO timestamp).'''
+def event_row(at, row):
+    row = list(row) + [""] * (ID_COLUMN + 1 - len(row))
+    return [at, row[ID_COLUMN], row[TASK_COLUMN], row[STATUS_COLUMN]]
+
+class HistoryLog:
+    '''Event rows waiting to be appended, per spreadsheet, plus listeners that see each event as it is recorded.'''
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size
+        self._pending = {}  # spreadsheet_id -> (creds, [event rows])
+        self._listeners = {}  # spreadsheet_id -> [function(event rows)]
+        self._lock = threading.Lock()
+
+    '''record queues event rows (see event_row) for a spreadsheet and tells its listeners; the buffer is flushed once it holds batch_size events.'''
+    def record(self, creds, spreadsheet_id, events):
+        if not events:
+            return
+        with self._lock:
+            _, pending = self._pending.setdefault(spreadsheet_id, (creds, []))
+            pending.extend(events)
+            full = len(pending) >= (BATCH_SIZE if self.batch_size is None else self.batch_size)
+            listeners = list(self._listeners.get(spreadsheet_id, ()))
+        for listener in listeners:
+            listener(events)
+        if full:
+            self.flush(spreadsheet_id)
+
+    '''pending returns a copy of the events not yet sent for a spreadsheet.'''
+    def pending(self, spreadsheet_id):
+        with self._lock:
+            return list(self._pending.get(spreadsheet_id, (None, []))[1])
+
+    '''subscribe calls listener(event rows) for every event recorded for the spreadsheet from now on.'''
+    def subscribe(self, spreadsheet_id, listener):
+        with self._lock:
+            self._listeners.setdefault(spreadsheet_id, []).append(listener)
+
+    '''flush appends the buffered events of one spreadsheet in one request. Returns how many were sent; on failure they stay buffered and the error is raised.'''
+    def flush(self, spreadsheet_id):
+        with self._lock:
+            creds, events = self._pending.pop(spreadsheet_id, (None, []))
+        if not events:
+            return 0
+        try:
+            append_events(creds, spreadsheet_id, events)
+        except Exception:
+            with self._lock:
+                _, pending = self._pending.setdefault(spreadsheet_id, (creds, []))
+                pending[:0] = events
+            raise
+        return len(events)
+
+    '''flush_all flushes every spreadsheet with buffered events. Errors are printed rather than raised, so one unreachable sheet doesn't keep the others' events back.'''
+    def flush_all(self):
+        with self._lock:
+            spreadsheet_ids = list(self._pending)
+        sent = 0
+        for spreadsheet_id in spreadsheet_ids:
+            try:
+                sent += self.flush(spreadsheet_id)
+            except Exception as error:
+                print(f"❌ Could not save the completion history of {spreadsheet_id}: {error}", file=sys.stderr)
+        return sent
+
+    '''clear drops buffered events and listeners (e.g. between tests).'''
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._listeners.clear()
+
+# Shared by every operation in this process
+history_log = HistoryLog()
+
+'''record_changes logs an event for every row whose status differs from before (pairs of (old row, new row)), all stamped `at`.'''
+def record_changes(creds, spreadsheet_id, changes, at):
+    events = [event_row(at, new) for old, new in changes
+              if (old[STATUS_COLUMN] if len(old) > STATUS_COLUMN else "") != (new[STATUS_COLUMN] if len(new) > STATUS_COLUMN else "")]
+    history_log.record(creds, spreadsheet_id, events)
+
+'''append_events appends event rows to the history tab with one values().append, adding the tab (and its header row) first if the spreadsheet doesn't have it yet.'''
+def append_events(creds, spreadsheet_id, events):
+    rows = list(events)
+    if google_sheets.get_sheet_id(creds, spreadsheet_id, HISTORY_SHEET) is None:
+        rows.insert(0, HEADER)
+        try:
+            reply = sheets_client.execute(google_sheets.get_service(creds).spreadsheets().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={"requests": [{"addSheet": {"properties": {"title": HISTORY_SHEET}}}]}
+            ), "spreadsheets.batchUpdate")
+            google_sheets.remember_sheet_ids(spreadsheet_id, {"sheets": [reply["replies"][0]["addSheet"]]})
+        except HttpError as error:
+            if error.resp.status != 400:
+                raise
+            google_sheets._sheet_ids.pop(spreadsheet_id, None)  # most likely another client added the tab first
+            rows.pop(0)
+    range_name = f'{HISTORY_SHEET}!A1'
+    sheets_client.execute(google_sheets.get_service(creds).spreadsheets().values().append(
+        spreadsheetId=spreadsheet_id,
+        range=range_name,
+        valueInputOption="RAW",
+        body={"values": rows}
+    ), "values.append", range_name)
+
+'''read_events returns every event row of the history tab (oldest first), followed by the ones still buffered (only those when there is no history tab yet).'''
+def read_events(creds, spreadsheet_id):
+    events = []
+    if google_sheets.get_sheet_id(creds, spreadsheet_id, HISTORY_SHEET) is not None:
+        result = sheets_client.execute(google_sheets.get_service(creds).spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=HISTORY_RANGE
+        ), "values.get", HISTORY_RANGE)
+        events = [row for row in result.get('values', []) if row]
+    return events + history_log.pending(spreadsheet_id)
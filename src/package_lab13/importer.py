@@ -0,0 +1,124 @@
+'''importer bulk-loads habits from a CSV or JSONL file into the Habit Tracker sheet without any prompts.
+
+Each record needs a habit name ("habit", "task" or "name") and may have "target_date"
+(YYYY-MM-DD), "target_time" (HH:MM AM/PM or 24-hour HH:MM) and "status" (✅/❌, yes/no,
+true/false, done). Rows are normalized to exactly what add_habit writes and appended
+in chunks, so only one chunk is held in memory however large the file is.
+
+Usage:
+    python -m package_lab13.importer habits.csv --sheet SPREADSHEET_ID [--chunk-size 500]
+'''
+import argparse
+import csv
+import json
+import time
+
+from package_lab13 import google_sheets
+
+DEFAULT_CHUNK_SIZE = 500
+NAME_KEYS = ("habit", "task", "name")
+DONE_VALUES = {"✅", "y", "yes", "true", "1", "done", "complete", "completed"}
+
+'''iter_records streams (line number, record) pairs from a .csv or .jsonl/.ndjson file. JSONL lines are yielded undecoded (see decode_record), so one bad line is skipped rather than ending the import.'''
+def iter_records(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield line_number, line
+        else:
+            # line 1 is the CSV header
+            for line_number, record in enumerate(csv.DictReader(f), start=2):
+                yield line_number, record
+
+'''decode_record returns the record dict of a CSV row or JSONL line. Raises ValueError when a line isn't a JSON object.'''
+def decode_record(record):
+    if not isinstance(record, str):
+        return record
+    try:
+        record = json.loads(record)
+    except json.JSONDecodeError as error:
+        raise ValueError(f"invalid JSON: {error}") from None
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object")
+    return record
+
+'''_field returns the first non-empty value for any of the given keys (case-insensitive), stripped.'''
+def _field(record, *keys):
+    lowered = {str(k).strip().lower(): v for k, v in record.items() if k is not None}
+    for key in keys:
+        value = lowered.get(key)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return ""
+
+'''normalize_time accepts HH:MM AM/PM or 24-hour HH:MM and returns the sheet format ("14:37"), or 'TBD' when blank.'''
+def normalize_time(value):
+    return google_sheets.format_target_time(value)
+
+'''normalize_record turns one input record into a sheet row in the same shape add_habit writes. Raises ValueError when the record is invalid.'''
+def normalize_record(record, creation_date):
+    habit = _field(record, *NAME_KEYS)
+    if not habit:
+        raise ValueError("missing habit name")
+
+    target_date = google_sheets.format_target_date(_field(record, "target_date", "date"))
+    target_time = normalize_time(_field(record, "target_time", "time"))
+    status = "✅" if _field(record, "status", "completed").lower() in DONE_VALUES else "❌"
+
+    return [habit, creation_date, google_sheets.format_target(target_date, target_time), status, "", google_sheets.new_habit_id()]
+
+'''import_habits streams a CSV/JSONL file into the sheet in chunks of chunk_size rows and returns a report of what happened.'''
+def import_habits(creds, spreadsheet_id, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    creation_date = google_sheets.format_creation_date()  # one import, one creation timestamp
+    report = {"imported": 0, "skipped": [], "requests": 0, "seconds": 0.0, "rows_per_second": 0.0}
+
+    start = time.perf_counter()
+    chunk = []
+    for line_number, record in iter_records(path):
+        try:
+            chunk.append(normalize_record(decode_record(record), creation_date))
+        except (ValueError, AttributeError) as error:
+            report["skipped"].append((line_number, str(error)))
+            continue
+
+        if len(chunk) >= chunk_size:
+            google_sheets.append_rows(creds, spreadsheet_id, chunk)
+            report["imported"] += len(chunk)
+            report["requests"] += 1
+            chunk = []
+
+    if chunk:
+        google_sheets.append_rows(creds, spreadsheet_id, chunk)
+        report["imported"] += len(chunk)
+        report["requests"] += 1
+
+    report["seconds"] = time.perf_counter() - start
+    if report["seconds"] > 0:
+        report["rows_per_second"] = report["imported"] / report["seconds"]
+    return report
+
+'''print_report shows the result of an import in the same style as the rest of the CLI.'''
+def print_report(report):
+    print(f"\n✅ Imported {report['imported']} habits in {report['requests']} requests "
+          f"({report['seconds']:.2f}s, {report['rows_per_second']:.0f} rows/s)")
+    for line_number, reason in report["skipped"]:
+        print(f"  ❌ Skipped line {line_number}: {reason}")
+    print()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import habits from a CSV or JSONL file.")
+    parser.add_argument("path", help="CSV (with a header row) or JSONL file of habits")
+    parser.add_argument("--sheet", required=True, help="spreadsheet ID of the Habit Tracker sheet")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per append request")
+    args = parser.parse_args(argv)
+
+    from package_lab13.main import authenticate_user
+    creds = authenticate_user()
+    print_report(import_habits(creds, args.sheet, args.path, chunk_size=args.chunk_size))
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,77 @@
-from google_auth_oauthlib.flow import InstalledAppFlow
-from package_lab13.google_sheets import create_sheet, get_sheet_data, add_habit, edit_habit, show_habits, delete_habit, mark_habit_complete, update_timestamp
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+import argparse
+import os
+import time
+from package_lab13.google_sheets import create_sheet, get_sheet_data, add_habit, edit_habit, show_habits, delete_habit, mark_habit_complete, update_timestamp, remember_sheet_ids, bulk_mark_habits_complete, get_service
+from package_lab13 import sheets_client
+from package_lab13.metrics import api_metrics
 
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']  # define required permissions from user's Google account
 
-'''authenticate_user authenticates the user's Google account using OAuth flow, ensuring that the program has the necessary permissions to create a new Google Spreadsheet, make edits to it as necessary, and make changes to their Google Calendar. Upon successful authentication, credentials are returned.'''
-def authenticate_user():
-    flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)  # create the user authentication window with necessary permissions
-    creds = flow.run_local_server(port=0)  # run user authentication window 
-    print()  # print newline after the browser‑redirect log
+# Where the OAuth token is cached between launches (keep it out of version control)
+TOKEN_FILE = os.environ.get("HABIT_TRACKER_TOKEN", "token.json")
+
+# How the last startup authenticated: {"mode": "warm" | "refreshed" | "cold", "seconds": float}
+startup_timing = {}
+
+'''load_cached_credentials reads credentials saved by save_credentials, or returns None if there is no usable token file.'''
+def load_cached_credentials(token_file=TOKEN_FILE):
+    if not os.path.exists(token_file):
+        return None
+    from google.oauth2.credentials import Credentials  # google-auth is imported on first use, not with this module
+    try:
+        return Credentials.from_authorized_user_file(token_file, SCOPES)
+    except (ValueError, OSError):
+        return None  # corrupt or unreadable token file: sign in again
+
+'''save_credentials writes the credentials to token_file, readable and writable by the current user only (0600).'''
+def save_credentials(creds, token_file=TOKEN_FILE):
+    fd = os.open(token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(creds.to_json())
+    os.chmod(token_file, 0o600)  # O_CREAT's mode is ignored when the file already existed
+
+'''authenticate_user authenticates the user's Google account using OAuth flow, ensuring that the program has the necessary permissions to create a new Google Spreadsheet, make edits to it as necessary, and make changes to their Google Calendar. A cached token is used (and silently refreshed when expired) so the browser flow only runs on the first launch or after the refresh token is revoked. Upon successful authentication, credentials are returned.'''
+def authenticate_user(token_file=TOKEN_FILE):
+    from google.auth.exceptions import RefreshError
+    start = time.perf_counter()
+    mode = "warm"
+    creds = load_cached_credentials(token_file)
+
+    if creds is not None and not creds.valid:
+        mode = "refreshed"
+        if creds.expired and creds.refresh_token:
+            from google.auth.transport.requests import Request  # pulls in requests; only needed to refresh
+            try:
+                creds.refresh(Request())
+            except RefreshError:
+                creds = None  # refresh token revoked or expired: fall back to the browser flow
+        else:
+            creds = None
+
+    if creds is None:
+        mode = "cold"
+        from google_auth_oauthlib.flow import InstalledAppFlow  # only the first launch needs the browser flow
+        flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)  # create the user authentication window with necessary permissions
+        creds = flow.run_local_server(port=0)  # run user authentication window 
+        print()  # print newline after the browser‑redirect log
+
+    if mode != "warm":
+        save_credentials(creds, token_file)
+
+    startup_timing.update(mode=mode, seconds=time.perf_counter() - start)
     return creds
 
 ''' Check to see if the user entered a valid Google Sheets URL. '''
 def is_valid_spreadsheet(creds, spreadsheet_id):
+    from googleapiclient.errors import HttpError
     try:
-        service = build('sheets', 'v4', credentials=creds)
-        service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
+        service = get_service(creds)
+        # Only ask for the tab list: it proves access and saves delete_habit a metadata lookup later
+        spreadsheet = sheets_client.execute(service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields='sheets.properties(sheetId,title)'
+        ), "spreadsheets.get")
+        remember_sheet_ids(spreadsheet_id, spreadsheet)
         return True
     except HttpError as error:
         if error.resp.status in [403, 404]:
@@ -56,40 +111,128 @@ def create_new_sheet(creds):
     print(f"✅ Created Spreadsheet: https://docs.google.com/spreadsheets/d/{spreadsheet_id}\n")
     return spreadsheet_id
 
+'''show_stats prints per-operation Sheets API call counts and latency percentiles, and writes them to export_path (.json, or .prom/.txt for Prometheus text) when given.'''
+def show_stats(export_path=None):
+    if startup_timing:
+        print(f"\nStartup ({startup_timing['mode']} sign-in): {startup_timing['seconds']:.2f}s to authenticate")
+    print("\nSheets API usage this session:")
+    print(api_metrics.report())
+    if export_path:
+        api_metrics.export(export_path)
+        print(f"Stats written to {export_path}")
+    print()
+
+'''show_streaks prints each habit's current and longest streak and completion rate, from the completion history (see streaks).'''
+def show_streaks(creds, spreadsheet_id):
+    from package_lab13.streaks import engine_for
+    summary = engine_for(creds, spreadsheet_id).summary()
+    if not summary:
+        print("\nNo completions logged yet.\n")
+        return
+    print("\nStreaks:")
+    for habit in summary:
+        print(f"  {habit['task']}: {habit['current_streak']} day(s) (best {habit['longest_streak']}), "
+              f"done {habit['completion_rate']:.0%} of days")
+    print()
+
+'''show_due prints the overdue habits and those due in the next week, from the sheet's due index (see stores.sheets_store).'''
+def show_due(creds, spreadsheet_id):
+    from package_lab13.stores import print_due, sheets_store
+    print_due(sheets_store(creds, spreadsheet_id))
+
+'''parse_args reads the command-line options of the interactive tracker.'''
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Habit Tracker backed by Google Sheets.")
+    parser.add_argument("--stats", action="store_true", help="print Sheets API call statistics on exit")
+    parser.add_argument("--stats-export", metavar="PATH", help="also write the statistics to PATH (.json, or .prom/.txt for Prometheus text)")
+    parser.add_argument("--offline", action="store_true", help="work on a local copy of the sheet and sync changes when online (see package_lab13.offline)")
+    parser.add_argument("--sheet", default=os.environ.get("HABIT_TRACKER_SHEET"), help="spreadsheet ID to open instead of asking (needed to start --offline without a connection)")
+    parser.add_argument("--store", choices=("sheets", "sqlite", "memory"), default=os.environ.get("HABIT_TRACKER_STORE", "sheets"),
+                        help="where habits are kept: the Google Sheet (default), a local SQLite file or memory only (see package_lab13.stores)")
+    parser.add_argument("--db", metavar="PATH", default="habits.db", help="database file for --store sqlite")
+    return parser.parse_args(argv)
+
 '''main handles the logic for displaying the main menu and processing user interactions'''
-def main():
-    creds = authenticate_user()  # get the user's Google credentials
+def main(argv=None):
+    from google.auth.exceptions import TransportError
+    from package_lab13.history import history_log
+    args = parse_args(argv)
+    if args.store != "sheets":
+        # Local backends need no Google account
+        from package_lab13.stores import menu, open_store
+        with open_store(args.store, path=args.db) as store:
+            menu(store)
+        return
+
+    try:
+        creds = authenticate_user()  # get the user's Google credentials
+    except TransportError:
+        if not (args.offline and args.sheet):
+            raise
+        # No connection to refresh the token: the client refreshes it on the first sync once back online
+        creds = load_cached_credentials()
+        startup_timing.update(mode="offline", seconds=0.0)
+    print(f"Signed in ({startup_timing['mode']}) in {startup_timing['seconds']:.2f}s\n")
 
     # check if the user already has a habit tracker sheet, handle program logic accordingly, and get a reference to the spreadsheet id
-    spreadsheet_id = choose_or_create_sheet(creds)
+    spreadsheet_id = args.sheet or choose_or_create_sheet(creds)
+
+    if args.offline:
+        from package_lab13.offline import OfflineTracker, menu
+        try:
+            with OfflineTracker(creds, spreadsheet_id) as tracker:
+                menu(tracker)
+        finally:
+            history_log.flush_all()  # completions are logged in batches (see history)
+        if args.stats or args.stats_export:
+            show_stats(args.stats_export)
+        return
 
     # main menu logic
-    while True:
-        print("Menu:")
-        print("  1. Add Habit")
-        print("  2. Mark Habit Complete")
-        print("  3. Edit Habit")
-        print("  4. Delete Habit")
-        print("  5. Show Habit List")
-        print("  6. Exit")
-        choice = input("Choose an option (1–6): ")
-
-        if choice == "1":
-            habit = input("Enter a habit to track: ")
-            add_habit(creds, spreadsheet_id, habit)
-        elif choice == "2":
-            mark_habit_complete(creds, spreadsheet_id)
-        elif choice == "3":
-            edit_habit(creds, spreadsheet_id)
-        elif choice == "4":
-            delete_habit(creds, spreadsheet_id)
-        elif choice == "5":
-            show_habits(creds, spreadsheet_id)
-        elif choice == "6":
-            print("\nGoodbye!")
-            break
-        else:
-            print("\nInvalid choice.\n")
+    try:
+        while True:
+            print("Menu:")
+            print("  1. Add Habit")
+            print("  2. Mark Habit Complete")
+            print("  3. Edit Habit")
+            print("  4. Delete Habit")
+            print("  5. Show Habit List")
+            print("  6. Mark Several Habits Complete")
+            print("  7. Show API Stats")
+            print("  8. Show Streaks")
+            print("  9. Show Due Habits")
+            print("  10. Exit")
+            choice = input("Choose an option (1–10): ")
+
+            if choice == "1":
+                habit = input("Enter a habit to track: ")
+                add_habit(creds, spreadsheet_id, habit)
+            elif choice == "2":
+                mark_habit_complete(creds, spreadsheet_id)
+            elif choice == "3":
+                edit_habit(creds, spreadsheet_id)
+            elif choice == "4":
+                delete_habit(creds, spreadsheet_id)
+            elif choice == "5":
+                show_habits(creds, spreadsheet_id)
+            elif choice == "6":
+                bulk_mark_habits_complete(creds, spreadsheet_id)
+            elif choice == "7":
+                show_stats(args.stats_export)
+            elif choice == "8":
+                show_streaks(creds, spreadsheet_id)
+            elif choice == "9":
+                show_due(creds, spreadsheet_id)
+            elif choice == "10":
+                break
+            else:
+                print("\nInvalid choice.\n")
+    finally:
+        history_log.flush_all()  # completions are logged in batches (see history), so send them however the session ends
+
+    if args.stats or args.stats_export:
+        show_stats(args.stats_export)
+    print("\nGoodbye!")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,121 @@
+'''metrics records every Sheets API call made through sheets_client.execute and reports per-operation statistics.'''
+import collections
+import json
+import math
+import threading
+
+# How many individual calls (and latency samples per operation) are kept for percentiles and export
+MAX_SAMPLES = 10_000
+
+'''percentile returns the p-th percentile (0-100) of an already sorted list using the nearest-rank method.'''
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+class ApiMetrics:
+    '''Collects one record per API call: operation, range, latency, response size, retries and status.'''
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.calls = collections.deque(maxlen=max_samples)
+        self._ops = {}
+        self._lock = threading.Lock()
+
+    '''record adds one API call. response_bytes may be None when the size is unknown.'''
+    def record(self, operation, range_name, seconds, response_bytes=None, retries=0, status="ok"):
+        call = {
+            "operation": operation,
+            "range": range_name,
+            "seconds": seconds,
+            "response_bytes": response_bytes,
+            "retries": retries,
+            "status": status,
+        }
+        with self._lock:
+            self.calls.append(call)
+            op = self._ops.get(operation)
+            if op is None:
+                op = self._ops[operation] = {
+                    "count": 0, "errors": 0, "retries": 0, "seconds": 0.0, "response_bytes": 0,
+                    "samples": collections.deque(maxlen=self.max_samples),
+                }
+            op["count"] += 1
+            op["errors"] += status != "ok"
+            op["retries"] += retries
+            op["seconds"] += seconds
+            op["response_bytes"] += response_bytes or 0
+            op["samples"].append(seconds)
+
+    '''summary returns per-operation counts, totals and latency percentiles (in milliseconds).'''
+    def summary(self):
+        with self._lock:
+            ops = {name: dict(op, samples=sorted(op["samples"])) for name, op in self._ops.items()}
+        result = {}
+        for name, op in sorted(ops.items()):
+            samples = op.pop("samples")
+            result[name] = dict(
+                op,
+                p50_ms=percentile(samples, 50) * 1000,
+                p90_ms=percentile(samples, 90) * 1000,
+                p99_ms=percentile(samples, 99) * 1000,
+                max_ms=(samples[-1] if samples else 0.0) * 1000,
+            )
+        return result
+
+    '''report formats the summary as a table for the CLI.'''
+    def report(self):
+        summary = self.summary()
+        if not summary:
+            return "No Sheets API calls recorded yet."
+        lines = [f"{'operation':<28}{'calls':>7}{'errors':>8}{'retries':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'KB in':>10}"]
+        for name, op in summary.items():
+            lines.append(f"{name:<28}{op['count']:>7}{op['errors']:>8}{op['retries']:>9}"
+                         f"{op['p50_ms']:>9.1f}{op['p90_ms']:>9.1f}{op['p99_ms']:>9.1f}{op['response_bytes'] / 1024:>10.1f}")
+        return "\n".join(lines)
+
+    '''to_prometheus renders the summary in the Prometheus text exposition format.'''
+    def to_prometheus(self):
+        summary = self.summary()
+        lines = []
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        metric("habit_tracker_api_requests_total", "counter", "Sheets API requests by operation.",
+               [f'habit_tracker_api_requests_total{{operation="{n}"}} {op["count"]}' for n, op in summary.items()])
+        metric("habit_tracker_api_errors_total", "counter", "Sheets API requests that failed.",
+               [f'habit_tracker_api_errors_total{{operation="{n}"}} {op["errors"]}' for n, op in summary.items()])
+        metric("habit_tracker_api_retries_total", "counter", "Retries issued for Sheets API requests.",
+               [f'habit_tracker_api_retries_total{{operation="{n}"}} {op["retries"]}' for n, op in summary.items()])
+        metric("habit_tracker_api_response_bytes_total", "counter", "Response payload bytes received.",
+               [f'habit_tracker_api_response_bytes_total{{operation="{n}"}} {op["response_bytes"]}' for n, op in summary.items()])
+        samples = []
+        for n, op in summary.items():
+            for quantile, key in (("0.5", "p50_ms"), ("0.9", "p90_ms"), ("0.99", "p99_ms")):
+                samples.append(f'habit_tracker_api_request_seconds{{operation="{n}",quantile="{quantile}"}} {op[key] / 1000:.6f}')
+            samples.append(f'habit_tracker_api_request_seconds_sum{{operation="{n}"}} {op["seconds"]:.6f}')
+            samples.append(f'habit_tracker_api_request_seconds_count{{operation="{n}"}} {op["count"]}')
+        metric("habit_tracker_api_request_seconds", "summary", "Sheets API request latency.", samples)
+        return "\n".join(lines) + "\n"
+
+    '''export writes the metrics to path: Prometheus text for .prom/.txt files, JSON (summary plus recent calls) otherwise.'''
+    def export(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith((".prom", ".txt")):
+                f.write(self.to_prometheus())
+            else:
+                with self._lock:
+                    calls = list(self.calls)
+                json.dump({"summary": self.summary(), "calls": calls}, f, indent=2)
+
+    '''reset forgets everything recorded so far.'''
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self._ops.clear()
+
+# The process-wide collector used by sheets_client.execute
+api_metrics = ApiMetrics()
@@ -0,0 +1,113 @@
+'''multi_sheet runs habit operations across many Habit Tracker spreadsheets at once and aggregates the results.
+
+Each spreadsheet is handled by one task on a bounded thread pool, so the network round
+trips of different sheets overlap instead of queueing behind each other. The workers
+share one Sheets client but each uses its own HTTP connection (httplib2 is not
+thread-safe, see sheets_client.PER_THREAD_HTTP), and all of them draw from the process-wide token
+buckets in ratelimit, so the sweep as a whole still respects the per-user quota: with
+the default 60 reads/min, reading 500 sheets is bounded by the quota (about 8 minutes)
+rather than by 500 sequential round trips.
+
+With batch_reads, the sheets are first read with batched values().get calls (one HTTP
+exchange per 100 sheets, see batching) into the row cache, so the workers only send
+the writes.
+
+A failure on one spreadsheet (no access, deleted sheet, retries exhausted) is recorded
+in its result and does not stop the others.
+'''
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from package_lab13 import google_sheets, records, row_cache, sheets_client
+
+# Spreadsheets processed at once. More workers than the quota allows per second only adds waiting threads.
+DEFAULT_WORKERS = 8
+
+# A report only looks at the name, target date and status of each habit
+REPORT_COLUMNS = (google_sheets.TASK_COLUMN, google_sheets.TARGET_COLUMN, google_sheets.STATUS_COLUMN)
+
+_per_thread_lock = threading.Lock()
+_active_runs = 0
+_saved_per_thread_http = None  # sheets_client.PER_THREAD_HTTP before the first active run turned it on
+
+'''run_across calls operation(creds, spreadsheet_id) for every spreadsheet on a pool of `workers` threads. Returns {spreadsheet_id: {"ok": True, "result": ...} or {"ok": False, "error": "..."}} in input order; progress(done, total) is called as sheets finish.'''
+def run_across(creds, spreadsheet_ids, operation, workers=DEFAULT_WORKERS, progress=None):
+    global _active_runs, _saved_per_thread_http
+    spreadsheet_ids = list(dict.fromkeys(spreadsheet_ids))  # drop duplicates, keep order
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    with _per_thread_lock:
+        if _active_runs == 0:
+            _saved_per_thread_http = sheets_client.PER_THREAD_HTTP
+        _active_runs += 1
+        sheets_client.PER_THREAD_HTTP = True
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="habit-sweep") as pool:
+            futures = {pool.submit(operation, creds, sid): sid for sid in spreadsheet_ids}
+            for future in as_completed(futures):
+                sid = futures[future]
+                try:
+                    results[sid] = {"ok": True, "result": future.result()}
+                except Exception as error:  # HttpError, ValueError, ... belong to this sheet only
+                    results[sid] = {"ok": False, "error": str(error)}
+                if progress is not None:
+                    progress(len(results), len(spreadsheet_ids))
+    finally:
+        with _per_thread_lock:
+            _active_runs -= 1
+            if _active_runs == 0:
+                sheets_client.PER_THREAD_HTTP = _saved_per_thread_http
+    return {sid: results[sid] for sid in spreadsheet_ids}
+
+'''read_habits returns the habit rows of one spreadsheet.'''
+def read_habits(creds, spreadsheet_id):
+    return google_sheets.get_sheet_data(creds, spreadsheet_id)
+
+'''sheet_report counts the habits of one spreadsheet: total, complete, due today and still open today.'''
+def sheet_report(creds, spreadsheet_id, data=None):
+    if data is None:
+        data = google_sheets.get_sheet_data(creds, spreadsheet_id, columns=REPORT_COLUMNS)
+    habits = records.HabitColumns.from_rows(data)  # decoded once; the counts below only scan arrays
+    complete = habits.count_complete()
+    due = habits.due_on(records.today())
+    return {
+        "habits": len(habits),
+        "complete": complete,
+        "incomplete": len(habits) - complete,
+        "due_today": len(due),
+        "due_today_open": sum(1 for index in due if not habits.statuses[index]),
+    }
+
+'''complete_due_today marks every habit due today complete in one spreadsheet (one read, at most one write) and returns its report from before the change plus what was completed.'''
+def complete_due_today(creds, spreadsheet_id):
+    data = google_sheets.get_sheet_data(creds, spreadsheet_id, columns=REPORT_COLUMNS + (google_sheets.ID_COLUMN,))
+    report = sheet_report(creds, spreadsheet_id, data)
+    completed, _ = google_sheets.mark_habits_complete(creds, spreadsheet_id, due_today=True, data=data)
+    report["completed_now"] = completed
+    return report
+
+'''summarize adds the per-sheet reports into totals.'''
+def summarize(results):
+    totals = {"sheets": len(results), "failed": 0, "habits": 0, "complete": 0, "due_today": 0, "due_today_open": 0, "completed_now": 0}
+    for outcome in results.values():
+        if not outcome["ok"]:
+            totals["failed"] += 1
+            continue
+        report = outcome["result"]
+        for key in ("habits", "complete", "due_today", "due_today_open"):
+            totals[key] += report[key]
+        totals["completed_now"] += len(report.get("completed_now", []))
+    return totals
+
+'''sweep reports on (and with complete_today=True, ticks off today's habits in) every spreadsheet. Returns {"sheets": per-sheet results, "totals": ..., "seconds": ...}.'''
+def sweep(creds, spreadsheet_ids, complete_today=False, workers=DEFAULT_WORKERS, progress=None, batch_reads=False):
+    start = time.perf_counter()
+    if batch_reads and row_cache.ENABLED:
+        # Sheets that fail here are simply read (and reported) again by their worker
+        google_sheets.get_many_sheet_data(creds, spreadsheet_ids)
+    operation = complete_due_today if complete_today else sheet_report
+    results = run_across(creds, spreadsheet_ids, operation, workers, progress)
+    return {"sheets": results, "totals": summarize(results), "seconds": time.perf_counter() - start}
@@ -0,0 +1,220 @@
+'''offline lets the tracker work without a connection: habit actions go to a local SQLite replica of the sheet and a journal of pending changes, which sync() later sends to the sheet.
+
+An OfflineTracker keeps one database per spreadsheet. add / update / complete / delete
+change the replica and append a journal entry holding the new values and the values the
+entry expects the sheet to have. Nothing touches the network, so these return at once
+and keep working on a flaky connection. Reads (list) come from the replica.
+
+sync() reads the sheet once, replays the journal over it in order and sends every
+resulting change in one spreadsheets().batchUpdate: updateCells for changed rows,
+appendCells for new habits and deleteDimension for deleted ones (highest rows first).
+The replica is then rebuilt from the result, without a second read.
+
+Rows are matched by their hidden habit ID (column F), not their position. An entry
+conflicts when the sheet no longer holds what it expected: the habit was deleted
+elsewhere, a field it changes was changed elsewhere to a different value, or (for a
+delete) the habit was edited elsewhere. Conflicting entries are dropped, so the sheet
+wins, and they are listed in the sync report. Edits to different fields of the same
+habit merge. The Updated column never conflicts; it is stamped with the time of the
+local action. Status changes that were applied go to the completion history (see
+history) with the time they were made offline.
+
+    tracker = OfflineTracker(creds, spreadsheet_id)
+    tracker.add("Stretch")              # instant, works offline
+    report = tracker.sync()             # {"applied": 1, "conflicts": [], "changes": 1}
+'''
+import json
+import os
+
+from package_lab13 import google_sheets, sheets_client
+from package_lab13.google_sheets import ID_COLUMN, STATUS_COLUMN, TASK_COLUMN, UPDATED_COLUMN, habit_id_of
+from package_lab13.history import history_log
+from package_lab13.row_cache import habit_rows
+from package_lab13.stores import SQLiteStore, menu as store_menu
+
+# Where the local databases live (one <spreadsheet ID>.db per spreadsheet)
+OFFLINE_DIR = os.environ.get("HABIT_TRACKER_OFFLINE_DIR", os.path.join("~", ".habit-tracker"))
+
+# Next to the habits table of SQLiteStore (the replica)
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,               -- add | update | delete
+    habit_id TEXT NOT NULL,
+    fields TEXT NOT NULL,           -- JSON {column index: new value}
+    expected TEXT NOT NULL,         -- JSON {column index: value the sheet should still have}
+    at TEXT NOT NULL                -- Updated timestamp of the local action
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+'''default_path returns the database file used for a spreadsheet when none is given.'''
+def default_path(spreadsheet_id):
+    return os.path.join(os.path.expanduser(OFFLINE_DIR), f"{spreadsheet_id}.db")
+
+'''_cell returns column col of a row, "" past its end.'''
+def _cell(row, col):
+    return row[col] if col < len(row) else ""
+
+'''_cell_data wraps a row's values for updateCells / appendCells.'''
+def _cell_data(row):
+    return {"values": [{"userEnteredValue": {"stringValue": value}} for value in row]}
+
+class OfflineTracker(SQLiteStore):
+    '''A SQLiteStore holding a replica of one Habit Tracker sheet, plus the journal of changes not yet synced.
+
+    The HabitStore operations (list, add, update, complete, delete, ...) work on the
+    replica and journal every change; see the module docstring.
+    '''
+
+    name = "offline"
+
+    def __init__(self, creds, spreadsheet_id, path=None, sheet_name='Habit Tracker'):
+        super().__init__(path or default_path(spreadsheet_id))
+        self.db.executescript(JOURNAL_SCHEMA)
+        self.creds = creds
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet_name = sheet_name
+
+    '''pending returns the number of journal entries waiting for sync.'''
+    def pending(self):
+        return self.db.execute("SELECT COUNT(*) FROM journal").fetchone()[0]
+
+    '''has_replica tells whether the sheet has been synced at least once.'''
+    def has_replica(self):
+        return self.db.execute("SELECT 1 FROM meta WHERE key = 'synced_at'").fetchone() is not None
+
+    '''_record journals one local change for the next sync (called by the HabitStore operations).'''
+    def _record(self, op, row, fields, expected, at):
+        self.db.execute("INSERT INTO journal (op, habit_id, fields, expected, at) VALUES (?, ?, ?, ?, ?)",
+                        (op, row[ID_COLUMN], json.dumps(fields), json.dumps(expected), at))
+
+    # ----- sync -----
+
+    '''sync replays the journal to the sheet with one read and one batchUpdate, then refreshes the replica. With an empty journal it just pulls the sheet. Returns {"applied": entries replayed, "conflicts": [...], "changes": requests in the batchUpdate}. Network errors propagate and leave the journal untouched for the next attempt. The batchUpdate is never resent after an unknown outcome (see sheets_client.NOT_IDEMPOTENT); instead the next sync re-reads the sheet, and replaying is idempotent, so a batch that did land is not applied twice.'''
+    def sync(self):
+        sid = self.spreadsheet_id
+        habit_rows.invalidate(sid)  # always start from what the sheet holds now
+        remote = [list(row) for row in google_sheets.get_sheet_data(self.creds, sid)]
+        working = [list(row) for row in remote]
+        by_id = {habit_id_of(row): row for row in working if habit_id_of(row)}
+        for row in working:
+            if row and not habit_id_of(row):
+                # Added in the browser or before IDs existed: give it one so it can be tracked
+                row.extend([""] * (ID_COLUMN + 1 - len(row)))
+                row[ID_COLUMN] = google_sheets.new_habit_id()
+                by_id[row[ID_COLUMN]] = row
+
+        entries = self.db.execute("SELECT seq, op, habit_id, fields, expected, at FROM journal ORDER BY seq").fetchall()
+        added, deleted, conflicts, events = [], set(), [], []
+        for seq, op, habit_id, fields, expected, at in entries:
+            fields = {int(col): value for col, value in json.loads(fields).items()}
+            expected = {int(col): value for col, value in json.loads(expected).items()}
+            conflict = self._replay(op, habit_id, fields, expected, at, by_id, added, deleted)
+            if conflict:
+                conflicts.append({"op": op, "habit_id": habit_id, "habit": fields.get(TASK_COLUMN) or expected.get(TASK_COLUMN, ""), "reason": conflict})
+            elif op == "update" and STATUS_COLUMN in fields:
+                events.append([at, habit_id, by_id[habit_id][TASK_COLUMN], fields[STATUS_COLUMN]])
+
+        requests = self._requests(remote, working, added, deleted)
+        if requests:
+            sheets_client.execute(google_sheets.get_service(self.creds).spreadsheets().batchUpdate(
+                spreadsheetId=sid,
+                body={"requests": requests}
+            ), "spreadsheets.batchUpdate")
+
+        rows = [row for row in working if habit_id_of(row) not in deleted] + added
+        with self.db:
+            self.db.execute("DELETE FROM journal")
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('synced_at', ?)", (google_sheets.format_updated_time(),))
+            self.replace(rows)  # commits all three together
+        if requests:
+            google_sheets._wrote(sid)
+            google_sheets._remember_rows(sid, [google_sheets._trim_row(list(row)) for row in rows])
+        history_log.record(self.creds, sid, events)
+        return {"applied": len(entries) - len(conflicts), "conflicts": conflicts, "changes": len(requests)}
+
+    '''_replay applies one journal entry to the working copy of the sheet. Returns a conflict reason, or None when the entry applied.'''
+    def _replay(self, op, habit_id, fields, expected, at, by_id, added, deleted):
+        if op == "add":
+            if habit_id in by_id:
+                return None  # reached the sheet in a sync whose reply was lost
+            row = [fields.get(col, "") for col in range(ID_COLUMN + 1)]
+            added.append(row)
+            by_id[habit_id] = row
+            return None
+
+        row = by_id.get(habit_id)
+        if row is None or habit_id in deleted:
+            return None if op == "delete" else "deleted in the sheet"
+        for col, value in expected.items():
+            current = _cell(row, col)
+            if current != value and (op == "delete" or current != fields.get(col)):
+                return "changed in the sheet"
+
+        if op == "delete":
+            if any(new is row for new in added):
+                added[:] = [new for new in added if new is not row]  # never reached the sheet
+                del by_id[habit_id]
+            else:
+                deleted.add(habit_id)
+            return None
+        row.extend([""] * (ID_COLUMN + 1 - len(row)))
+        for col, value in fields.items():
+            row[col] = value
+        row[UPDATED_COLUMN] = at
+        return None
+
+    '''_requests builds the batchUpdate requests that turn the sheet (remote) into the working copy.'''
+    def _requests(self, remote, working, added, deleted):
+        sheet_id = None
+        if any(google_sheets._trim_row(list(new)) != google_sheets._trim_row(list(old)) for old, new in zip(remote, working)) or added or deleted:
+            sheet_id = google_sheets.get_sheet_id(self.creds, self.spreadsheet_id, self.sheet_name)
+            if sheet_id is None:
+                raise ValueError(f"Could not find the sheet ID of '{self.sheet_name}'")
+
+        requests = []
+        for index, (old, new) in enumerate(zip(remote, working)):
+            if habit_id_of(new) in deleted or google_sheets._trim_row(list(new)) == google_sheets._trim_row(list(old)):
+                continue
+            requests.append({"updateCells": {
+                "start": {"sheetId": sheet_id, "rowIndex": index + 1, "columnIndex": 0},  # + 1 for the header
+                "rows": [_cell_data(new)],
+                "fields": "userEnteredValue",
+            }})
+        if added:
+            requests.append({"appendCells": {"sheetId": sheet_id, "rows": [_cell_data(row) for row in added], "fields": "userEnteredValue"}})
+
+        # Deletions go last and bottom-up, so neither the updates above nor each other shift their rows
+        numbers = [index + 1 for index, row in enumerate(working) if habit_id_of(row) in deleted]
+        for start, end in google_sheets.row_ranges(numbers):
+            requests.append({"deleteDimension": {
+                "range": {"sheetId": sheet_id, "dimension": "ROWS", "startIndex": start + 1, "endIndex": end + 1}
+            }})
+        return requests
+
+# ----- interactive menu -----
+
+'''try_sync syncs and prints the outcome; a failed sync (e.g. still offline) keeps the journal for later. Returns True on success.'''
+def try_sync(tracker):
+    pending = tracker.pending()
+    try:
+        report = tracker.sync()
+    except Exception as error:  # no network, expired token, API error: all mean "try again later"
+        print(f"\n⚠️  Sync failed ({error}); {pending} change(s) kept for the next sync.\n")
+        return False
+    print(f"\n🔄 Synced {report['applied']} change(s) ({report['changes']} sheet update(s) in one request).")
+    for conflict in report["conflicts"]:
+        print(f"  ⚠️  Not applied ({conflict['reason']}): {conflict['op']} '{conflict['habit']}'")
+    print()
+    return True
+
+'''menu runs the interactive tracker (stores.menu) against the local replica. Every action is local; changes go to the sheet on "Sync Now" and on exit.'''
+def menu(tracker):
+    if not tracker.has_replica():
+        print("Downloading your habits for offline use...")
+        if not try_sync(tracker):
+            print("The first offline session needs a connection to download the sheet.\n")
+            return
+    store_menu(tracker, sync=lambda: try_sync(tracker), pending=tracker.pending,
+               status=lambda: f"offline, {tracker.pending()} change(s) not synced")
@@ -0,0 +1,155 @@
+'''queries finds habits by completion status, name or last update, transferring as few rows as the Sheets API allows.
+
+The values API has no "where" clause, and developer metadata can only tag rows, not match
+cell values. So the status filter is pushed into the spreadsheet itself: a hidden
+"Habit Queries" tab (added on first use) holds a FILTER formula over the Habit Tracker
+rows, and reading that tab transfers only the matching rows (each with its sheet row
+number). With 50 open habits out of 50k rows, an "incomplete" query reads about 50 rows.
+
+    A1  every habit not marked ✅               (spills over A:G)
+
+A name search is a read only: it fetches the Task column (kept in the row cache for the
+next search), matches the names locally and then reads just the matching rows in one
+values().batchGet. Nothing is written to the sheet, so searching costs no write quota and
+clients searching at the same time can't disturb each other. "Updated since" cannot be
+filtered by the sheet: the Updated column holds text ("2025-04-23T14:37", or
+"4/23/2025 at 2:37 PM" on sheets not yet migrated), not dates. Both run locally on the rows
+of the status filter when combined with it. Local scans use the row cache when it holds
+the sheet.
+'''
+from googleapiclient.errors import HttpError
+
+from package_lab13 import google_sheets, sheets_client
+from package_lab13.google_sheets import STATUS_COLUMN, TASK_COLUMN, UPDATED_COLUMN
+from package_lab13.records import parse_updated
+from package_lab13.row_cache import habit_index, habit_rows
+
+QUERY_SHEET = 'Habit Queries'
+_ROWS = "ROW('Habit Tracker'!A2:A),'Habit Tracker'!A2:F"
+INCOMPLETE_FORMULA = f"=IFERROR(FILTER({{{_ROWS}}},'Habit Tracker'!A2:A<>\"\",'Habit Tracker'!D2:D<>\"✅\"),)"
+INCOMPLETE_RANGE = f"{QUERY_SHEET}!A1:G"
+
+# A name search with more matches than this reads the whole sheet instead of the matching rows
+MAX_NAMED_ROWS = 500
+
+'''ensure_query_sheet adds the hidden Habit Queries tab with its formula unless the spreadsheet already has it. Returns False when it can't be added (e.g. the sheet is shared read-only).'''
+def ensure_query_sheet(creds, spreadsheet_id):
+    if google_sheets.get_sheet_id(creds, spreadsheet_id, QUERY_SHEET) is not None:
+        return True
+    service = google_sheets.get_service(creds)
+    try:
+        reply = sheets_client.execute(service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={"requests": [{"addSheet": {"properties": {"title": QUERY_SHEET, "hidden": True}}}]}
+        ), "spreadsheets.batchUpdate")
+        google_sheets.remember_sheet_ids(spreadsheet_id, {"sheets": [reply["replies"][0]["addSheet"]]})
+        data = [{"range": f"{QUERY_SHEET}!A1", "values": [[INCOMPLETE_FORMULA]]}]
+        sheets_client.execute(service.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={"valueInputOption": "USER_ENTERED", "data": data}
+        ), "values.batchUpdate", ",".join(d["range"] for d in data))
+    except HttpError as error:
+        if error.resp.status == 400:
+            # Most likely another client added the tab first
+            google_sheets._sheet_ids.pop(spreadsheet_id, None)
+            return google_sheets.get_sheet_id(creds, spreadsheet_id, QUERY_SHEET) is not None
+        if error.resp.status == 403:
+            return False
+        raise
+    return True
+
+'''_read_matches reads a block of the query tab and turns its rows ([sheet row, A, ..., F]) into [(data row index, row)]. Returns None if the formula did not produce rows (an error value or an unevaluated formula).'''
+def _read_matches(creds, spreadsheet_id, range_name):
+    result = sheets_client.execute(google_sheets.get_service(creds).spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id,
+        range=range_name
+    ), "values.get", range_name)
+    matches = []
+    for row in result.get('values', []):
+        if not row or not row[0]:
+            continue
+        if not row[0].isdigit():
+            return None
+        matches.append((int(row[0]) - 2, google_sheets._trim_row(list(row[1:]))))
+    for index, row in matches:
+        habit_index.add(spreadsheet_id, index, [google_sheets.habit_id_of(row)])
+    return matches
+
+'''_matches applies every requested filter to one row (the local version of the query tab's formula).'''
+def _matches(row, incomplete=False, name_contains=None, updated_since=None):
+    if not row or not row[TASK_COLUMN]:
+        return False
+    if incomplete and len(row) > STATUS_COLUMN and row[STATUS_COLUMN] == "✅":
+        return False
+    if name_contains is not None and name_contains.lower() not in row[TASK_COLUMN].lower():
+        return False
+    if updated_since is not None:
+        updated = parse_updated(row[UPDATED_COLUMN] if len(row) > UPDATED_COLUMN else "")
+        if updated is None or updated < updated_since:
+            return False
+    return True
+
+'''_server_side asks the query tab for the incomplete habits. Returns [(index, row)], or None when the sheet can't answer (no tab, formula error).'''
+def _server_side(creds, spreadsheet_id):
+    if not ensure_query_sheet(creds, spreadsheet_id):
+        return None
+    try:
+        return _read_matches(creds, spreadsheet_id, INCOMPLETE_RANGE)
+    except HttpError as error:
+        if error.resp.status != 400:
+            raise
+        google_sheets._sheet_ids.pop(spreadsheet_id, None)  # the tab was removed; add it again next time
+        return None
+
+'''_named returns [(index, row)] for habits whose name contains text (case-insensitive): it reads the Task column, then only the matching rows (merged into contiguous ranges) with one values().batchGet. Returns None when there are more than MAX_NAMED_ROWS matches, which a full read serves better.'''
+def _named(creds, spreadsheet_id, text):
+    names = google_sheets.get_sheet_data(creds, spreadsheet_id, columns=(TASK_COLUMN,))
+    text = text.lower()
+    indices = [index for index, row in enumerate(names) if row and text in row[TASK_COLUMN].lower()]
+    if len(indices) > MAX_NAMED_ROWS:
+        return None
+    if not indices:
+        return []
+
+    ranges = sorted(google_sheets.row_ranges(index + 1 for index in indices))
+    range_names = [f"Habit Tracker!A{start + 2}:F{end + 1}" for start, end in ranges]
+    result = sheets_client.execute(google_sheets.get_service(creds).spreadsheets().values().batchGet(
+        spreadsheetId=spreadsheet_id,
+        ranges=range_names
+    ), "values.batchGet", ",".join(range_names))
+
+    matches = []
+    for (start, end), value_range in zip(ranges, result.get('valueRanges', [])):
+        rows = value_range.get('values', [])
+        rows += [[] for _ in range(end - start - len(rows))]
+        matches.extend((start + offset, row) for offset, row in enumerate(rows))
+    for index, row in matches:
+        habit_index.add(spreadsheet_id, index, [google_sheets.habit_id_of(row)])
+    return matches
+
+'''find_habits returns [(data row index, row)] for habits matching every given filter: incomplete (not ✅), name_contains (case-insensitive) and updated_since (a datetime). The status filter runs in the spreadsheet when possible and a name search reads only the matching rows, so few rows are transferred; see the module docstring.'''
+def find_habits(creds, spreadsheet_id, incomplete=False, name_contains=None, updated_since=None):
+    filters = {"incomplete": incomplete, "name_contains": name_contains, "updated_since": updated_since}
+    cached = habit_rows.get(spreadsheet_id)
+    candidates = None
+    if cached is None and incomplete:
+        candidates = _server_side(creds, spreadsheet_id)
+    elif cached is None and name_contains is not None:
+        candidates = _named(creds, spreadsheet_id, name_contains)
+    if candidates is None:
+        # Local scan: the cached rows, or one full read
+        rows = cached if cached is not None else google_sheets.get_sheet_data(creds, spreadsheet_id)
+        candidates = list(enumerate(rows))
+    return [(index, row) for index, row in candidates if _matches(row, **filters)]
+
+'''find_incomplete_habits returns [(data row index, row)] for every habit not marked ✅.'''
+def find_incomplete_habits(creds, spreadsheet_id):
+    return find_habits(creds, spreadsheet_id, incomplete=True)
+
+'''find_habits_named returns [(data row index, row)] for habits whose name contains text (case-insensitive).'''
+def find_habits_named(creds, spreadsheet_id, text):
+    return find_habits(creds, spreadsheet_id, name_contains=text)
+
+'''find_habits_updated_since returns [(data row index, row)] for habits whose Updated time is at or after since.'''
+def find_habits_updated_since(creds, spreadsheet_id, since):
+    return find_habits(creds, spreadsheet_id, updated_since=since)
@@ -0,0 +1,77 @@
+'''ratelimit paces Sheets API requests with token buckets so bulk work stays under the per-minute quotas.'''
+import os
+import threading
+import time
+
+# The Sheets API allows 60 read and 60 write requests per minute per user per project.
+# Override with HABIT_TRACKER_READS_PER_MINUTE / HABIT_TRACKER_WRITES_PER_MINUTE (0 = no pacing).
+DEFAULT_READS_PER_MINUTE = 60
+DEFAULT_WRITES_PER_MINUTE = 60
+
+# Operations that count against the read quota; everything else is a write
+READ_OPERATIONS = ("spreadsheets.get", "values.get", "values.batchGet", "values.batchGetByDataFilter")
+
+class TokenBucket:
+    '''Classic token bucket: holds up to `capacity` tokens and refills at `rate_per_minute`.
+
+    A full bucket lets a burst of `capacity` requests through at once (so interactive use
+    never waits); sustained bulk work is slowed to the refill rate.
+    '''
+
+    def __init__(self, rate_per_minute, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    '''acquire takes `tokens` tokens, sleeping until enough have refilled. Returns the seconds spent waiting.'''
+    def acquire(self, tokens=1):
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+'''_limit_from_env reads a per-minute limit from the environment (0 or negative disables pacing).'''
+def _limit_from_env(name, default):
+    value = float(os.environ.get(name, default))
+    return value if value > 0 else None
+
+_buckets = {}
+_lock = threading.Lock()
+
+'''configure_rate_limits sets the per-minute read and write limits shared by every thread in the process (None = unlimited).'''
+def configure_rate_limits(reads_per_minute=None, writes_per_minute=None, burst=None):
+    with _lock:
+        _buckets.clear()
+        if reads_per_minute:
+            _buckets["read"] = TokenBucket(reads_per_minute, burst)
+        if writes_per_minute:
+            _buckets["write"] = TokenBucket(writes_per_minute, burst)
+
+'''bucket_for returns the bucket an operation draws from, or None when that kind of request is not paced.'''
+def bucket_for(operation):
+    kind = "read" if operation in READ_OPERATIONS else "write"
+    return _buckets.get(kind)
+
+'''reset_rate_limits restores the limits from the environment / defaults with full buckets.'''
+def reset_rate_limits():
+    configure_rate_limits(
+        _limit_from_env("HABIT_TRACKER_READS_PER_MINUTE", DEFAULT_READS_PER_MINUTE),
+        _limit_from_env("HABIT_TRACKER_WRITES_PER_MINUTE", DEFAULT_WRITES_PER_MINUTE),
+    )
+
+reset_rate_limits()
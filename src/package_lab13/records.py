@@ -0,0 +1,383 @@
+'''records decodes habit rows once into typed Habit records, and packs large sheets into compact columns.
+
+Rows from the sheet are ragged lists of display strings. decode_rows turns a whole
+fetch into Habit records in one pass: the rows are padded and transposed, and each
+column goes through its own parser once per distinct value (a sheet typically has a
+few hundred distinct targets for 100k habits), so consumers never re-check lengths or
+re-parse "Wednesday, April 23 at 02:37 PM" themselves.
+
+    name      str
+    created   datetime, or None ("Unknown" / blank)
+    target    datetime; a date when only the day is set ("Friday, May 02 at TBD"); None for TBD
+    status    Status.COMPLETE / Status.INCOMPLETE
+    updated   datetime, or None when never updated
+    habit_id  str ("" for rows written before IDs existed)
+
+Dates are stored as ISO-8601 text, which sorts and compares as it reads:
+
+    created   2025-04-23T14:37
+    target    2025-05-01T14:30, 2025-05-01 (time TBD), T14:30 (date TBD) or "" (TBD)
+    updated   2025-04-21T20:29
+
+Cells written before that ("Wednesday, April 23 at 02:37 PM", "4/21/2025 at 8:29 PM")
+still parse, until google_sheets.migrate_dates rewrites them. Their created and target
+cells carry no year, so it is inferred from the weekday: the year closest to today in
+which that month and day fall on that weekday. display_row turns either form back
+into the readable text shown in the menu.
+
+HabitColumns holds the same data column by column in arrays (times as float seconds,
+statuses as bytes, names in one string with offsets), for large sheets: 100k habits
+take a fraction of the memory of the nested lists of strings they are decoded from.
+Works on Python 3.9+ (no slots dataclasses or union annotations).
+'''
+import enum
+import math
+import sys
+from array import array
+from datetime import date, datetime, timedelta
+
+import pytz
+
+EPOCH = datetime(1970, 1, 1)
+DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+ROW_WIDTH = 6  # columns A:F, as in google_sheets.HABIT_RANGE
+ISO_MINUTES = "%Y-%m-%dT%H:%M"  # how created, target and updated times are stored
+UPDATED_FORMAT = "%m/%d/%Y at %I:%M %p"  # Updated cells written before ISO storage
+DISPLAY_DAY = "%A, %B %d, %Y"
+DISPLAY_TIME = "%I:%M %p"
+YEARS_AROUND = 6  # how far from today a year-less date may be placed
+
+# target_kinds values
+NO_TARGET, TARGET_DAY, TARGET_TIME = 0, 1, 2
+
+class Status(enum.Enum):
+    '''The completion status in column D.'''
+
+    COMPLETE = "✅"
+    INCOMPLETE = "❌"
+
+    '''from_cell reads a status cell; anything but ✅ (including blank) is incomplete.'''
+    @classmethod
+    def from_cell(cls, text):
+        return cls.COMPLETE if text == cls.COMPLETE.value else cls.INCOMPLETE
+
+class Habit:
+    '''One habit with typed fields (see the module docstring).'''
+
+    __slots__ = ("name", "created", "target", "status", "updated", "habit_id")
+
+    def __init__(self, name="", created=None, target=None, status=Status.INCOMPLETE, updated=None, habit_id=""):
+        self.name = name
+        self.created = created
+        self.target = target
+        self.status = status
+        self.updated = updated
+        self.habit_id = habit_id
+
+    def __repr__(self):
+        return (f"Habit(name={self.name!r}, created={self.created!r}, target={self.target!r}, "
+                f"status={self.status}, updated={self.updated!r}, habit_id={self.habit_id!r})")
+
+    def __eq__(self, other):
+        if not isinstance(other, Habit):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    @property
+    def complete(self):
+        return self.status is Status.COMPLETE
+
+    '''target_day returns the target date (without time), or None.'''
+    @property
+    def target_day(self):
+        return self.target.date() if isinstance(self.target, datetime) else self.target
+
+    '''is_due tells whether the habit's target is on `day` (a date).'''
+    def is_due(self, day):
+        return self.target is not None and self.target_day == day
+
+'''today returns the current date in the tracker's time zone.'''
+def today():
+    return datetime.now(pytz.timezone('US/Eastern')).date()
+
+'''now returns the current wall-clock time in the tracker's time zone, without tzinfo (like the times parsed from cells).'''
+def now():
+    return datetime.now(pytz.timezone('US/Eastern')).replace(tzinfo=None, second=0, microsecond=0)
+
+'''infer_year returns the year closest to reference.year in which month/day falls on weekday (0 = Monday), or reference.year when none does.'''
+def infer_year(month, day, weekday, reference):
+    for distance in range(YEARS_AROUND + 1):
+        for year in (reference.year + distance, reference.year - distance):
+            try:
+                if date(year, month, day).weekday() == weekday:
+                    return year
+            except ValueError:  # February 29 outside leap years
+                continue
+    return reference.year
+
+'''parse_display_date reads "Wednesday, April 23" into a date (year inferred, see infer_year); None when it isn't one.'''
+def parse_display_date(text, reference=None):
+    weekday_name, _, month_day = text.partition(", ")
+    if weekday_name not in DAY_NAMES:
+        return None
+    try:
+        parsed = datetime.strptime(f"{month_day} 2000", "%B %d %Y")  # a leap year, so February 29 parses
+    except ValueError:
+        return None
+    year = infer_year(parsed.month, parsed.day, DAY_NAMES.index(weekday_name), reference or today())
+    try:
+        return date(year, parsed.month, parsed.day)
+    except ValueError:
+        return None
+
+'''parse_time reads "02:37 PM" (or ISO "14:37"); None for TBD or anything else.'''
+def parse_time(text):
+    for time_format in (DISPLAY_TIME, "%H:%M"):
+        try:
+            return datetime.strptime(text.strip(), time_format).time()
+        except ValueError:
+            continue
+    return None
+
+'''split_target splits a target cell (ISO or older display text) into (date or None, time or None).'''
+def split_target(text, reference=None):
+    if _is_stored(text):
+        day_text, _, time_text = text.partition("T")
+        try:
+            day = date.fromisoformat(day_text) if day_text else None
+        except ValueError:
+            day = None
+        return day, parse_time(time_text) if time_text else None
+    day_text, _, time_text = text.partition(" at ")
+    return parse_display_date(day_text, reference), parse_time(time_text)
+
+'''parse_target reads a target cell ("2025-05-01T14:30", or older "Thursday, May 01 at 02:30 PM") into a datetime, a date when the time is TBD, or None when there is no date.'''
+def parse_target(text, reference=None):
+    day, at = split_target(text, reference)
+    if day is None:
+        return None
+    return day if at is None else datetime.combine(day, at)
+
+'''format_target builds a target cell from a date and a time, either of which may be None (TBD).'''
+def format_target(day=None, at=None):
+    day_text = day.isoformat() if day is not None else ""
+    return f"{day_text}T{at.strftime('%H:%M')}" if at is not None else day_text
+
+'''format_timestamp formats a datetime the way created and updated times are stored.'''
+def format_timestamp(moment):
+    return moment.strftime(ISO_MINUTES)
+
+'''_is_iso tells whether a cell starts like an ISO date (YYYY-MM-DD).'''
+def _is_iso(text):
+    return len(text) >= 10 and text[4] == "-" and text[7] == "-" and text[:4].isdigit()
+
+'''_is_stored tells whether a target cell is in the stored ISO form: a date, "T" and a time, both, or empty.'''
+def _is_stored(text):
+    return not text or _is_iso(text) or (text[0] == "T" and text[1:2].isdigit())
+
+'''parse_created reads a Date Created cell (same format as a target) into a datetime; None when it is missing or unreadable.'''
+def parse_created(text, reference=None):
+    created = parse_target(text, reference)
+    if isinstance(created, date) and not isinstance(created, datetime):
+        return datetime.combine(created, datetime.min.time())
+    return created
+
+'''parse_updated reads an Updated cell ("2025-04-23T14:37", or older "4/23/2025 at 2:37 PM"); None when it is empty or not a timestamp.'''
+def parse_updated(value):
+    try:
+        return datetime.fromisoformat(value) if _is_iso(value) else datetime.strptime(value, UPDATED_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+'''display_target renders a target cell for people: "Thursday, May 01, 2025 at 02:30 PM", with TBD for a missing half. Text that isn't a target is shown as it is.'''
+def display_target(text):
+    if not _is_stored(text):
+        return text
+    day, at = split_target(text)
+    day_text = day.strftime(DISPLAY_DAY) if day is not None else "TBD"
+    return f"{day_text} at {at.strftime(DISPLAY_TIME)}" if at is not None else day_text
+
+'''display_timestamp renders a created / updated cell for people ("Wednesday, April 23, 2025 at 02:37 PM"); older or unreadable text is shown as it is.'''
+def display_timestamp(text):
+    if not _is_iso(text):
+        return text
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        return text
+    return moment.strftime(f"{DISPLAY_DAY} at {DISPLAY_TIME}")
+
+'''display_row returns a habit row's visible cells (A:E) as shown in the menu, with dates rendered by display_target / display_timestamp.'''
+def display_row(row):
+    cells = list(row[:ROW_WIDTH - 1]) + [""] * (ROW_WIDTH - 1 - len(row[:ROW_WIDTH - 1]))
+    return [cells[0], display_timestamp(cells[1]), display_target(cells[2]), cells[3], display_timestamp(cells[4])]
+
+'''migrate_row returns {column index: ISO value} for the created (B), target (C) and updated (E) cells of a row that are still in the older display formats. Cells already stored as ISO, and cells that can't be read (such as "Unknown"), are left out.'''
+def migrate_row(row, reference=None):
+    cells = list(row[:ROW_WIDTH]) + [""] * (ROW_WIDTH - len(row[:ROW_WIDTH]))
+    changes = {}
+    if not _is_stored(cells[1]) and parse_display_date(cells[1].partition(" at ")[0], reference) is not None:
+        changes[1] = format_timestamp(parse_created(cells[1], reference))
+    if not _is_stored(cells[2]):
+        day_text, _, time_text = cells[2].partition(" at ")
+        day, at = split_target(cells[2], reference)
+        if (day is not None or day_text == "TBD") and (at is not None or time_text == "TBD"):
+            changes[2] = format_target(day, at)
+    if not _is_stored(cells[4]) and parse_updated(cells[4]) is not None:
+        changes[4] = format_timestamp(parse_updated(cells[4]))
+    return changes
+
+'''_memoized wraps a one-argument parser so each distinct cell value is parsed once per decode.'''
+def _memoized(parse):
+    seen = {}
+
+    def cached(text):
+        try:
+            return seen[text]
+        except KeyError:
+            value = seen[text] = parse(text)
+            return value
+    return cached
+
+'''_columns pads rows to A:F and returns them as six column tuples.'''
+def _columns(rows):
+    width = ROW_WIDTH
+    padded = [row[:width] if len(row) >= width else list(row) + [""] * (width - len(row)) for row in rows]
+    if not padded:
+        return [()] * width
+    return list(zip(*padded))
+
+'''_decoded_columns runs every column of rows through its (memoized) parser and returns the six decoded columns.'''
+def _decoded_columns(rows, reference=None):
+    reference = reference or today()
+    names, created, targets, statuses, updated, habit_ids = _columns(rows)
+    return (
+        names,
+        list(map(_memoized(lambda text: parse_created(text, reference)), created)),
+        list(map(_memoized(lambda text: parse_target(text, reference)), targets)),
+        list(map(_memoized(Status.from_cell), statuses)),
+        list(map(_memoized(parse_updated), updated)),
+        habit_ids,
+    )
+
+'''decode_rows turns habit rows (as get_sheet_data returns them) into Habit records, parsing each distinct cell value once. reference is the date year-less dates are placed around (default today).'''
+def decode_rows(rows, reference=None):
+    return [Habit(*fields) for fields in zip(*_decoded_columns(list(rows), reference))]
+
+'''read_habits reads a sheet's habits (see get_sheet_data for columns) and decodes them; compact=True returns a HabitColumns instead of a list.'''
+def read_habits(creds, spreadsheet_id, columns=None, compact=False):
+    from package_lab13 import google_sheets  # records itself has no Sheets dependency
+    rows = google_sheets.get_sheet_data(creds, spreadsheet_id, columns=columns)
+    return HabitColumns.from_rows(rows) if compact else decode_rows(rows)
+
+'''_seconds converts a datetime / date to float seconds since 1970-01-01 (naive, like the sheet's times); NaN for None.'''
+def _seconds(value):
+    if value is None:
+        return math.nan
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    return (value - EPOCH).total_seconds()
+
+'''_datetime is the inverse of _seconds.'''
+def _datetime(seconds):
+    return None if math.isnan(seconds) else EPOCH + timedelta(seconds=seconds)
+
+class HabitColumns:
+    '''Habits stored column by column: one array per field instead of one list of strings per row.
+
+    Indexing returns a Habit; the arrays can also be scanned directly (see due_on).
+    '''
+
+    __slots__ = ("_names", "_name_ends", "_ids", "_id_ints", "statuses", "created", "targets", "target_kinds", "updated")
+
+    def __init__(self):
+        self._names = ""                  # every name, concatenated
+        self._name_ends = array("L")      # where each name ends in _names
+        self._ids = None                  # habit IDs as a list of strings, unless...
+        self._id_ints = None              # ...they are all 12-hex-digit IDs, kept as integers
+        self.statuses = array("b")        # 1 = complete, 0 = incomplete
+        self.created = array("d")         # seconds since 1970 (NaN = none)
+        self.targets = array("d")
+        self.target_kinds = array("b")    # NO_TARGET, TARGET_DAY or TARGET_TIME
+        self.updated = array("d")
+
+    '''from_rows decodes habit rows straight into columns (see decode_rows).'''
+    @classmethod
+    def from_rows(cls, rows, reference=None):
+        names, created, targets, statuses, updated, habit_ids = _decoded_columns(list(rows), reference)
+        columns = cls()
+        columns._names = "".join(names)
+        position = 0
+        for name in names:
+            position += len(name)
+            columns._name_ends.append(position)
+        if all(len(habit_id) == 12 and habit_id == habit_id.lower() and _is_hex(habit_id) for habit_id in habit_ids):
+            columns._id_ints = array("Q", (int(habit_id, 16) for habit_id in habit_ids))
+        else:
+            columns._ids = list(habit_ids)
+        columns.statuses = array("b", (status is Status.COMPLETE for status in statuses))
+        columns.created = array("d", map(_seconds, created))
+        columns.targets = array("d", map(_seconds, targets))
+        columns.target_kinds = array("b", (NO_TARGET if target is None else TARGET_TIME if isinstance(target, datetime) else TARGET_DAY
+                                           for target in targets))
+        columns.updated = array("d", map(_seconds, updated))
+        return columns
+
+    def __len__(self):
+        return len(self._name_ends)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("habit index out of range")
+        kind = self.target_kinds[index]
+        target = _datetime(self.targets[index])
+        return Habit(
+            name=self.name(index),
+            created=_datetime(self.created[index]),
+            target=None if kind == NO_TARGET else target if kind == TARGET_TIME else target.date(),
+            status=Status.COMPLETE if self.statuses[index] else Status.INCOMPLETE,
+            updated=_datetime(self.updated[index]),
+            habit_id=self.habit_id(index),
+        )
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    '''name returns the name of habit `index` without building the whole record.'''
+    def name(self, index):
+        start = self._name_ends[index - 1] if index else 0
+        return self._names[start:self._name_ends[index]]
+
+    '''habit_id returns the ID of habit `index`.'''
+    def habit_id(self, index):
+        return self._ids[index] if self._ids is not None else format(self._id_ints[index], "012x")
+
+    '''count_complete returns how many habits are ✅.'''
+    def count_complete(self):
+        return sum(self.statuses)
+
+    '''due_on returns the indices of habits whose target is on `day` (a date).'''
+    def due_on(self, day):
+        start = _seconds(day)
+        end = start + 86400
+        return [index for index, seconds in enumerate(self.targets) if start <= seconds < end]
+
+    '''memory_bytes estimates the memory the columns take (arrays, the name string and the ID list).'''
+    def memory_bytes(self):
+        total = sys.getsizeof(self._names) + sum(sys.getsizeof(column) for column in (
+            self._name_ends, self.statuses, self.created, self.targets, self.target_kinds, self.updated))
+        if self._id_ints is not None:
+            total += sys.getsizeof(self._id_ints)
+        else:
+            total += sys.getsizeof(self._ids) + sum(sys.getsizeof(habit_id) for habit_id in self._ids)
+        return total
+
+'''_is_hex tells whether text is made only of hexadecimal digits.'''
+def _is_hex(text):
+    try:
+        int(text, 16)
+        return True
+    except ValueError:
+        return False
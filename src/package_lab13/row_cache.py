@@ -0,0 +1,174 @@
+import itertools
+import os
+import re
+import threading
+import time
+
+# Set HABIT_TRACKER_CACHE=0 (or row_cache.ENABLED = False) to always read straight from the sheet
+ENABLED = os.environ.get("HABIT_TRACKER_CACHE", "1") != "0"
+
+# How long (in seconds) cached rows are trusted before the next read goes back to the sheet.
+# The Sheets API exposes no cheap revision/etag for a values range with the spreadsheets
+# scope alone, so a TTL is what bounds how stale edits made elsewhere can appear.
+TTL_SECONDS = float(os.environ.get("HABIT_TRACKER_CACHE_TTL", "60"))
+
+class RowCache:
+    '''Write-through cache of "Habit Tracker" data rows (A2:F), keyed by spreadsheet ID.
+
+    Rows are stored exactly as get_sheet_data returns them. Index 0 is sheet row 2.
+    An entry from a projected read (only some columns, see google_sheets.read_projection)
+    remembers which columns it holds and only answers reads of those columns.
+    Every stored entry gets a new generation, so whatever was built from cached rows
+    can tell when they were read from the sheet again.
+    '''
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._entries = {}  # spreadsheet_id -> [rows, fetched_at, columns (None = all), generation]
+        self._generations = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _ttl(self):
+        return TTL_SECONDS if self.ttl is None else self.ttl
+
+    '''get returns a copy of the cached rows, or None on a miss / expired entry / disabled cache. With columns, an entry holding at least those columns is enough.'''
+    def get(self, spreadsheet_id, columns=None):
+        if not ENABLED:
+            return None
+        with self._lock:
+            entry = self._entries.get(spreadsheet_id)
+            if entry is None:
+                return None
+            rows, fetched_at, cached_columns, _ = entry
+            if time.monotonic() - fetched_at > self._ttl():
+                del self._entries[spreadsheet_id]
+                return None
+            if cached_columns is not None and (columns is None or not set(columns) <= cached_columns):
+                return None
+            return list(rows)
+
+    '''store replaces the cached rows after a full read of the sheet (or of the given columns of every row).'''
+    def store(self, spreadsheet_id, rows, columns=None):
+        if not ENABLED:
+            return
+        with self._lock:
+            self._entries[spreadsheet_id] = [list(rows), time.monotonic(), None if columns is None else frozenset(columns), next(self._generations)]
+
+    '''generation returns the generation of the live entry holding every column, or None when there is none (a miss, an expired or projected entry, or a disabled cache). Writes recorded in place keep the generation; only a new read changes it.'''
+    def generation(self, spreadsheet_id):
+        if not ENABLED:
+            return None
+        with self._lock:
+            entry = self._entries.get(spreadsheet_id)
+            if entry is None or entry[2] is not None or time.monotonic() - entry[1] > self._ttl():
+                return None
+            return entry[3]
+
+    '''append adds rows written with values().append; the response's updatedRange is checked so a misplaced append invalidates instead of corrupting the cache.'''
+    def append(self, spreadsheet_id, rows, response=None):
+        with self._lock:
+            entry = self._entries.get(spreadsheet_id)
+            if entry is None:
+                return
+            first_row = first_updated_row(response)
+            if first_row != len(entry[0]) + 2:
+                # We can't tell where the sheet put the rows, so re-read next time
+                del self._entries[spreadsheet_id]
+                return
+            entry[0].extend(list(row) for row in rows)
+
+    '''update_cells overwrites values in one data row starting at column index col (0 = column A).'''
+    def update_cells(self, spreadsheet_id, index, col, values):
+        with self._lock:
+            entry = self._entries.get(spreadsheet_id)
+            if entry is None:
+                return
+            rows = entry[0]
+            if index < 0 or index >= len(rows):
+                del self._entries[spreadsheet_id]
+                return
+            row = list(rows[index])
+            if len(row) < col + len(values):
+                row.extend([""] * (col + len(values) - len(row)))
+            row[col:col + len(values)] = values
+            rows[index] = row
+
+    '''delete_rows removes data rows [start, end) after a deleteDimension request.'''
+    def delete_rows(self, spreadsheet_id, start, end):
+        with self._lock:
+            entry = self._entries.get(spreadsheet_id)
+            if entry is None:
+                return
+            del entry[0][start:end]
+
+    '''invalidate drops one spreadsheet from the cache, or everything when no ID is given.'''
+    def invalidate(self, spreadsheet_id=None):
+        with self._lock:
+            if spreadsheet_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(spreadsheet_id, None)
+
+class HabitIndex:
+    '''Stable habit ID (hidden column F) -> data row index (0 = sheet row 2), per spreadsheet.
+
+    Unlike RowCache entries these never expire and stay on when the row cache is
+    disabled: a position taken from here is always checked against the ID in the
+    sheet before anything is written there, so a stale entry costs one extra read
+    instead of a write to the wrong row.
+    '''
+
+    def __init__(self):
+        self._maps = {}  # spreadsheet_id -> {habit_id: index}
+        self._lock = threading.Lock()
+
+    '''rebuild replaces the map of one spreadsheet from its column of IDs, in row order ("" for rows without an ID).'''
+    def rebuild(self, spreadsheet_id, ids):
+        with self._lock:
+            self._maps[spreadsheet_id] = {habit_id: index for index, habit_id in enumerate(ids) if habit_id}
+
+    '''get returns the last known row index of a habit, or None.'''
+    def get(self, spreadsheet_id, habit_id):
+        with self._lock:
+            return self._maps.get(spreadsheet_id, {}).get(habit_id)
+
+    '''add records habit IDs written at consecutive rows starting at index (after an append or an ID assignment).'''
+    def add(self, spreadsheet_id, index, ids):
+        with self._lock:
+            ids_map = self._maps.setdefault(spreadsheet_id, {})
+            for offset, habit_id in enumerate(ids):
+                if habit_id:
+                    ids_map[habit_id] = index + offset
+
+    '''delete_rows forgets rows [start, end) and moves the ones below up, after a deleteDimension request.'''
+    def delete_rows(self, spreadsheet_id, start, end):
+        with self._lock:
+            ids_map = self._maps.get(spreadsheet_id)
+            if ids_map is None:
+                return
+            count = end - start
+            for habit_id, index in list(ids_map.items()):
+                if start <= index < end:
+                    del ids_map[habit_id]
+                elif index >= end:
+                    ids_map[habit_id] = index - count
+
+    '''invalidate drops one spreadsheet's map, or all of them when no ID is given.'''
+    def invalidate(self, spreadsheet_id=None):
+        with self._lock:
+            if spreadsheet_id is None:
+                self._maps.clear()
+            else:
+                self._maps.pop(spreadsheet_id, None)
+
+'''first_updated_row returns the first sheet row number from an append response's updatedRange (e.g. "'Habit Tracker'!A7:E7" -> 7).'''
+def first_updated_row(response):
+    if not isinstance(response, dict):
+        return None
+    updated_range = response.get("updates", {}).get("updatedRange", "")
+    match = re.search(r"![A-Z]+(\d+)", updated_range)
+    return int(match.group(1)) if match else None
+
+# The process-wide cache and ID index used by google_sheets
+habit_rows = RowCache()
+habit_index = HabitIndex()
@@ -0,0 +1,191 @@
+import email.utils
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from package_lab13 import ratelimit
+from package_lab13.metrics import api_metrics
+
+# Process-wide cache of built Sheets services, keyed by the credentials object.
+# Building a service parses the (bundled) discovery document and creates a new
+# authorized HTTP transport, so we only want to do it once per credential.
+_services = {}
+_lock = threading.Lock()
+
+# Set SHARE_CLIENTS to False to go back to building a fresh client on every call
+# (used by benchmarks/bench_clients.py to show the "before" numbers).
+SHARE_CLIENTS = True
+
+# Set PER_THREAD_HTTP to send each thread's requests over its own connection. An httplib2
+# connection must not be used by two threads at once, so code that calls the API from
+# several threads (daemon.py, multi_sheet.py) turns this on. The service object itself
+# is still shared: building one per thread would re-parse the discovery document each
+# time, which costs more than the requests a worker sends.
+PER_THREAD_HTTP = False
+_local = threading.local()
+_generation = 0  # bumped by reset_clients/use_transport so stale per-thread connections are dropped
+
+# When set, clients are built on this httplib2-compatible transport instead of an
+# authorized connection for the credentials (see fake_sheets.FakeSheetsServer)
+_transport = None
+
+# Counters describing how many clients this process has built
+client_stats = {"builds": 0, "reused": 0}
+
+'''get_service returns the Sheets v4 service for the given credentials, building it from the bundled static discovery document the first time (with googleapiclient's build unless another builder is given).'''
+def get_service(creds, builder=None):
+    if builder is None:
+        from googleapiclient.discovery import build as builder  # only now: importing the client takes most of a second
+    if not SHARE_CLIENTS:
+        return _build_service(creds, builder)
+
+    with _lock:
+        service = _services.get(creds)
+        if service is None:
+            service = _build_service(creds, builder)
+            _services[creds] = service
+        else:
+            client_stats["reused"] += 1
+    return service
+
+'''_thread_http returns the calling thread's own connection standing in for the shared transport `http`, or None when `http` is safe to share (e.g. the fake server's transport).'''
+def _thread_http(http):
+    credentials = getattr(http, "credentials", None)
+    if credentials is None:
+        return None
+    if getattr(_local, "generation", None) != _generation:
+        _local.generation = _generation
+        _local.connections = {}
+    connection = _local.connections.get(id(http))
+    if connection is None:
+        # Same credentials (so token refreshes are shared), new socket
+        from google_auth_httplib2 import AuthorizedHttp
+        from googleapiclient.http import build_http
+        connection = _local.connections[id(http)] = AuthorizedHttp(credentials, http=build_http())
+    return connection
+
+'''_build_service builds a single Sheets client without touching the cache.'''
+def _build_service(creds, builder):
+    client_stats["builds"] += 1
+    # static_discovery uses the discovery document shipped with googleapiclient
+    # instead of fetching it over the network; cache_discovery only applies to
+    # the network path and would just log a warning here.
+    if _transport is not None:
+        service = builder('sheets', 'v4', http=_transport, static_discovery=True, cache_discovery=False)
+    else:
+        service = builder('sheets', 'v4', credentials=creds, static_discovery=True, cache_discovery=False)
+    return _memoize_resources(service)
+
+'''_memoize_resources makes service.spreadsheets() and spreadsheets().values() return the same objects every time. googleapiclient builds a new Resource (and renders every method's docstring from the schema) on each of those calls, which costs far more than the HTTP request itself.'''
+def _memoize_resources(service):
+    from googleapiclient.discovery import Resource
+    if not isinstance(service, Resource):
+        return service  # test doubles and fakes are used as-is
+    spreadsheets = service.spreadsheets()
+    values = spreadsheets.values()
+    spreadsheets.values = lambda: values
+    service.spreadsheets = lambda: spreadsheets
+    return service
+
+'''use_transport makes every client built from now on use the given httplib2-compatible transport (None restores normal authorized connections). Cached clients are dropped. Returns the previous transport.'''
+def use_transport(http):
+    global _transport, _generation
+    with _lock:
+        previous, _transport = _transport, http
+        _services.clear()
+        _generation += 1
+    return previous
+
+'''reset_clients drops every cached service (e.g. after logging out or between tests).'''
+def reset_clients():
+    global _generation
+    with _lock:
+        _services.clear()
+        _generation += 1
+        client_stats["builds"] = 0
+        client_stats["reused"] = 0
+
+# Retry policy for execute(): truncated exponential backoff with full jitter
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 5
+BASE_DELAY = 1.0   # seconds; attempt n waits a random time up to BASE_DELAY * 2**n
+MAX_DELAY = 32.0
+_sleep = time.sleep
+_random = random.random
+
+# Requests that change the sheet relative to its current state: re-sending one that the server
+# already applied (its reply was lost to a 5xx or a dropped connection) would append rows twice
+# or delete the rows that moved up into a deleted range. They are only retried after 429.
+NOT_IDEMPOTENT = {"values.append", "spreadsheets.batchUpdate"}
+
+'''_is_retryable decides whether a request that failed with an HTTP status may be sent again. Requests in NOT_IDEMPOTENT are only retried after 429 (the request was rejected before it ran).'''
+def _is_retryable(operation, status):
+    if operation in NOT_IDEMPOTENT:
+        return status == 429
+    return status in RETRYABLE_STATUSES
+
+'''_is_retryable_drop decides whether a request whose connection dropped (or timed out) may be sent again: only if repeating it is harmless.'''
+def _is_retryable_drop(operation):
+    return operation not in NOT_IDEMPOTENT
+
+'''_retry_after returns the delay in seconds requested by a Retry-After header (seconds or HTTP date), or None.'''
+def _retry_after(error):
+    value = getattr(error, "resp", {}).get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+'''_backoff returns the jittered delay before retry number `attempt` (0-based).'''
+def _backoff(attempt):
+    return _random() * min(MAX_DELAY, BASE_DELAY * 2 ** attempt)
+
+'''execute runs one API request and records its operation name, range, latency, response size, retries and status in metrics.api_metrics. Every .execute() in the project goes through here. Requests are paced by the shared token buckets in ratelimit, and 429/5xx responses (and dropped connections) are retried with jittered exponential backoff, honoring Retry-After; writes in NOT_IDEMPOTENT only after 429.'''
+def execute(request, operation, range_name=None):
+    from googleapiclient.errors import HttpError
+    size = {}
+    postproc = getattr(request, "postproc", None)
+    if postproc is not None:
+        # HttpRequest hands the raw response body to postproc, which is the cheapest place to measure it
+        def measuring_postproc(resp, content):
+            size["bytes"] = len(content or b"")
+            return postproc(resp, content)
+        request.postproc = measuring_postproc
+
+    bucket = ratelimit.bucket_for(operation)
+    status = "ok"
+    retries = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                http = _thread_http(getattr(request, "http", None)) if PER_THREAD_HTTP else None
+                return request.execute(http=http) if http is not None else request.execute()
+            except HttpError as error:
+                status = str(error.resp.status)
+                if retries >= MAX_RETRIES or not _is_retryable(operation, error.resp.status):
+                    raise
+                delay = _retry_after(error)
+                if delay is None:
+                    delay = _backoff(retries)
+            except (ConnectionError, TimeoutError):
+                status = "error"
+                if retries >= MAX_RETRIES or not _is_retryable_drop(operation):
+                    raise
+                delay = _backoff(retries)
+            except Exception:
+                status = "error"
+                raise
+            retries += 1
+            _sleep(delay)
+            status = "ok"
+    finally:
+        api_metrics.record(operation, range_name, time.perf_counter() - start, size.get("bytes"), retries, status)
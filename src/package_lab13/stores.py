@@ -0,0 +1,528 @@
+'''stores separates what the tracker does with habits from where the habits are kept.
+
+HabitStore is the interface: list, append (any number of rows), add, update, complete
+and delete (any number of habits). Rows are shaped like get_sheet_data's
+([task, created, target, status, updated, habit ID]) and habits are picked by number,
+the 1-based position shown in the menu. The rules every backend shares (which fields an
+edit keeps, that completing stamps Updated and skips habits already ✅, ...) live in
+HabitStore. A backend only stores and fetches rows:
+
+    SheetsStore   the Google Sheet; google_sheets turns each operation into batched
+                  requests (A1 ranges, header-row math, deleteDimension)
+    SQLiteStore   a local SQLite database, keyed by habit ID and indexed by list position
+    MemoryStore   a Python list; no I/O at all, so it measures the logic on its own
+
+Every store also answers overdue / upcoming / due_between from a due_index.DueIndex it
+builds on first use and then keeps current as habits change. SheetsStore also rebuilds it
+when the sheet was written through anything else (google_sheets.write_count) or its rows
+were read again after the row cache expired or was invalidated (edits in the browser).
+
+open_store picks a backend by name, and menu runs the interactive tracker on any of them.
+benchmarks/bench_stores.py times the same operations on each backend.
+
+    store = open_store("sqlite", path="habits.db")
+    store.add("Stretch", "2025-05-01", "14:30")
+    store.complete([1, 2])
+'''
+import abc
+import contextlib
+import os
+import sqlite3
+from datetime import timedelta
+
+from package_lab13 import google_sheets, records
+from package_lab13.due_index import DueIndex
+from package_lab13.google_sheets import (CREATED_COLUMN, ID_COLUMN, STATUS_COLUMN, TARGET_COLUMN, TASK_COLUMN,
+                                         UPDATED_COLUMN)
+from package_lab13.row_cache import habit_rows
+
+BACKENDS = ("sheets", "sqlite", "memory")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS habits (
+    habit_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,      -- list order; gaps are fine
+    task TEXT NOT NULL DEFAULT '',
+    created TEXT NOT NULL DEFAULT '',
+    target TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    updated TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS habits_position ON habits (position);
+"""
+
+# The habits table's columns, in sheet order (A:E); the ID (F) is the key
+HABIT_COLUMNS = ("task", "created", "target", "status", "updated")
+
+'''padded returns a copy of row with exactly the columns A:F ("" for missing cells).'''
+def padded(row):
+    row = list(row[:ID_COLUMN + 1])
+    return row + [""] * (ID_COLUMN + 1 - len(row))
+
+class HabitStore(abc.ABC):
+    '''Where habits are kept. Subclasses implement list and the row primitives (_get, _insert, _write, _remove).'''
+
+    name = None
+    _due_index = None  # built by due_index() on first use
+
+    '''list returns every habit row, in list order.'''
+    @abc.abstractmethod
+    def list(self):
+        raise NotImplementedError
+
+    '''habits returns every habit decoded into a Habit record (see records).'''
+    def habits(self):
+        return records.decode_rows(self.list())
+
+    '''_get returns padded copies of the rows of the given habit numbers, in that order. Raises ValueError for a number that isn't in the list.'''
+    @abc.abstractmethod
+    def _get(self, numbers):
+        raise NotImplementedError
+
+    '''_insert adds rows at the end of the list.'''
+    @abc.abstractmethod
+    def _insert(self, rows):
+        raise NotImplementedError
+
+    '''_write stores changed rows over the rows with the same habit ID.'''
+    @abc.abstractmethod
+    def _write(self, rows):
+        raise NotImplementedError
+
+    '''_remove deletes rows (matched by habit ID).'''
+    @abc.abstractmethod
+    def _remove(self, rows):
+        raise NotImplementedError
+
+    '''_record is called for every change with the changed columns (fields) and the values they had before (expected); the offline tracker journals them.'''
+    def _record(self, op, row, fields, expected, at):
+        pass
+
+    '''_transaction groups the primitives of one operation (a database transaction for SQLite).'''
+    def _transaction(self):
+        return contextlib.nullcontext()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    '''due_index returns the store's DueIndex, building it from list() the first time.'''
+    def due_index(self):
+        if self._due_index is None:
+            self._due_index = DueIndex(self.list())
+        return self._due_index
+
+    '''_indexed passes changed rows (and the IDs of removed ones) to the due index, if it has been built. An index holding rows without IDs can't follow them by ID, so it is dropped and rebuilt on the next query.'''
+    def _indexed(self, rows=(), removed=()):
+        if self._due_index is not None and self._due_index.unkeyed:
+            self._due_index = None
+        elif self._due_index is not None:
+            self._due_index.remove(removed)
+            self._due_index.update(rows)
+
+    '''overdue returns the incomplete habits whose target has passed (default: now), oldest first.'''
+    def overdue(self, now=None):
+        return self.due_index().overdue(now or records.now())
+
+    '''upcoming returns the incomplete habits due in the next `days` days, soonest first.'''
+    def upcoming(self, days=7, now=None):
+        return self.due_index().upcoming(now or records.now(), timedelta(days=days))
+
+    '''due_between returns the incomplete habits due in [start, end) (datetimes), soonest first.'''
+    def due_between(self, start, end):
+        return self.due_index().between(start, end)
+
+    '''append adds complete habit rows (see google_sheets.new_habit_row) and returns them.'''
+    def append(self, rows):
+        rows = [padded(row) for row in rows]
+        with self._transaction():
+            self._insert(rows)
+            for row in rows:
+                self._record("add", row, dict(enumerate(row)), {}, "")
+        self._indexed(rows)
+        return rows
+
+    '''add creates one habit (target_date / target_time already formatted) and returns its row.'''
+    def add(self, habit, target_date="TBD", target_time="TBD"):
+        return self.append([google_sheets.new_habit_row(habit, target_date, target_time)])[0]
+
+    '''update changes selected fields of habit number `number` (None keeps a field), stamps its Updated column when anything changed and returns the row.'''
+    def update(self, number, name=None, target=None, status=None):
+        row, = self._get([number])
+        fields = {col: value for col, value in ((TASK_COLUMN, name), (TARGET_COLUMN, target), (STATUS_COLUMN, status))
+                  if value is not None and value != row[col]}
+        if fields:
+            self._change([(row, fields)])
+        return row
+
+    '''complete marks the given habit numbers ✅ and returns (names completed, names already complete).'''
+    def complete(self, numbers):
+        rows = self._get(numbers)
+        already_complete = [row[TASK_COLUMN] for row in rows if row[STATUS_COLUMN] == "✅"]
+        todo = [row for row in rows if row[STATUS_COLUMN] != "✅"]
+        self._change([(row, {STATUS_COLUMN: "✅"}) for row in todo])
+        return [row[TASK_COLUMN] for row in todo], already_complete
+
+    '''complete_due_today marks every habit due today ✅, like complete.'''
+    def complete_due_today(self):
+        return self.complete([number for number, row in enumerate(self.list(), start=1) if google_sheets.is_due_today(row)])
+
+    '''delete removes the given habit numbers and returns their names.'''
+    def delete(self, numbers):
+        rows = self._get(sorted(set(numbers)))
+        with self._transaction():
+            self._remove(rows)
+            for row in rows:
+                expected = {col: row[col] for col in (TASK_COLUMN, CREATED_COLUMN, TARGET_COLUMN, STATUS_COLUMN)}
+                self._record("delete", row, {}, expected, "")
+        self._indexed(removed=[row[ID_COLUMN] for row in rows])
+        return [row[TASK_COLUMN] for row in rows]
+
+    '''_change applies {column: value} changes to rows (updating them in place), stamps them all with one Updated time and writes them together.'''
+    def _change(self, changes):
+        if not changes:
+            return
+        now = google_sheets.format_updated_time()
+        with self._transaction():
+            for row, fields in changes:
+                expected = {col: row[col] for col in fields}
+                for col, value in fields.items():
+                    row[col] = value
+                row[UPDATED_COLUMN] = now
+                self._record("update", row, fields, expected, now)
+            self._write([row for row, _ in changes])
+        self._indexed([row for row, _ in changes])
+
+class MemoryStore(HabitStore):
+    '''Habits in a Python list (lost on exit).'''
+
+    name = "memory"
+
+    def __init__(self, rows=()):
+        self._rows = [padded(row) for row in rows]
+        self._by_id = {row[ID_COLUMN]: row for row in self._rows}
+
+    def list(self):
+        return [list(row) for row in self._rows]
+
+    def _get(self, numbers):
+        for number in numbers:
+            if not 1 <= number <= len(self._rows):
+                raise ValueError(f"No habit number {number}")
+        return [list(self._rows[number - 1]) for number in numbers]
+
+    def _insert(self, rows):
+        rows = [list(row) for row in rows]
+        self._rows.extend(rows)
+        self._by_id.update((row[ID_COLUMN], row) for row in rows)
+
+    def _write(self, rows):
+        for row in rows:
+            self._by_id[row[ID_COLUMN]][:] = row
+
+    def _remove(self, rows):
+        habit_ids = {row[ID_COLUMN] for row in rows}
+        self._rows = [row for row in self._rows if row[ID_COLUMN] not in habit_ids]
+        for habit_id in habit_ids:
+            self._by_id.pop(habit_id, None)
+
+class SQLiteStore(HabitStore):
+    '''Habits in a SQLite database (":memory:" for a throwaway one). Rows are found by habit ID (the primary key) and listed by the position index.'''
+
+    name = "sqlite"
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _transaction(self):
+        return self.db
+
+    def list(self):
+        return [list(row[1:]) + [row[0]] for row in self.db.execute(
+            f"SELECT habit_id, {', '.join(HABIT_COLUMNS)} FROM habits ORDER BY position")]
+
+    def _get(self, numbers):
+        for number in numbers:
+            if number < 1:
+                raise ValueError(f"No habit number {number}")
+        # One walk of the position index, as far as the highest number asked for
+        found = self.db.execute(
+            f"SELECT habit_id, {', '.join(HABIT_COLUMNS)} FROM habits ORDER BY position LIMIT ?",
+            (max(numbers, default=0),)).fetchall()
+        rows = []
+        for number in numbers:
+            if number > len(found):
+                raise ValueError(f"No habit number {number}")
+            row = found[number - 1]
+            rows.append(list(row[1:]) + [row[0]])
+        return rows
+
+    # The primitives run inside the operation's _transaction, so each operation commits once
+
+    def _insert(self, rows):
+        position = self.db.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM habits").fetchone()[0]
+        self.db.executemany(
+            f"INSERT OR REPLACE INTO habits (habit_id, position, {', '.join(HABIT_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(row[ID_COLUMN], position + offset, *row[:ID_COLUMN]) for offset, row in enumerate(rows)])
+
+    def _write(self, rows):
+        self.db.executemany(
+            f"UPDATE habits SET {', '.join(f'{column} = ?' for column in HABIT_COLUMNS)} WHERE habit_id = ?",
+            [(*row[:ID_COLUMN], row[ID_COLUMN]) for row in rows])
+
+    def _remove(self, rows):
+        self.db.executemany("DELETE FROM habits WHERE habit_id = ?", [(row[ID_COLUMN],) for row in rows])
+
+    '''replace swaps the whole list for rows (e.g. after reading them from the sheet).'''
+    def replace(self, rows):
+        with self.db:
+            self.db.execute("DELETE FROM habits")
+            self._insert([padded(row) for row in rows if len(row) > ID_COLUMN and row[ID_COLUMN]])
+        self._due_index = None
+
+class SheetsStore(HabitStore):
+    '''Habits in the "Habit Tracker" tab of a Google Sheet. Each operation is one batched call from google_sheets (plus the reads it needs), so it gets the row cache, ID checks and retries of the rest of the app.'''
+
+    name = "sheets"
+
+    def __init__(self, creds, spreadsheet_id, sheet_name='Habit Tracker'):
+        self.creds = creds
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet_name = sheet_name
+        self._due_writes = None  # google_sheets.write_count when the due index was last known to match the sheet
+        self._due_rows = None  # habit_rows generation of the cached rows the due index was built from
+        self._index_current = False
+
+    '''due_index rebuilds the index when anything other than this store (the menus in google_sheets, another store, an offline sync) wrote to the sheet since it was built, or when the cached rows were read from the sheet again (expired or invalidated), since that read may bring edits made in the browser. With the row cache off every query rebuilds it.'''
+    def due_index(self):
+        writes = google_sheets.write_count(self.spreadsheet_id)
+        rows = habit_rows.generation(self.spreadsheet_id)
+        if self._due_writes != writes or rows is None or self._due_rows != rows:
+            self._due_index = None
+            self._due_writes = writes
+        index = super().due_index()
+        self._due_rows = habit_rows.generation(self.spreadsheet_id)
+        return index
+
+    '''_transaction notes whether the due index is current before an operation writes, so _indexed knows if it can be updated in place.'''
+    @contextlib.contextmanager
+    def _transaction(self):
+        self._index_current = self._due_writes == google_sheets.write_count(self.spreadsheet_id)
+        yield
+
+    def _indexed(self, rows=(), removed=()):
+        if not self._index_current:
+            self._due_index = None  # someone else wrote first: rebuild on the next query
+        super()._indexed(rows, removed)
+        self._due_writes = google_sheets.write_count(self.spreadsheet_id)
+
+    def list(self):
+        return google_sheets.get_sheet_data(self.creds, self.spreadsheet_id)
+
+    # The row primitives, for HabitStore's generic operations; append, update, complete and
+    # delete below are overridden with google_sheets' batched versions of the same work
+
+    def _get(self, numbers):
+        data = self._data(numbers, None)
+        return [padded(data[number - 1]) for number in numbers]
+
+    def _insert(self, rows):
+        google_sheets.append_rows(self.creds, self.spreadsheet_id, rows, self.sheet_name)
+
+    def _write(self, rows):
+        google_sheets.write_habit_rows(self.creds, self.spreadsheet_id, rows, self.sheet_name)
+
+    def _remove(self, rows):
+        google_sheets.delete_habits(self.creds, self.spreadsheet_id, None, self.sheet_name,
+                                    habit_ids=[row[ID_COLUMN] for row in rows])
+
+    def append(self, rows):
+        rows = [padded(row) for row in rows]
+        with self._transaction():
+            self._insert(rows)
+        self._indexed(rows)
+        return rows
+
+    def update(self, number, name=None, target=None, status=None):
+        with self._transaction():
+            row = google_sheets.update_habit(self.creds, self.spreadsheet_id, number, name, target, status, sheet_name=self.sheet_name)
+        self._indexed([row])
+        return row
+
+    '''_data reads the columns an operation needs and checks the habit numbers against them.'''
+    def _data(self, numbers, columns):
+        data = google_sheets.get_sheet_data(self.creds, self.spreadsheet_id, columns=columns)
+        for number in numbers:
+            if not 1 <= number <= len(data):
+                raise ValueError(f"No habit number {number}")
+        return data
+
+    def complete(self, numbers):
+        data = self._data(numbers, (TASK_COLUMN, TARGET_COLUMN, STATUS_COLUMN, ID_COLUMN))
+        with self._transaction():
+            result = google_sheets.mark_habits_complete(self.creds, self.spreadsheet_id, numbers, sheet_name=self.sheet_name, data=data)
+        self._indexed(removed=[google_sheets.habit_id_of(data[number - 1]) for number in numbers])  # ✅ habits aren't due
+        return result
+
+    def complete_due_today(self):
+        result = google_sheets.mark_habits_complete(self.creds, self.spreadsheet_id, due_today=True, sheet_name=self.sheet_name)
+        self._due_index = None  # which rows were due is decided inside mark_habits_complete
+        return result
+
+    def delete(self, numbers):
+        data = self._data(numbers, (TASK_COLUMN, ID_COLUMN))
+        with self._transaction():
+            names = google_sheets.delete_habits(self.creds, self.spreadsheet_id, sorted(set(numbers)), self.sheet_name, data=data)
+        self._indexed(removed=[google_sheets.habit_id_of(data[number - 1]) for number in numbers])
+        return names
+
+# One SheetsStore per spreadsheet, so its due index is built once and then kept current
+_sheets_stores = {}
+
+'''sheets_store returns the shared SheetsStore of a spreadsheet (used by the main menu and the due command).'''
+def sheets_store(creds, spreadsheet_id):
+    store = _sheets_stores.get(spreadsheet_id)
+    if store is None or store.creds is not creds:
+        store = _sheets_stores[spreadsheet_id] = SheetsStore(creds, spreadsheet_id)
+    return store
+
+'''reset_sheets_stores forgets every shared SheetsStore (e.g. between tests).'''
+def reset_sheets_stores():
+    _sheets_stores.clear()
+
+'''open_store returns the backend called `kind` ("sheets" needs creds and spreadsheet_id; "sqlite" takes path, default an in-memory database).'''
+def open_store(kind, creds=None, spreadsheet_id=None, path=None):
+    if kind == "sheets":
+        return SheetsStore(creds, spreadsheet_id)
+    if kind == "sqlite":
+        return SQLiteStore(path or ":memory:")
+    if kind == "memory":
+        return MemoryStore()
+    raise ValueError(f"Unknown store {kind!r}; choose one of {', '.join(BACKENDS)}")
+
+# ----- interactive menu -----
+
+'''print_rows shows a habit list in the same format as show_habits.'''
+def print_rows(rows):
+    if not rows:
+        print("\nNo habits found.\n")
+        return
+    print("\nHabits:")
+    for number, row in enumerate(rows, start=1):
+        print(f"  {number}. " + " | ".join(records.display_row(row)))
+    print()
+
+'''print_due shows the overdue habits and those due in the next week.'''
+def print_due(store):
+    overdue, upcoming = store.overdue(), store.upcoming()
+    if not overdue and not upcoming:
+        print("\nNothing is due in the next week.\n")
+        return
+    for title, rows in (("Overdue", overdue), ("Due in the next week", upcoming)):
+        if rows:
+            print(f"\n{title}:")
+            for row in rows:
+                print(f"  {row[TASK_COLUMN]} | {records.display_target(row[TARGET_COLUMN])}")
+    print()
+
+'''_choose prompts for habit numbers ("1-5,8") among rows; returns [] after printing why when the input is unusable.'''
+def _choose(rows, prompt):
+    if not rows:
+        print("\nNo habits found.\n")
+        return []
+    google_sheets.print_current_habits(rows)
+    try:
+        return google_sheets.parse_selection(input(prompt), len(rows))
+    except ValueError as error:
+        print(f"Invalid selection: {error}\n")
+        return []
+
+'''_edit prompts for the new name, target and status of one habit, like edit_habit.'''
+def _edit(store):
+    rows = store.list()
+    numbers = _choose(rows, "\nEnter the number of the habit to edit: ")
+    if len(numbers) != 1:
+        return
+    name = input("Enter the new habit description or leave empty to preserve current description: ").strip()
+    target = google_sheets.format_target(google_sheets.set_target_completion_date(), google_sheets.set_target_completion_time())
+    old_status = padded(rows[numbers[0] - 1])[STATUS_COLUMN] or "❌"
+    toggle = input(f"Do you want to toggle completion status? (currently {old_status}) [y/n]: ").strip().lower() == "y"
+    status = ("✅" if old_status == "❌" else "❌") if toggle else None
+    row = store.update(numbers[0], name=name or None, target=target, status=status)
+    print(f"\n✅ Habit '{row[TASK_COLUMN]}' updated.\n")
+
+'''_complete prompts for habits to mark complete, by number or "today".'''
+def _complete(store):
+    rows = store.list()
+    if not rows:
+        print("\nNo habits found.\n")
+        return
+    google_sheets.print_current_habits(rows)
+    selection = input("\nEnter the habits to mark complete (e.g. 1-3,5) or 'today' for all due today: ").strip().lower()
+    try:
+        if selection == "today":
+            completed, already_complete = store.complete_due_today()
+        else:
+            completed, already_complete = store.complete(google_sheets.parse_selection(selection, len(rows)))
+    except ValueError as error:
+        print(f"Invalid selection: {error}\n")
+        return
+    for name in completed:
+        print(f"✅ Habit '{name}' marked as complete.")
+    for name in already_complete:
+        print(f"Habit '{name}' is already marked as complete.")
+    print()
+
+'''menu runs the interactive tracker on any store. With sync (a function), it also offers "Sync Now" and syncs on exit when pending() (if given) says there is something to send; status() replaces the backend name in the menu heading.'''
+def menu(store, sync=None, status=None, pending=None):
+    options = ["Add Habit", "Mark Habits Complete", "Edit Habit", "Delete Habits", "Show Habit List", "Show Due Habits"]
+    if sync is not None:
+        options.append("Sync Now")
+    options.append("Exit")
+
+    while True:
+        print(f"Menu ({status()}):" if status else f"Menu ({store.name}):")
+        for number, option in enumerate(options, start=1):
+            print(f"  {number}. {option}")
+        choice = input(f"Choose an option (1–{len(options)}): ")
+        action = options[int(choice) - 1] if choice.isdigit() and 1 <= int(choice) <= len(options) else None
+
+        if action == "Add Habit":
+            habit = input("Enter a habit to track: ")
+            store.add(habit, google_sheets.set_target_completion_date(), google_sheets.set_target_completion_time())
+            print(f"\n✅ Habit '{habit}' added.\n")
+        elif action == "Mark Habits Complete":
+            _complete(store)
+        elif action == "Edit Habit":
+            _edit(store)
+        elif action == "Delete Habits":
+            numbers = _choose(store.list(), "\nEnter the habits to delete (e.g. 1-3,5): ")
+            if numbers:
+                for name in store.delete(numbers):
+                    print(f"🗑️  Habit '{name}' deleted.")
+                print()
+        elif action == "Show Habit List":
+            print_rows(store.list())
+        elif action == "Show Due Habits":
+            print_due(store)
+        elif action == "Sync Now":
+            sync()
+        elif action == "Exit":
+            if sync is not None and (pending is None or pending()):
+                sync()
+            print("\nGoodbye!")
+            break
+        else:
+            print("\nInvalid choice.\n")
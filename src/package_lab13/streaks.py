@@ -0,0 +1,246 @@
+'''streaks turns the completion history (see history) into per-habit streaks, completion rates and weekly rollups.
+
+A habit counts as done on a day when it has at least one ✅ event that day; ❌ events
+(a completion toggled back) stay in the log but don't undo the day. Per habit:
+
+    current streak     consecutive done days ending today or yesterday (0 otherwise)
+    longest streak     the longest run of consecutive done days ever
+    completion rate    done days / days since the first one (or over the last `window` days)
+    weeks              ✅ events per week (weeks start on Monday)
+
+StreakStats keeps these up to date incrementally: add(events) costs O(1) per event that
+extends the latest day, and only re-walks one habit's days when an event arrives for an
+earlier day than that habit's latest. rebuild(events) recomputes everything from the
+whole log at once. With NumPy installed it is vectorized (sort, unique and run-length
+reductions over day numbers, so years of events take a few array passes); without it,
+the same results come from a pure-Python pass.
+
+    stats = engine_for(creds, spreadsheet_id)   # reads the history once, then follows new events
+    stats.summary(records.today())
+'''
+import bisect
+import collections
+import threading
+from array import array
+from datetime import date
+
+from package_lab13 import records
+
+try:
+    import numpy
+except ImportError:  # optional: rebuild falls back to pure Python
+    numpy = None
+
+# Columns of a history row (see history.event_row)
+AT_COLUMN = 0
+HABIT_ID_COLUMN = 1
+TASK_COLUMN = 2
+STATUS_COLUMN = 3
+
+class HabitStreak:
+    '''Streak and completion figures for one habit. days holds the ordinals of its done days, sorted.'''
+
+    __slots__ = ("habit_id", "name", "days", "completions", "current", "longest", "weeks")
+
+    def __init__(self, habit_id, name=""):
+        self.habit_id = habit_id
+        self.name = name
+        self.days = array("l")
+        self.completions = 0  # ✅ events, possibly several a day
+        self.current = 0  # length of the run of done days ending at the last one
+        self.longest = 0
+        self.weeks = collections.Counter()  # Monday's ordinal -> ✅ events that week
+
+    @property
+    def last_day(self):
+        return date.fromordinal(self.days[-1]) if self.days else None
+
+    '''streak returns the current streak as of `day`: the run ending at the last done day, if that was `day` or the day before.'''
+    def streak(self, day):
+        return self.current if self.days and self.days[-1] >= day.toordinal() - 1 else 0
+
+    '''rate returns the share of days done from the first done day (or the last `window` days) through `day`; 0.0 before the first one.'''
+    def rate(self, day, window=None):
+        end = day.toordinal()
+        if not self.days or self.days[0] > end:
+            return 0.0
+        start = self.days[0] if window is None else max(self.days[0], end - window + 1)
+        done = bisect.bisect_right(self.days, end) - bisect.bisect_left(self.days, start)
+        return done / (end - start + 1)
+
+    '''_add_day counts one ✅ event on day (an ordinal).'''
+    def _add_day(self, day):
+        self.completions += 1
+        self.weeks[_monday(day)] += 1
+        if self.days and day <= self.days[-1]:
+            position = bisect.bisect_left(self.days, day)
+            if position == len(self.days) or self.days[position] != day:
+                self.days.insert(position, day)
+                self._recount()
+            return
+        self.current = self.current + 1 if self.days and day == self.days[-1] + 1 else 1
+        self.days.append(day)
+        self.longest = max(self.longest, self.current)
+
+    '''_recount recomputes current and longest from days (after a day was inserted out of order).'''
+    def _recount(self):
+        run = longest = 0
+        previous = None
+        for day in self.days:
+            run = run + 1 if previous is not None and day == previous + 1 else 1
+            longest = max(longest, run)
+            previous = day
+        self.current, self.longest = run, longest
+
+class StreakStats:
+    '''Per-habit streaks and rates plus overall weekly rollups, kept current as completion events arrive.'''
+
+    def __init__(self, events=()):
+        self._lock = threading.Lock()
+        self.rebuild(events)
+
+    '''habit returns the HabitStreak of a habit ID (None if it was never completed).'''
+    def habit(self, habit_id):
+        return self.habits.get(habit_id)
+
+    '''add updates the figures with new history rows.'''
+    def add(self, events):
+        with self._lock:
+            for key, name, day in self._completions(events):
+                habit = self.habits.get(key)
+                if habit is None:
+                    habit = self.habits[key] = HabitStreak(key, name)
+                habit.name = name or habit.name
+                habit._add_day(day)
+                self.weekly[_monday(day)] += 1
+
+    '''rebuild recomputes every figure from the whole history; use_numpy None means "if NumPy is installed".'''
+    def rebuild(self, events, use_numpy=None):
+        completions = list(self._completions(events))
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        if use_numpy and numpy is None:
+            raise RuntimeError("NumPy is not installed")
+        habits, weekly = (_rebuild_numpy if use_numpy else _rebuild_python)(completions)
+        with self._lock:
+            self.habits, self.weekly = habits, weekly
+
+    '''summary returns one dict per habit with its streaks and completion rates as of `day` (default today), longest current streak first.'''
+    def summary(self, day=None, window=30):
+        day = day or records.today()
+        with self._lock:
+            rows = [{
+                "habit_id": habit.habit_id,
+                "task": habit.name,
+                "completions": habit.completions,
+                "current_streak": habit.streak(day),
+                "longest_streak": habit.longest,
+                "completion_rate": round(habit.rate(day), 4),
+                f"rate_{window}d": round(habit.rate(day, window), 4),
+                "last_done": habit.last_day.isoformat() if habit.days else None,
+            } for habit in self.habits.values()]
+        return sorted(rows, key=lambda row: (-row["current_streak"], -row["longest_streak"], row["task"]))
+
+    '''weekly_rollup returns [(Monday as an ISO date, ✅ events that week)] for every week with completions, oldest first; with habit_id, for that habit only.'''
+    def weekly_rollup(self, habit_id=None):
+        with self._lock:
+            weeks = self.weekly if habit_id is None else (self.habits[habit_id].weeks if habit_id in self.habits else {})
+            return [(date.fromordinal(monday).isoformat(), count) for monday, count in sorted(weeks.items())]
+
+    '''_completions yields (habit key, name, day ordinal) for every ✅ event with a readable time. The key is the habit ID, or the name for habits logged before they had one.'''
+    def _completions(self, events):
+        for event in events:
+            if len(event) <= STATUS_COLUMN or event[STATUS_COLUMN] != "✅":
+                continue
+            at = records.parse_updated(event[AT_COLUMN])
+            if at is None:
+                continue
+            yield event[HABIT_ID_COLUMN] or event[TASK_COLUMN], event[TASK_COLUMN], at.toordinal()
+
+'''_monday returns the ordinal of the Monday starting the week of day (an ordinal).'''
+def _monday(day):
+    return day - (day - 1) % 7  # ordinal 1 (0001-01-01) is a Monday
+
+'''_rebuild_python computes ({key: HabitStreak}, weekly Counter) from (key, name, day) completions by sorting them once per habit.'''
+def _rebuild_python(completions):
+    habits, weekly = {}, collections.Counter()
+    by_habit = collections.defaultdict(list)
+    for key, name, day in completions:
+        by_habit[key].append(day)
+        if key not in habits:
+            habits[key] = HabitStreak(key, name)
+        habits[key].name = name or habits[key].name
+        weekly[_monday(day)] += 1
+    for key, days in by_habit.items():
+        habit = habits[key]
+        habit.completions = len(days)
+        habit.weeks.update(_monday(day) for day in days)
+        habit.days = array("l", sorted(set(days)))
+        habit._recount()
+    return habits, weekly
+
+'''_rebuild_numpy computes the same as _rebuild_python with array operations: done days are the unique (habit, day) pairs, runs start wherever the habit changes or the day gap isn't 1, and streaks are reductions over the run lengths.'''
+def _rebuild_numpy(completions):
+    habits, weekly = {}, collections.Counter()
+    if not completions:
+        return habits, weekly
+    keys = {}
+    for key, name, _ in completions:
+        if key not in keys:
+            keys[key] = len(keys)
+            habits[key] = HabitStreak(key, name)
+        habits[key].name = name or habits[key].name
+    names = list(keys)
+
+    codes = numpy.fromiter((keys[key] for key, _, _ in completions), dtype=numpy.int64, count=len(completions))
+    days = numpy.fromiter((day for _, _, day in completions), dtype=numpy.int64, count=len(completions))
+    mondays = days - (days - 1) % 7
+    span = int(days.max()) + 1
+
+    # ✅ events per week, overall and per habit
+    weeks, counts = numpy.unique(mondays, return_counts=True)
+    weekly.update(dict(zip(weeks.tolist(), counts.tolist())))
+    habit_weeks, counts = numpy.unique(codes * span + mondays, return_counts=True)
+    for pair, count in zip(habit_weeks.tolist(), counts.tolist()):
+        habits[names[pair // span]].weeks[pair % span] = count
+
+    # Done days: unique (habit, day) pairs, sorted by habit then day
+    pairs, events = numpy.unique(codes * span + days, return_counts=True)
+    pair_habits, pair_days = pairs // span, pairs % span
+    habit_starts = numpy.flatnonzero(numpy.r_[True, pair_habits[1:] != pair_habits[:-1]])
+    habit_ends = numpy.r_[habit_starts[1:], len(pairs)]
+    completions_per_habit = numpy.add.reduceat(events, habit_starts)
+
+    # Runs of consecutive days within a habit
+    run_starts = numpy.flatnonzero(numpy.r_[True, (pair_habits[1:] != pair_habits[:-1]) | (numpy.diff(pair_days) != 1)])
+    run_lengths = numpy.diff(numpy.r_[run_starts, len(pairs)])
+    run_habits = pair_habits[run_starts]
+    first_runs = numpy.flatnonzero(numpy.r_[True, run_habits[1:] != run_habits[:-1]])
+    longest = numpy.maximum.reduceat(run_lengths, first_runs)
+    current = run_lengths[numpy.r_[first_runs[1:], len(run_starts)] - 1]
+
+    for code, start, end, total, best, last in zip(pair_habits[habit_starts].tolist(), habit_starts.tolist(), habit_ends.tolist(),
+                                                   completions_per_habit.tolist(), longest.tolist(), current.tolist()):
+        habit = habits[names[code]]
+        habit.days = array("l", pair_days[start:end].tolist())
+        habit.completions, habit.longest, habit.current = total, best, last
+    return habits, weekly
+
+# One StreakStats per spreadsheet, following its history as events are logged
+_engines = {}
+_engines_lock = threading.Lock()
+
+'''engine_for returns the StreakStats of a spreadsheet: built from its history (one read) the first time, then updated by every event logged in this process.'''
+def engine_for(creds, spreadsheet_id):
+    from package_lab13 import history  # the Sheets client is only needed once statistics are asked for
+    with _engines_lock:
+        engine = _engines.get(spreadsheet_id)
+        if engine is None:
+            engine = _engines[spreadsheet_id] = StreakStats(history.read_events(creds, spreadsheet_id))
+            history.history_log.subscribe(spreadsheet_id, engine.add)
+        return engine
+
+'''reset_engines forgets every StreakStats (e.g. between tests).'''
+def reset_engines():
+    with _engines_lock:
+        _engines.clear()
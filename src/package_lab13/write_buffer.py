@@ -0,0 +1,66 @@
+'''write_buffer collects pending cell writes for one sheet and sends them as a single values().batchUpdate.'''
+
+from package_lab13 import sheets_client
+
+COLUMNS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+class WriteBuffer:
+    '''Pending cell writes for one sheet tab.
+
+    Cells are addressed by sheet row number (1-based, so the first habit is row 2)
+    and column index (0 = column A). Writing the same cell twice keeps the last value.
+    '''
+
+    def __init__(self, sheet_name='Habit Tracker'):
+        self.sheet_name = sheet_name
+        self._cells = {}  # (row, col) -> value
+
+    def __len__(self):
+        return len(self._cells)
+
+    '''set queues values for consecutive cells of one row, starting at column index col.'''
+    def set(self, row, col, values):
+        for offset, value in enumerate(values):
+            self._cells[(row, col + offset)] = value
+
+    '''runs returns (row, col, values) for every horizontal run of adjacent queued cells, in sheet order.'''
+    def runs(self):
+        runs = []
+        for (row, col) in sorted(self._cells):
+            last = runs[-1] if runs else None
+            if last and last[0] == row and last[1] + len(last[2]) == col:
+                last[2].append(self._cells[(row, col)])
+            else:
+                runs.append((row, col, [self._cells[(row, col)]]))
+        return runs
+
+    '''ranges merges the runs into A1 ranges: runs covering the same columns on consecutive rows become one block.'''
+    def ranges(self):
+        blocks = []  # [first_row, last_row, col, [row values, ...]]
+        for row, col, values in self.runs():
+            last = blocks[-1] if blocks else None
+            if last and last[1] + 1 == row and last[2] == col and len(last[3][0]) == len(values):
+                last[1] = row
+                last[3].append(values)
+            else:
+                blocks.append([row, row, col, [values]])
+
+        data = []
+        for first_row, last_row, col, values in blocks:
+            start = f"{COLUMNS[col]}{first_row}"
+            end = f"{COLUMNS[col + len(values[0]) - 1]}{last_row}"
+            data.append({"range": f"{self.sheet_name}!{start}:{end}", "values": values})
+        return data
+
+    '''flush sends every queued write in one values().batchUpdate request and empties the buffer. Returns the API response, or None if nothing was queued.'''
+    def flush(self, service, spreadsheet_id):
+        if not self._cells:
+            return None
+        data = self.ranges()
+        body = {"valueInputOption": "RAW", "data": data}
+        response = sheets_client.execute(service.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body=body
+        ), "values.batchUpdate", ",".join(d["range"] for d in data))
+        self._cells.clear()
+        return response
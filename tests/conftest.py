@@ -0,0 +1,44 @@
+import pytest
+from package_lab13 import google_sheets, ratelimit, sheets_client, stores
+from package_lab13.fake_sheets import FakeSheetsServer
+from package_lab13.history import history_log
+from package_lab13.streaks import reset_engines
+from package_lab13.row_cache import habit_index, habit_rows
+from package_lab13.metrics import api_metrics
+
+# Each test monkeypatches its own fake service, so never let a client or cached rows from one test leak into the next
+@pytest.fixture(autouse=True)
+def reset_shared_state(monkeypatch):
+    monkeypatch.setattr(sheets_client, "_sleep", lambda seconds: None)  # never really back off in tests
+    monkeypatch.setattr(sheets_client, "PER_THREAD_HTTP", False)  # the daemon turns this on
+    ratelimit.reset_rate_limits()
+    sheets_client.reset_clients()
+    habit_rows.invalidate()
+    habit_index.invalidate()
+    google_sheets._sheet_ids.clear()
+    api_metrics.reset()
+    history_log.clear()
+    reset_engines()
+    stores.reset_sheets_stores()
+    yield
+    sheets_client.reset_clients()
+    habit_rows.invalidate()
+    habit_index.invalidate()
+    google_sheets._sheet_ids.clear()
+
+# Fixture: a fresh fake server routed through the normal client construction path
+@pytest.fixture
+def fake_server():
+    server = FakeSheetsServer()
+    with server.install():
+        yield server
+
+# Fixture: the habit rows fake_sheet seeds; override it in a module or parametrize it to seed other habits
+@pytest.fixture
+def sheet_rows():
+    return []
+
+# Fixture: a fake server holding one Habit Tracker sheet seeded with sheet_rows, as (server, spreadsheet_id)
+@pytest.fixture
+def fake_sheet(fake_server, sheet_rows):
+    return fake_server, fake_server.add_spreadsheet(rows=sheet_rows)
@@ -0,0 +1,63 @@
+import os
+import stat
+from datetime import datetime, timedelta
+import pytest
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+from package_lab13 import main
+
+# Fake browser flow that records whether it was used
+class FakeFlow:
+    runs = 0
+
+    @classmethod
+    def from_client_secrets_file(cls, path, scopes):
+        return cls()
+
+    def run_local_server(self, port=0):
+        FakeFlow.runs += 1
+        return Credentials(token="browser-token", refresh_token="refresh", client_id="id",
+                           client_secret="secret", token_uri="https://oauth2.googleapis.com/token",
+                           expiry=datetime.utcnow() + timedelta(hours=1))
+
+@pytest.fixture
+def fake_flow(monkeypatch):
+    FakeFlow.runs = 0
+    monkeypatch.setattr("google_auth_oauthlib.flow.InstalledAppFlow", FakeFlow)
+    return FakeFlow
+
+# Test: The first launch uses the browser and caches the token with 0600 permissions; the next launch is warm
+def test_token_cached_between_launches(tmp_path, fake_flow):
+    token_file = str(tmp_path / "token.json")
+
+    main.authenticate_user(token_file)
+    assert main.startup_timing["mode"] == "cold"
+    assert stat.S_IMODE(os.stat(token_file).st_mode) == 0o600
+
+    creds = main.authenticate_user(token_file)
+    assert main.startup_timing["mode"] == "warm"
+    assert creds.token == "browser-token"
+    assert fake_flow.runs == 1
+
+# Test: An expired token is refreshed silently; a revoked refresh token falls back to the browser
+def test_expired_token_refresh_and_fallback(tmp_path, fake_flow, monkeypatch):
+    token_file = str(tmp_path / "token.json")
+    expired = Credentials(token="old", refresh_token="refresh", client_id="id", client_secret="secret",
+                          token_uri="https://oauth2.googleapis.com/token", expiry=datetime.utcnow() - timedelta(hours=1))
+    main.save_credentials(expired, token_file)
+
+    def refresh(self, request):
+        self.token = "refreshed-token"
+        self.expiry = datetime.utcnow() + timedelta(hours=1)
+    monkeypatch.setattr(Credentials, "refresh", refresh)
+
+    assert main.authenticate_user(token_file).token == "refreshed-token"
+    assert main.startup_timing["mode"] == "refreshed" and fake_flow.runs == 0
+
+    main.save_credentials(expired, token_file)
+    def revoked(self, request):
+        raise RefreshError("invalid_grant")
+    monkeypatch.setattr(Credentials, "refresh", revoked)
+
+    assert main.authenticate_user(token_file).token == "browser-token"
+    assert main.startup_timing["mode"] == "cold" and fake_flow.runs == 1
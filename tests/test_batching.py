@@ -0,0 +1,69 @@
+import json
+import pytest
+from package_lab13 import batching, google_sheets, multi_sheet
+from package_lab13.fake_sheets import parse_batch
+from package_lab13.metrics import api_metrics
+from package_lab13.row_cache import habit_rows
+
+DUMMY_CREDS = "dummy_credentials"
+HABITS = [["Drink water", "Wednesday, April 23 at 02:37 PM", "TBD at TBD", "❌", "4/23/2025 at 2:37 PM"]]
+
+# Test: Checking many spreadsheets sends one batch and routes each answer (or error) to its sheet
+def test_check_spreadsheets_in_one_batch(fake_server):
+    sheets = [fake_server.add_spreadsheet(rows=HABITS) for _ in range(3)]
+
+    problems = google_sheets.check_spreadsheets(DUMMY_CREDS, sheets + ["missing"])
+
+    assert [problems[sid] for sid in sheets] == [None, None, None]
+    assert problems["missing"].resp.status == 404
+    assert [entry["op"] for entry in fake_server.log if not entry.get("batched")] == ["batch"]
+    assert google_sheets._sheet_ids[sheets[0]] == {"Habit Tracker": 0}
+    assert api_metrics.summary()["spreadsheets.get"]["count"] == 4
+
+# Test: Reads are split into batches of BATCH_SIZE and land in the row cache
+def test_get_many_sheet_data_batches_and_caches(fake_server, monkeypatch):
+    monkeypatch.setattr(batching, "BATCH_SIZE", 10)
+    sheets = [fake_server.add_spreadsheet(rows=HABITS) for _ in range(25)]
+
+    data = google_sheets.get_many_sheet_data(DUMMY_CREDS, sheets)
+
+    assert all(data[sid] == HABITS for sid in sheets)
+    assert fake_server.summary()["batch"]["requests"] == 3
+    assert fake_server.summary()["values.get"]["requests"] == 25
+    assert habit_rows.get(sheets[-1]) == HABITS
+
+    fake_server.reset_log()
+    google_sheets.get_many_sheet_data(DUMMY_CREDS, sheets)
+    assert fake_server.log == []  # everything came from the cache
+
+# Test: Calls rejected with 429 inside a batch are retried in the next batch
+def test_rate_limited_calls_are_retried(fake_server):
+    sheets = [fake_server.add_spreadsheet(rows=HABITS) for _ in range(4)]
+    fake_server.fail_next(2, status=429)
+
+    data = google_sheets.get_many_sheet_data(DUMMY_CREDS, sheets)
+
+    assert all(data[sid] == HABITS for sid in sheets)
+    assert fake_server.summary()["batch"]["requests"] == 2
+    assert api_metrics.summary()["values.get"]["retries"] == 2
+
+# Test: The fake server rejects badly framed batches
+def test_batch_framing_is_checked(fake_server):
+    with pytest.raises(ValueError):
+        parse_batch("text/plain", b"GET /v4/spreadsheets/x HTTP/1.1\n\n")
+    body = (b"--b\r\nContent-Type: application/http\r\n\r\nGET /v4/spreadsheets/x HTTP/1.1\r\n\r\n\r\n--b--\r\n")
+    with pytest.raises(ValueError, match="Content-ID"):
+        parse_batch('multipart/mixed; boundary="b"', body)
+
+    response, content = fake_server.request("https://sheets.googleapis.com/batch", "POST", body, {"content-type": "multipart/mixed; boundary=b"})
+    assert response.status == 400 and "Content-ID" in json.loads(content)["error"]["message"]
+
+# Test: A sweep can read all of its sheets in batches first
+def test_sweep_with_batch_reads(fake_server):
+    sheets = [fake_server.add_spreadsheet(rows=HABITS) for _ in range(5)]
+
+    result = multi_sheet.sweep(DUMMY_CREDS, sheets, batch_reads=True)
+
+    assert result["totals"]["habits"] == 5
+    assert fake_server.summary()["batch"]["requests"] == 1
+    assert all(entry.get("batched") for entry in fake_server.log if entry["op"] == "values.get")
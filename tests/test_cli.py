@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from package_lab13 import cli
+
+DUMMY_CREDS = "dummy_credentials"
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Fixture: the sheet holds three habits
+@pytest.fixture
+def sheet_rows():
+    return [
+        ["Drink water", "Wednesday, April 23 at 02:37 PM", "TBD at TBD", "❌", ""],
+        ["Stretch", "Wednesday, April 23 at 02:37 PM", "Thursday, May 01 at 02:30 PM", "❌", ""],
+        ["Read", "Wednesday, April 23 at 02:37 PM", "TBD at TBD", "✅", ""],
+    ]
+
+def run(capsys, *argv):
+    code = cli.main(list(argv), creds=DUMMY_CREDS)
+    return code, capsys.readouterr().out
+
+# Test: Every subcommand works without prompts and --json prints machine-readable results
+def test_subcommands_against_fake_server(fake_sheet, capsys):
+    server, sid = fake_sheet
+
+    code, out = run(capsys, "--sheet", sid, "--json", "list")
+    assert code == 0
+    assert [h["task"] for h in json.loads(out)["habits"]] == ["Drink water", "Stretch", "Read"]
+
+    code, out = run(capsys, "--sheet", sid, "--json", "add", "Meditate", "--date", "2025-05-02", "--time", "18:00")
+    assert json.loads(out)["added"]["target"] == "2025-05-02T18:00"
+
+    code, out = run(capsys, "--sheet", sid, "--json", "complete", "1-3")
+    assert json.loads(out) == {"completed": ["Drink water", "Stretch"], "already_complete": ["Read"]}
+
+    code, out = run(capsys, "--sheet", sid, "--json", "edit", "2", "--name", "Yoga", "--time", "07:00 AM", "--status", "todo")
+    updated = json.loads(out)["updated"]
+    assert updated["task"] == "Yoga" and updated["target"] == "2025-05-01T07:00" and updated["status"] == "❌"
+
+    code, out = run(capsys, "--sheet", sid, "delete", "1,3")
+    assert code == 0 and "Deleted 2 habit(s)" in out
+
+    assert [row[0] for row in server.rows(sid)[1:]] == ["Yoga", "Meditate"]
+
+# Test: Bad input is reported with exit code 1 instead of a traceback
+def test_invalid_selection_fails_cleanly(fake_sheet, capsys):
+    _, sid = fake_sheet
+    code, out = run(capsys, "--sheet", sid, "--json", "delete", "9")
+    assert code == 1
+    assert "between 1 and 3" in json.loads(out)["error"]
+
+# Test: A sheet ID is required
+def test_missing_sheet_is_a_usage_error(monkeypatch):
+    monkeypatch.delenv("HABIT_TRACKER_SHEET", raising=False)
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(["list"], creds=DUMMY_CREDS)
+    assert exit_info.value.code == 2
+
+# Test: --help does not import the Google client libraries
+def test_help_does_not_import_google_libraries():
+    code = ("import sys, contextlib, io\n"
+            "from package_lab13 import cli\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    try: cli.main(['--help'])\n"
+            "    except SystemExit: pass\n"
+            "print(any(m.startswith(('googleapiclient', 'google_auth_oauthlib', 'google.auth')) for m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            env={"PYTHONPATH": SRC}, check=True)
+    assert result.stdout.strip() == "False"
+
+# Test: Importing main (as the daemon, --stats and the offline path do) does not import the Google client libraries either
+def test_main_imports_google_libraries_lazily():
+    code = ("import sys\n"
+            "from package_lab13 import main\n"
+            "print(any(m.startswith(('googleapiclient', 'google_auth_oauthlib', 'google.auth', 'google.oauth2')) for m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            env={"PYTHONPATH": SRC}, check=True)
+    assert result.stdout.strip() == "False"
+
+# Test: migrate-dates rewrites the old display dates, and due lists overdue habits (rows without IDs included)
+def test_migrate_dates_and_due(fake_sheet, capsys):
+    server, sid = fake_sheet
+    code, out = run(capsys, "--sheet", sid, "--json", "migrate-dates")
+    assert code == 0 and json.loads(out) == {"migrated": 3}
+    assert server.rows(sid)[2][2] == "2025-05-01T14:30"
+
+    code, out = run(capsys, "--sheet", sid, "--json", "due")
+    assert code == 0 and [h["task"] for h in json.loads(out)["overdue"]] == ["Stretch"]
+
+    code, out = run(capsys, "--sheet", sid, "due")
+    assert "Overdue: Stretch | Target: Thursday, May 01, 2025 at 02:30 PM" in out
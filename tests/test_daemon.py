@@ -0,0 +1,82 @@
+import json
+import threading
+import pytest
+from package_lab13 import cli, daemon, sheets_client
+from package_lab13.fake_sheets import FakeSheetsServer
+
+DUMMY_CREDS = "dummy_credentials"
+HABITS = [["Drink water", "Wednesday, April 23 at 02:37 PM", "TBD at TBD", "❌", ""],
+          ["Stretch", "Wednesday, April 23 at 02:37 PM", "TBD at TBD", "❌", ""]]
+
+# Fixture: a daemon on a temporary Unix socket, backed by a fake server with two spreadsheets
+@pytest.fixture
+def running_daemon(tmp_path):
+    server = FakeSheetsServer(latency=0.01)
+    sheets = [server.add_spreadsheet(rows=HABITS), server.add_spreadsheet(rows=HABITS)]
+    address = str(tmp_path / "d.sock")
+    with server.install():
+        habit_daemon = daemon.HabitDaemon(DUMMY_CREDS, workers=4)
+        listener = habit_daemon.listen(address)
+        thread = threading.Thread(target=listener.serve_forever, daemon=True)
+        thread.start()
+        yield server, sheets, address, habit_daemon
+        listener.shutdown()
+        listener.server_close()
+        habit_daemon.close()
+
+# Test: The CLI hands commands to the daemon, which keeps its rows cached between requests
+def test_cli_commands_go_through_daemon(running_daemon, capsys, monkeypatch):
+    server, (sid, _), address, habit_daemon = running_daemon
+    monkeypatch.setattr(cli, "_credentials", lambda: pytest.fail("the thin client must not sign in"))
+
+    assert cli.main(["--daemon", address, "--sheet", sid, "--json", "list"]) == 0
+    assert [h["task"] for h in json.loads(capsys.readouterr().out)["habits"]] == ["Drink water", "Stretch"]
+
+    server.reset_log()
+    assert cli.main(["--daemon", address, "--sheet", sid, "complete", "2"]) == 0
+    assert "Marked 'Stretch' complete" in capsys.readouterr().out
+    assert [entry["op"] for entry in server.log][0] == "values.batchUpdate"  # the rows came from the daemon's cache
+    assert [row[2:] for row in server.rows(sid, "Habit History")[1:]] == [["Stretch", "✅"]]  # flushed with the command
+
+    assert cli.main(["--daemon", address, "--sheet", sid, "--json", "delete", "7"]) == 1
+    assert "between 1 and 2" in json.loads(capsys.readouterr().out)["error"]
+    assert habit_daemon.requests_served == 2
+
+# Test: Concurrent commands on one spreadsheet are serialized, so no append is lost
+def test_concurrent_requests_per_spreadsheet(running_daemon):
+    server, sheets, address, _ = running_daemon
+    errors = []
+
+    def add(sid, n):
+        try:
+            daemon.request(["add", f"Habit {n}"], sid, address)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=add, args=(sheets[n % 2], n)) for n in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    for sid in sheets:
+        assert len(daemon.request(["list"], sid, address)["habits"]) == 7
+        assert len(server.rows(sid)) == 8  # header + 2 + 5 added
+    assert sheets_client.PER_THREAD_HTTP
+
+# Test: Without a daemon the CLI falls back to running the command itself
+def test_no_daemon_falls_back_to_local(tmp_path, monkeypatch, capsys):
+    server = FakeSheetsServer()
+    sid = server.add_spreadsheet(rows=HABITS)
+    monkeypatch.setattr(cli, "_credentials", lambda: DUMMY_CREDS)
+    with server.install():
+        assert cli.main(["--daemon", str(tmp_path / "missing.sock"), "--sheet", sid, "list"]) == 0
+    assert "1. Drink water" in capsys.readouterr().out
+
+# Test: TCP addresses must be loopback
+def test_parse_address():
+    assert daemon.parse_address("127.0.0.1:8765")[1] == ("127.0.0.1", 8765)
+    assert daemon.parse_address("/tmp/habit.sock")[1] == "/tmp/habit.sock"
+    with pytest.raises(ValueError):
+        daemon.parse_address("0.0.0.0:8765")
@@ -0,0 +1,97 @@
+import random
+from datetime import date, datetime, timedelta
+from package_lab13 import google_sheets, stores
+from package_lab13.due_index import DueIndex, due_at
+from package_lab13.fake_sheets import FakeSheetsServer
+from package_lab13.row_cache import habit_rows
+
+NOW = datetime(2025, 5, 1, 12, 0)
+
+ROWS = [
+    ["Read", "2025-04-23T14:37", "2025-04-30T09:00", "❌", "", "id-read"],
+    ["Run", "2025-04-23T14:37", "2025-05-01", "❌", "", "id-run"],
+    ["Swim", "2025-04-23T14:37", "2025-05-03T07:00", "❌", "", "id-swim"],
+    ["Done", "2025-04-23T14:37", "2025-04-29T07:00", "✅", "", "id-done"],
+    ["Someday", "2025-04-23T14:37", "T07:00", "❌", "", "id-someday"],
+    ["Old", "Wednesday, April 23 at 02:37 PM", "Friday, May 09 at 08:00 AM", "❌", "", "id-old"],
+]
+
+def names(rows):
+    return [row[0] for row in rows]
+
+# Test: Overdue, upcoming and range queries; date-only targets are due at the end of the day
+def test_queries():
+    index = DueIndex(ROWS, reference=date(2025, 5, 1))
+    assert len(index) == 4  # not the ✅ habit or the one without a date
+    assert names(index.overdue(NOW)) == ["Read"]
+    assert names(index.upcoming(NOW)) == ["Run", "Swim"]
+    assert names(index.upcoming(NOW, timedelta(days=10))) == ["Run", "Swim", "Old"]
+    assert names(index.between(datetime(2025, 5, 1), datetime(2025, 5, 2))) == ["Run"]
+    assert due_at(ROWS[1]) == datetime(2025, 5, 1, 23, 59, 59, 999999)
+
+# Test: Incremental updates give the same answers as rebuilding from scratch
+def test_incremental_matches_rebuild():
+    generator = random.Random(7)
+    rows = {}
+    index = DueIndex()
+    for step in range(2000):
+        habit_id = f"id-{generator.randrange(300)}"
+        if habit_id in rows and generator.random() < 0.3:
+            del rows[habit_id]
+            index.remove([habit_id])
+            continue
+        target = (datetime(2025, 5, 1) + timedelta(hours=generator.randrange(-500, 500))).strftime("%Y-%m-%dT%H:%M")
+        rows[habit_id] = [f"Habit {step}", "", target, generator.choice(["❌", "❌", "✅"]), "", habit_id]
+        index.update([rows[habit_id]])
+
+    fresh = DueIndex(rows.values())
+    start, end = datetime(2025, 4, 25), datetime(2025, 5, 8)
+    assert len(index) == len(fresh)
+    assert index.between(start, end) == fresh.between(start, end)
+    assert index.overdue(NOW) == fresh.overdue(NOW)
+
+# Test: Stores keep their due index current as habits are added, edited, completed and deleted
+def test_store_keeps_index_current():
+    with stores.open_store("sqlite") as store:
+        store.append(ROWS)
+        assert names(store.overdue(NOW)) == ["Read"]
+
+        store.add("Stretch", "2025-04-30", "07:00")
+        store.update(3, target="2025-04-28T10:00")
+        assert names(store.overdue(NOW)) == ["Swim", "Stretch", "Read"]
+
+        store.complete([1])
+        store.delete([3])
+        assert names(store.overdue(NOW)) == ["Stretch"]
+        assert names(store.upcoming(now=NOW)) == ["Run"]
+        assert store.due_index().between(datetime.min, datetime.max) == DueIndex(store.list()).between(datetime.min, datetime.max)
+
+# Test: The shared Sheets store notices writes made through the google_sheets menus and rebuilds its index
+def test_sheets_store_follows_other_writes():
+    server = FakeSheetsServer()
+    sid = server.add_spreadsheet(rows=ROWS)
+    with server.install():
+        store = stores.sheets_store("dummy_credentials", sid)
+        assert names(store.overdue(NOW)) == ["Read"]
+        index = store.due_index()
+
+        store.add("Stretch", "2025-04-30", "07:00")  # the store's own write updates the index in place
+        assert names(store.overdue(NOW)) == ["Stretch", "Read"] and store.due_index() is index
+
+        google_sheets.mark_habits_complete("dummy_credentials", sid, [1])
+        assert names(stores.sheets_store("dummy_credentials", sid).overdue(NOW)) == ["Stretch"]  # Read is ✅ now
+        assert store.due_index() is not index
+
+# Test: Edits made in the browser show up once the cached rows are read again
+def test_sheets_store_follows_browser_edits():
+    server = FakeSheetsServer()
+    sid = server.add_spreadsheet(rows=ROWS)
+    with server.install():
+        store = stores.sheets_store("dummy_credentials", sid)
+        assert names(store.overdue(NOW)) == ["Read"]
+        index = store.due_index()
+        assert names(store.overdue(NOW)) == ["Read"] and store.due_index() is index  # nothing re-read
+
+        server.rows(sid)[1][3] = "✅"  # Read was completed in the browser
+        habit_rows.invalidate(sid)
+        assert store.overdue(NOW) == []
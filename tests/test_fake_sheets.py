@@ -0,0 +1,91 @@
+import builtins
+import pytest
+from googleapiclient.errors import HttpError
+from package_lab13 import google_sheets, sheets_client
+from package_lab13.fake_sheets import parse_a1, parse_fields, apply_fields
+from package_lab13.row_cache import habit_rows
+
+DUMMY_CREDS = "dummy_credentials"
+
+# Test: A1 ranges parse into 0-based, end-exclusive coordinates
+def test_parse_a1():
+    assert parse_a1("Habit Tracker!A2:E") == ("Habit Tracker", 1, None, 0, 5)
+    assert parse_a1("'Habit Tracker'!E5") == ("Habit Tracker", 4, 5, 4, 5)
+    assert parse_a1("Habit Tracker!D:D") == ("Habit Tracker", 0, None, 3, 4)
+    assert parse_a1("Habit Tracker") == ("Habit Tracker", 0, None, 0, None)
+
+# Test: Partial-response field masks select nested fields
+def test_field_masks():
+    resource = {"spreadsheetId": "x", "properties": {"title": "T"},
+                "sheets": [{"properties": {"sheetId": 0, "title": "Habit Tracker", "index": 0}}]}
+    mask = parse_fields("sheets.properties(sheetId,title)")
+    assert apply_fields(mask, resource) == {"sheets": [{"properties": {"sheetId": 0, "title": "Habit Tracker"}}]}
+
+# Test: Every menu operation works end to end against the fake server
+def test_habit_lifecycle_against_fake_server(fake_server, monkeypatch, capsys):
+    spreadsheet_id = google_sheets.create_sheet(DUMMY_CREDS, "Fake Tracker")
+
+    inputs = iter(["2025-05-01", "02:30 PM", "", ""])
+    monkeypatch.setattr(builtins, "input", lambda _: next(inputs))
+    google_sheets.add_habit(DUMMY_CREDS, spreadsheet_id, "Drink water")
+    google_sheets.add_habit(DUMMY_CREDS, spreadsheet_id, "Stretch")
+
+    inputs = iter(["1", "Drink tea", "", "", "n"])
+    google_sheets.edit_habit(DUMMY_CREDS, spreadsheet_id)
+
+    monkeypatch.setattr(builtins, "input", lambda _: "2")
+    google_sheets.mark_habit_complete(DUMMY_CREDS, spreadsheet_id)
+
+    rows = fake_server.rows(spreadsheet_id)
+    assert rows[0][0] == "Task"
+    assert rows[1][0] == "Drink tea" and rows[1][2] == "" and rows[1][4]
+    assert rows[2][0] == "Stretch" and rows[2][3] == "✅"
+
+    monkeypatch.setattr(builtins, "input", lambda _: "1")
+    google_sheets.delete_habit(DUMMY_CREDS, spreadsheet_id)
+    habit_rows.invalidate()
+    assert [row[0] for row in google_sheets.get_sheet_data(DUMMY_CREDS, spreadsheet_id)] == ["Stretch"]
+
+    ops = fake_server.summary()
+    assert ops["spreadsheets.create"]["requests"] == 1
+    assert ops["values.batchUpdate"]["requests"] == 2  # one per edit / mark-complete
+    assert "spreadsheets.get" not in ops  # sheetId came from create_sheet
+
+# Test: Quota errors are retried after the Retry-After delay, and surface as HttpError 429 once retries run out
+def test_quota_errors(fake_server, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(sheets_client, "_sleep", sleeps.append)
+    fake_server.retry_after = 7
+    spreadsheet_id = fake_server.add_spreadsheet()
+    fake_server.fail_next(1)
+
+    assert google_sheets.get_sheet_data(DUMMY_CREDS, spreadsheet_id) == []
+    assert sleeps == [7.0]
+
+    monkeypatch.setattr(sheets_client, "MAX_RETRIES", 0)
+    habit_rows.invalidate()
+    fake_server.fail_next(1)
+    with pytest.raises(HttpError) as error:
+        google_sheets.get_sheet_data(DUMMY_CREDS, spreadsheet_id)
+
+    assert error.value.resp.status == 429
+    assert error.value.resp["retry-after"] == "7"
+
+# Test: Large sheets can be seeded and read
+def test_large_sheet(fake_server):
+    rows = ([f"Habit {i}", "d1", "TBD at TBD", "❌", ""] for i in range(100_000))
+    spreadsheet_id = fake_server.add_spreadsheet(rows=rows)
+
+    data = google_sheets.get_sheet_data(DUMMY_CREDS, spreadsheet_id)
+
+    assert len(data) == 100_000 and data[-1][0] == "Habit 99999"
+    assert fake_server.log[-1]["response_bytes"] > 1_000_000
+
+# Test: A batchGet too long for a URL (sent as POST with X-HTTP-Method-Override) is still answered
+def test_long_batch_get(fake_server):
+    spreadsheet_id = fake_server.add_spreadsheet(rows=[[f"Habit {i}"] for i in range(500)])
+    ranges = [f"Habit Tracker!A{n}" for n in range(2, 402)]
+    result = google_sheets.get_service(DUMMY_CREDS).spreadsheets().values().batchGet(
+        spreadsheetId=spreadsheet_id, ranges=ranges).execute()
+    assert len(result["valueRanges"]) == 400 and result["valueRanges"][-1]["values"] == [["Habit 399"]]
+    assert fake_server.log[-1]["method"] == "GET" and fake_server.log[-1]["op"] == "values.batchGet"
@@ -6,6 +6,7 @@ from datetime import datetime
 from package_lab13.google_sheets import add_habit
 from unittest.mock import patch
 from package_lab13 import google_sheets
+from package_lab13 import row_cache
 
 
 
@@ -27,6 +28,9 @@ def fake_service(monkeypatch):
         def get(self, spreadsheetId, range):
             # Simulate data retrieval from a sheet
             return self
+        def batchGet(self, spreadsheetId, ranges):
+            # Projected reads of separate columns
+            return self
         def update(self, spreadsheetId, range, valueInputOption, body):
             self.last_call = {
                 "spreadsheetId": spreadsheetId,
@@ -122,23 +126,22 @@ def test_edit_habit_updates_timestamp(monkeypatch):
     sheet_data = [
         ["Drink water", "2025-04-20 at 01:00 PM", "2025-04-21 at 12:00 PM", "❌", "-"]
     ]
-    monkeypatch.setattr(google_sheets, "get_sheet_data", lambda c, s: sheet_data)
+    monkeypatch.setattr(google_sheets, "get_sheet_data", lambda c, s, **kwargs: sheet_data)
     monkeypatch.setattr(google_sheets, "is_habits_empty", lambda d: False)
     monkeypatch.setattr(google_sheets, "print_current_habits", lambda d: None)
 
-    # Track update call
-    calls = {"habit_updated": False, "timestamp_updated": False}
+    # Track update calls
+    calls = {"habit_updated": False, "timestamp_updated": False, "requests": 0}
 
     class FakeValues:
-        def update(self, spreadsheetId, range, valueInputOption, body):
-            if "E" in range:  # Timestamp update
-                calls["timestamp_updated"] = True
-                # Make sure the timestamp is valid format
-                assert datetime.strptime(body["values"][0][0], "%Y-%m-%d %H:%M")
-            else:  # Habit row update
-                calls["habit_updated"] = True
-                assert "Drink water (updated)" in body["values"][0]
-                assert "✅" in body["values"][0]
+        def batchUpdate(self, spreadsheetId, body):
+            calls["requests"] += 1
+            for data in body["data"]:
+                row = data["values"][0]
+                if data["range"].endswith(":F2"):  # Row, timestamp and the new habit ID merged into A2:F2
+                    calls["habit_updated"] = "Drink water (updated)" in row and "✅" in row
+                    # Make sure the timestamp is valid format
+                    calls["timestamp_updated"] = bool(datetime.strptime(row[4], "%Y-%m-%dT%H:%M"))
             return self
         def execute(self):
             return {}
@@ -159,6 +162,7 @@ def test_edit_habit_updates_timestamp(monkeypatch):
     # --- Assert ---
     assert calls["habit_updated"], "Habit row was not updated"
     assert calls["timestamp_updated"], "Timestamp was not updated"
+    assert calls["requests"] == 1, "Row and timestamp should be written in one request"
 
 def test_delete_habit_google_sheets_call(monkeypatch, capsys):
     # Mock sheet data: header + 3 habits
@@ -189,11 +193,17 @@ def test_delete_habit_google_sheets_call(monkeypatch, capsys):
             # Return the mocked sheet data
             return self
 
+        def batchGet(self, spreadsheetId, ranges):
+            # delete_habit reads only the names (A) and habit IDs (F)
+            self.ranges = ranges
+            return self
+
         def execute(self):
-            return {"values": sheet_data}
+            return {"valueRanges": [{"values": [row[:1] for row in sheet_data]}, {"values": []}]}
 
     class FakeSpreadsheets:
-        def get(self, spreadsheetId):
+        def get(self, spreadsheetId, fields=None):
+            called["fields"] = fields
             class GetRequest:
                 def execute(self_inner):
                     return {
@@ -226,6 +236,8 @@ def test_delete_habit_google_sheets_call(monkeypatch, capsys):
     assert called["spreadsheetId"] == DUMMY_SPREADSHEET_ID
     # Check if 'deleteDimension' is in the request body
     assert "deleteDimension" in called["body"]["requests"][0]
+    # Only the tab titles and IDs are requested from the metadata endpoint
+    assert called["fields"] == "sheets.properties(sheetId,title)"
 
 
 # Test: Marking a habit complete
@@ -253,7 +265,7 @@ def test_mark_habit_complete_already_done(monkeypatch, fake_service, capsys):
         ["Walk the dog", "2025-04-20", "2025-04-21", "✅", "-"]
     ]
 
-    monkeypatch.setattr(google_sheets, "get_sheet_data", lambda c, s: data)
+    monkeypatch.setattr(google_sheets, "get_sheet_data", lambda c, s, **kwargs: data)
     monkeypatch.setattr(google_sheets, "is_habits_empty", lambda d: False)
     monkeypatch.setattr(google_sheets, "print_current_habits", lambda d: None)
     monkeypatch.setattr(builtins, "input", lambda _: "2")  # selects "Walk the dog"
@@ -361,3 +373,187 @@ def test_create_sheet(monkeypatch):
     # Act: Call the function to test
     spreadsheet_id = google_sheets.create_sheet(DUMMY_CREDS, "Test Habit Sheet")
 
+
+# Test: The Sheets client is built once per credential and then reused
+def test_shared_client_built_once_per_credential(monkeypatch, capsys):
+    builds = []
+
+    class FakeValues:
+        def get(self, spreadsheetId, range):
+            return self
+        def execute(self):
+            return {"values": [["Drink water", "d1", "d2", "❌", ""]]}
+
+    class FakeSpreadsheets:
+        def values(self):
+            return FakeValues()
+
+    class FakeService:
+        def spreadsheets(self):
+            return FakeSpreadsheets()
+
+    def fake_build(*args, **kwargs):
+        builds.append(kwargs["credentials"])
+        return FakeService()
+
+    monkeypatch.setattr(google_sheets, "build", fake_build)
+    monkeypatch.setattr(row_cache, "ENABLED", False)  # make every read reach the service
+
+    # Act: three reads with the same credentials, one with different credentials
+    for _ in range(3):
+        google_sheets.show_habits(DUMMY_CREDS, DUMMY_SPREADSHEET_ID)
+    google_sheets.show_habits("other_credentials", DUMMY_SPREADSHEET_ID)
+
+    # Assert
+    assert builds == [DUMMY_CREDS, "other_credentials"]
+
+# Test: Reads are served from the row cache and kept current by our own writes
+def test_row_cache_write_through(monkeypatch, capsys):
+    reads = []
+
+    class FakeValues:
+        def get(self, spreadsheetId, range):
+            reads.append(range)
+            return FakeRequest({"values": [["Drink water", "d1", "d2", "❌", ""]]})
+        def batchUpdate(self, spreadsheetId, body):
+            return FakeRequest({})
+
+    class FakeRequest:
+        def __init__(self, response):
+            self.response = response
+        def execute(self):
+            return self.response
+
+    class FakeSpreadsheets:
+        def values(self):
+            return FakeValues()
+
+    class FakeService:
+        def spreadsheets(self):
+            return FakeSpreadsheets()
+
+    monkeypatch.setattr(google_sheets, "build", lambda *args, **kwargs: FakeService())
+    monkeypatch.setattr(builtins, "input", lambda _: "1")
+
+    # Act: read, mark the habit complete (its columns come from the cached rows), then read again
+    google_sheets.get_sheet_data(DUMMY_CREDS, DUMMY_SPREADSHEET_ID)
+    google_sheets.mark_habit_complete(DUMMY_CREDS, DUMMY_SPREADSHEET_ID)
+    data = google_sheets.get_sheet_data(DUMMY_CREDS, DUMMY_SPREADSHEET_ID)
+
+    # Assert: one full read in total, and the cached row reflects the write
+    assert len(reads) == 1
+    assert data[0][3] == "✅"
+
+    # After invalidation the next read goes back to the sheet
+    row_cache.habit_rows.invalidate(DUMMY_SPREADSHEET_ID)
+    google_sheets.get_sheet_data(DUMMY_CREDS, DUMMY_SPREADSHEET_ID)
+    assert len(reads) == 2
+
+# Test: The sheetId from create_sheet is reused, so deleting needs no metadata request
+def test_delete_habit_uses_cached_sheet_id(monkeypatch, capsys):
+    google_sheets.remember_sheet_ids(DUMMY_SPREADSHEET_ID, {"sheets": [{"properties": {"title": "Habit Tracker", "sheetId": 42}}]})
+    monkeypatch.setattr(google_sheets, "get_sheet_data", lambda c, s, **kwargs: [["Drink water", "d1", "d2", "❌", ""]])
+    monkeypatch.setattr(builtins, "input", lambda _: "1")
+    sent = []
+
+    class FakeSpreadsheets:
+        def get(self, spreadsheetId, fields=None):
+            raise AssertionError("metadata should come from the cache")
+        def batchUpdate(self, spreadsheetId, body):
+            sent.append(body)
+            return self
+        def execute(self):
+            return {}
+
+    class FakeService:
+        def spreadsheets(self):
+            return FakeSpreadsheets()
+
+    monkeypatch.setattr(google_sheets, "build", lambda *args, **kwargs: FakeService())
+
+    # Act
+    google_sheets.delete_habit(DUMMY_CREDS, DUMMY_SPREADSHEET_ID)
+
+    # Assert
+    assert sent[0]["requests"][0]["deleteDimension"]["range"]["sheetId"] == 42
+
+# Test: Selections like "1-5,8,12" parse into sorted, unique habit numbers
+def test_parse_selection_and_row_ranges():
+    assert google_sheets.parse_selection("1-5, 8,12,3", 12) == [1, 2, 3, 4, 5, 8, 12]
+    assert google_sheets.row_ranges([1, 2, 3, 4, 5, 8, 12]) == [(11, 12), (7, 8), (0, 5)]
+    for bad in ["", "0", "13", "a-b", "1,,x"]:
+        with pytest.raises(ValueError):
+            google_sheets.parse_selection(bad, 12)
+
+# Test: Bulk delete sends one batchUpdate with merged ranges, highest rows first
+def test_delete_habit_multi_select(monkeypatch, capsys):
+    data = [[f"Habit {i}", "d1", "d2", "❌", ""] for i in range(1, 13)]
+    google_sheets.remember_sheet_ids(DUMMY_SPREADSHEET_ID, {"sheets": [{"properties": {"title": "Habit Tracker", "sheetId": 0}}]})
+    monkeypatch.setattr(google_sheets, "get_sheet_data", lambda c, s, **kwargs: data)
+    monkeypatch.setattr(builtins, "input", lambda _: "1-5,8,12")
+    sent = []
+
+    class FakeSpreadsheets:
+        def batchUpdate(self, spreadsheetId, body):
+            sent.append(body)
+            return self
+        def execute(self):
+            return {}
+
+    class FakeService:
+        def spreadsheets(self):
+            return FakeSpreadsheets()
+
+    monkeypatch.setattr(google_sheets, "build", lambda *args, **kwargs: FakeService())
+
+    # Act
+    google_sheets.delete_habit(DUMMY_CREDS, DUMMY_SPREADSHEET_ID)
+
+    # Assert
+    assert len(sent) == 1
+    ranges = [(r["deleteDimension"]["range"]["startIndex"], r["deleteDimension"]["range"]["endIndex"]) for r in sent[0]["requests"]]
+    assert ranges == [(12, 13), (8, 9), (1, 6)]
+    assert "7 habits deleted successfully" in capsys.readouterr().out
+
+# Test: Bulk mark-complete skips finished habits and writes everything in one batchUpdate
+def test_mark_habits_complete_bulk(monkeypatch):
+    data = [
+        ["A", "d1", "Monday, April 21 at TBD", "❌", ""],
+        ["B", "d1", "TBD at TBD", "✅", ""],
+        ["C", "d1", "TBD at TBD", "❌", ""],
+        ["D", "d1", "TBD at TBD", "❌", ""],
+    ]
+    sent = []
+
+    class FakeValues:
+        def batchUpdate(self, spreadsheetId, body):
+            sent.append(body)
+            return self
+        def execute(self):
+            return {}
+
+    class FakeSpreadsheets:
+        def values(self):
+            return FakeValues()
+
+    class FakeService:
+        def spreadsheets(self):
+            return FakeSpreadsheets()
+
+    monkeypatch.setattr(google_sheets, "build", lambda *args, **kwargs: FakeService())
+
+    # Act
+    completed, already_complete = google_sheets.mark_habits_complete(DUMMY_CREDS, DUMMY_SPREADSHEET_ID, [1, 2, 3, 4], data=data)
+
+    # Assert: rows 4-5 merge into one D:F block next to row 2 (these rows predate IDs, so each gets one in F)
+    assert completed == ["A", "C", "D"] and already_complete == ["B"]
+    assert len(sent) == 1
+    assert [d["range"] for d in sent[0]["data"]] == ["Habit Tracker!D2:F2", "Habit Tracker!D4:F5"]
+    assert all(len(values[2]) == 12 for d in sent[0]["data"] for values in d["values"])
+
+# Test: "Due today" compares the target date with today's date in the sheet's format
+def test_is_due_today():
+    today = datetime(2025, 4, 21, 9, 0)
+    assert google_sheets.is_due_today(["A", "d1", "Monday, April 21 at 02:30 PM"], today)
+    assert not google_sheets.is_due_today(["A", "d1", "TBD at TBD"], today)
+    assert not google_sheets.is_due_today(["A"], today)
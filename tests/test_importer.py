@@ -0,0 +1,73 @@
+import json
+from package_lab13 import google_sheets, importer
+
+# Fake Sheets service that records every append request
+class FakeValues:
+    def __init__(self, appends):
+        self.appends = appends
+    def append(self, spreadsheetId, range, valueInputOption, body):
+        self.appends.append(body["values"])
+        return self
+    def execute(self):
+        return {}
+
+class FakeSpreadsheets:
+    def __init__(self, appends):
+        self.appends = appends
+    def values(self):
+        return FakeValues(self.appends)
+
+class FakeService:
+    def __init__(self):
+        self.appends = []
+    def spreadsheets(self):
+        return FakeSpreadsheets(self.appends)
+
+# Test: CSV rows are normalized like add_habit and appended in chunks
+def test_import_csv_in_chunks(monkeypatch, tmp_path):
+    service = FakeService()
+    monkeypatch.setattr(google_sheets, "build", lambda *args, **kwargs: service)
+    monkeypatch.setattr(google_sheets, "format_creation_date", lambda: "Wednesday, April 23 at 02:37 PM")
+
+    path = tmp_path / "habits.csv"
+    lines = ["habit,target_date,target_time,status"]
+    lines += [f"Habit {i},2025-05-01,2:30 PM," for i in range(5)]
+    lines += ["Stretch,,14:00,yes", ",2025-05-01,,", "Bad date,05/01/2025,,"]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    report = importer.import_habits("creds", "sheet", str(path), chunk_size=2)
+
+    assert [len(chunk) for chunk in service.appends] == [2, 2, 2]
+    assert service.appends[0][0][:5] == ["Habit 0", "Wednesday, April 23 at 02:37 PM", "2025-05-01T14:30", "❌", ""]
+    assert service.appends[2][1][:5] == ["Stretch", "Wednesday, April 23 at 02:37 PM", "T14:00", "✅", ""]
+    assert len({row[5] for chunk in service.appends for row in chunk}) == 6  # every habit gets its own ID
+    assert report["imported"] == 6 and report["requests"] == 3
+    assert [line for line, _ in report["skipped"]] == [8, 9]
+
+# Test: JSONL input is accepted as well
+def test_import_jsonl(monkeypatch, tmp_path):
+    service = FakeService()
+    monkeypatch.setattr(google_sheets, "build", lambda *args, **kwargs: service)
+
+    path = tmp_path / "habits.jsonl"
+    path.write_text("\n".join(json.dumps({"name": f"Habit {i}"}) for i in range(3)) + "\n", encoding="utf-8")
+
+    report = importer.import_habits("creds", "sheet", str(path))
+
+    assert report["imported"] == 3 and report["requests"] == 1
+    assert service.appends[0][2][2] == ""
+
+# Test: a malformed JSONL line is reported as skipped and the rest of the file is still imported
+def test_import_jsonl_skips_malformed_lines(monkeypatch, tmp_path):
+    service = FakeService()
+    monkeypatch.setattr(google_sheets, "build", lambda *args, **kwargs: service)
+
+    path = tmp_path / "habits.jsonl"
+    path.write_text('{"name": "a"}\n{"name": "b"\n[1, 2]\n{"name": "c"}\n', encoding="utf-8")
+
+    report = importer.import_habits("creds", "sheet", str(path), chunk_size=1)
+
+    assert [chunk[0][0] for chunk in service.appends] == ["a", "c"]
+    assert report["imported"] == 2
+    assert [line for line, _ in report["skipped"]] == [2, 3]
+    assert report["skipped"][0][1].startswith("invalid JSON")
@@ -0,0 +1,50 @@
+import json
+from package_lab13 import google_sheets, main
+from package_lab13.fake_sheets import FakeSheetsServer
+from package_lab13.metrics import ApiMetrics, api_metrics, percentile
+
+# Test: Nearest-rank percentiles
+def test_percentile():
+    values = sorted(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 90) == 0.0
+
+# Test: Every request made through the client layer is recorded with its range and response size
+def test_api_calls_are_recorded():
+    server = FakeSheetsServer()
+    spreadsheet_id = server.add_spreadsheet(rows=[["Drink water", "d1", "d2", "❌", ""]])
+    server.fail_next(1, status=503)
+
+    with server.install():
+        google_sheets.get_sheet_data("creds", spreadsheet_id)
+
+    # The 503 was retried, so one logical call with one retry is recorded
+    summary = api_metrics.summary()
+    assert summary["values.get"]["count"] == 1
+    assert summary["values.get"]["retries"] == 1
+    assert summary["values.get"]["errors"] == 0
+    assert summary["values.get"]["response_bytes"] == server.log[-1]["response_bytes"]
+    assert api_metrics.calls[-1]["range"] == "Habit Tracker!A2:F"
+
+# Test: Stats can be exported as JSON or Prometheus text
+def test_stats_export(tmp_path, capsys):
+    metrics = ApiMetrics()
+    for seconds in (0.01, 0.02, 0.03):
+        metrics.record("values.get", "Habit Tracker!A2:E", seconds, 100)
+
+    metrics.export(str(tmp_path / "stats.json"))
+    metrics.export(str(tmp_path / "stats.prom"))
+
+    exported = json.loads((tmp_path / "stats.json").read_text())
+    assert exported["summary"]["values.get"]["count"] == 3
+    assert len(exported["calls"]) == 3
+    prometheus = (tmp_path / "stats.prom").read_text()
+    assert 'habit_tracker_api_requests_total{operation="values.get"} 3' in prometheus
+    assert 'habit_tracker_api_request_seconds{operation="values.get",quantile="0.5"} 0.020000' in prometheus
+
+# Test: The menu's stats report lists each operation
+def test_show_stats(capsys):
+    api_metrics.record("values.batchUpdate", "Habit Tracker!D2:E2", 0.05, 200)
+    main.show_stats()
+    assert "values.batchUpdate" in capsys.readouterr().out
@@ -0,0 +1,106 @@
+import threading
+from datetime import datetime
+import pytz
+from package_lab13 import cli, multi_sheet, sheets_client
+from package_lab13.fake_sheets import FakeSheetsServer
+
+DUMMY_CREDS = "dummy_credentials"
+
+def habits():
+    today = datetime.now(pytz.timezone('US/Eastern')).strftime("%A, %B %d")
+    return [["Drink water", "Wednesday, April 23 at 02:37 PM", f"{today} at 08:00 PM", "❌", ""],
+            ["Stretch", "Wednesday, April 23 at 02:37 PM", "TBD at TBD", "✅", ""],
+            ["Read", "Wednesday, April 23 at 02:37 PM", "TBD at TBD", "❌", ""]]
+
+# Latency that records how many requests were in flight at once
+class ConcurrencyProbe:
+    def __init__(self, delay):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+    def __call__(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        threading.Timer(self.delay, self._done).start()
+        return self.delay
+    def _done(self):
+        with self.lock:
+            self.active -= 1
+
+# Test: A sweep reads every sheet concurrently, completes today's habits and keeps going past a failing sheet
+def test_sweep_many_sheets(monkeypatch):
+    probe = ConcurrencyProbe(0.05)
+    server = FakeSheetsServer(latency=probe)
+    sheets = [server.add_spreadsheet(rows=habits()) for _ in range(12)]
+
+    with server.install():
+        result = multi_sheet.sweep(DUMMY_CREDS, sheets + ["missing"], complete_today=True, workers=6)
+
+    assert list(result["sheets"]) == sheets + ["missing"]
+    assert result["sheets"]["missing"]["ok"] is False
+    report = result["sheets"][sheets[0]]["result"]
+    assert report == {"habits": 3, "complete": 1, "incomplete": 2, "due_today": 1, "due_today_open": 1, "completed_now": ["Drink water"]}
+    assert result["totals"]["sheets"] == 13 and result["totals"]["failed"] == 1
+    assert result["totals"]["habits"] == 36 and result["totals"]["completed_now"] == 12
+    assert all(server.rows(sid)[1][3] == "✅" for sid in sheets)
+
+    assert server.summary()["values.batchGet"]["requests"] == 12  # A, C:D and F only; plus one 404 for "missing"
+    assert server.summary()["values.batchUpdate"]["requests"] == 12
+    assert probe.peak > 1
+    assert not sheets_client.PER_THREAD_HTTP  # restored after the run
+
+# Test: The sweep subcommand takes IDs and URLs from the command line and a file
+def test_sweep_command(tmp_path, capsys):
+    server = FakeSheetsServer()
+    first, second = server.add_spreadsheet(rows=habits()), server.add_spreadsheet(rows=habits())
+    sheet_list = tmp_path / "sheets.txt"
+    sheet_list.write_text(f"# team trackers\nhttps://docs.google.com/spreadsheets/d/{second}/edit\n\n", encoding="utf-8")
+
+    with server.install():
+        code = cli.main(["sweep", first, "--sheets-file", str(sheet_list)], creds=DUMMY_CREDS)
+
+    out = capsys.readouterr().out
+    assert code == 0
+    assert f"{first}: 3 habits, 1 complete, 1/1 due today open" in out
+    assert "2 sheets (0 failed), 6 habits" in out
+
+# Test: With PER_THREAD_HTTP each thread gets its own authorized connection for the shared client
+def test_thread_http_is_per_thread(monkeypatch):
+    from google.oauth2.credentials import Credentials
+    monkeypatch.setattr(sheets_client, "PER_THREAD_HTTP", True)
+    service = sheets_client.get_service(Credentials(token="token"))
+    shared = service.spreadsheets().values().get(spreadsheetId="x", range="A1").http
+
+    mine = sheets_client._thread_http(shared)
+    assert mine is not shared and mine.credentials is shared.credentials
+    assert sheets_client._thread_http(shared) is mine
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(sheets_client._thread_http(shared)))
+    thread.start()
+    thread.join()
+    assert other[0] is not mine
+
+# Test: Overlapping sweeps turn PER_THREAD_HTTP back to its original value when the last one ends, whichever started first
+def test_overlapping_runs_restore_per_thread_http(monkeypatch):
+    monkeypatch.setattr(sheets_client, "PER_THREAD_HTTP", False)
+    started, release = [threading.Event(), threading.Event()], [threading.Event(), threading.Event()]
+
+    def sweep(n):
+        def operation(creds, sid):
+            started[n].set()
+            release[n].wait(5)
+        return threading.Thread(target=multi_sheet.run_across, args=(DUMMY_CREDS, [f"sheet-{n}"], operation))
+    sweeps = [sweep(0), sweep(1)]
+    for n in (0, 1):
+        sweeps[n].start()
+        started[n].wait(5)
+
+    release[0].set()
+    sweeps[0].join()
+    assert sheets_client.PER_THREAD_HTTP is True  # the second sweep is still running
+    release[1].set()
+    sweeps[1].join()
+    assert sheets_client.PER_THREAD_HTTP is False
@@ -0,0 +1,165 @@
+import pytest
+from package_lab13 import google_sheets, offline
+from package_lab13.fake_sheets import FakeSheetsServer
+from package_lab13.history import history_log
+from package_lab13.offline import OfflineTracker
+
+DUMMY_CREDS = "dummy_credentials"
+
+def habit(name, status="❌", habit_id=None):
+    return [name, "Wednesday, April 23 at 02:37 PM", "TBD at TBD", status, "", habit_id or f"id-{name.lower()}"]
+
+# Fixture: a synced tracker (in-memory database) over a fake sheet with three habits
+@pytest.fixture
+def synced():
+    server = FakeSheetsServer()
+    spreadsheet_id = server.add_spreadsheet(rows=[habit("Read"), habit("Run"), habit("Swim")])
+    with server.install(), OfflineTracker(DUMMY_CREDS, spreadsheet_id, path=":memory:") as tracker:
+        tracker.sync()
+        google_sheets.get_sheet_id(DUMMY_CREDS, spreadsheet_id)  # looked up once per session
+        server.reset_log()
+        yield server, spreadsheet_id, tracker
+
+def data_rows(server, sid):
+    return server.rows(sid)[1:]
+
+# Test: Local actions need no requests; one sync sends them all in a single batchUpdate
+def test_local_actions_then_one_batched_sync(synced):
+    server, sid, tracker = synced
+
+    tracker.add("Stretch")
+    tracker.complete([1, 2])
+    tracker.update(3, name="Swim laps")
+    tracker.delete([2])
+    assert server.log == []
+    assert [row[0] for row in tracker.list()] == ["Read", "Swim laps", "Stretch"]
+    assert tracker.pending() == 5
+
+    report = tracker.sync()
+
+    assert report["applied"] == 5 and report["conflicts"] == []
+    assert [entry["op"] for entry in server.log] == ["values.get", "spreadsheets.batchUpdate"]
+    rows = data_rows(server, sid)
+    assert [row[0] for row in rows] == ["Read", "Swim laps", "Stretch"]
+    assert rows[0][3] == "✅" and rows[0][4]  # completed and stamped
+    assert rows[2][5] == tracker.list()[2][5]  # the new habit keeps its ID
+    assert tracker.pending() == 0 and tracker.list() == [google_sheets._trim_row(row) + [""] * (6 - len(row)) for row in rows]
+    assert [event[1:] for event in history_log.pending(sid)] == [["id-read", "Read", "✅"], ["id-run", "Run", "✅"]]  # sent in a later batch
+
+# Test: Changes made elsewhere win over conflicting local ones; edits to other fields merge
+def test_conflicts_are_reported_and_remote_wins(synced):
+    server, sid, tracker = synced
+    tracker.update(1, name="Read a book")           # conflicts with the rename below
+    tracker.complete([2])                           # merges with the remote target change
+    tracker.update(3, name="Swim far")              # the habit is deleted remotely
+    rows = server.rows(sid)
+    rows[1][0] = "Read the news"
+    rows[2][2] = "Friday, May 2 at 09:00 AM"
+    del rows[3]
+
+    report = tracker.sync()
+
+    assert report["applied"] == 1
+    assert [(c["habit"], c["reason"]) for c in report["conflicts"]] == [
+        ("Read a book", "changed in the sheet"), ("Swim far", "deleted in the sheet")]
+    rows = data_rows(server, sid)
+    assert [row[0] for row in rows] == ["Read the news", "Run"]
+    assert rows[1][2:4] == ["Friday, May 2 at 09:00 AM", "✅"]
+    assert [row[0] for row in tracker.list()] == ["Read the news", "Run"]
+
+# Test: A habit edited elsewhere is not deleted; one deleted elsewhere is simply gone
+def test_delete_conflicts(synced):
+    server, sid, tracker = synced
+    tracker.delete([1, 2])
+    server.rows(sid)[1][3] = "✅"  # Read was completed in the browser
+    del server.rows(sid)[2]        # Run was already deleted
+
+    report = tracker.sync()
+
+    assert [c["habit"] for c in report["conflicts"]] == ["Read"]
+    assert [row[0] for row in data_rows(server, sid)] == ["Read", "Swim"]
+
+# Test: Rows moved by other clients are still matched by ID, and deleted bottom-up
+def test_rows_matched_by_id(synced):
+    server, sid, tracker = synced
+    tracker.complete([3])
+    tracker.delete([1])
+    server.rows(sid).insert(1, habit("Walk"))  # everything shifts down one row
+
+    tracker.sync()
+
+    rows = data_rows(server, sid)
+    assert [(row[0], row[3]) for row in rows] == [("Walk", "❌"), ("Run", "❌"), ("Swim", "✅")]
+
+# Test: A failed sync keeps the journal, and a later one sends it
+def test_failed_sync_keeps_journal(synced, monkeypatch):
+    server, sid, tracker = synced
+    tracker.add("Stretch")
+
+    def offline_read(*args, **kwargs):
+        raise OSError("network is unreachable")
+    with monkeypatch.context() as patched:
+        patched.setattr(google_sheets, "get_sheet_data", offline_read)
+        assert offline.try_sync(tracker) is False
+    assert tracker.pending() == 1
+
+    assert offline.try_sync(tracker) is True
+    assert data_rows(server, sid)[-1][0] == "Stretch" and tracker.pending() == 0
+
+# Test: A sync whose reply is lost is not resent, and the next sync does not apply it twice
+def test_sync_with_lost_reply_not_applied_twice(synced, monkeypatch):
+    server, sid, tracker = synced
+    tracker.add("Stretch")
+    tracker.complete([1])
+    tracker.delete([2])
+
+    data = google_sheets.get_sheet_data(DUMMY_CREDS, sid)
+    server.reset_log()
+    server.drop_reply_next()
+    with monkeypatch.context() as patched:
+        patched.setattr(google_sheets, "get_sheet_data", lambda *args, **kwargs: data)
+        with pytest.raises(TimeoutError):
+            tracker.sync()
+    assert [entry["op"] for entry in server.log] == ["spreadsheets.batchUpdate"]
+    assert tracker.pending() == 3
+
+    report = tracker.sync()
+    assert report["conflicts"] == [] and tracker.pending() == 0
+    assert [row[0] for row in data_rows(server, sid)] == ["Read", "Swim", "Stretch"]
+    assert data_rows(server, sid)[0][3] == "✅"
+
+# Test: Rows without an ID (added in the browser) get one on the first sync
+def test_rows_without_ids_get_ids():
+    server = FakeSheetsServer()
+    sid = server.add_spreadsheet(rows=[habit("Read")[:5], habit("Run")])
+    with server.install(), OfflineTracker(DUMMY_CREDS, sid, path=":memory:") as tracker:
+        tracker.sync()
+        assert len(server.rows(sid)[1][5]) == 12
+        assert [row[5] for row in tracker.list()] == [server.rows(sid)[1][5], "id-run"]
+
+# Test: The replica and journal survive a restart
+def test_journal_persists(tmp_path):
+    server = FakeSheetsServer()
+    sid = server.add_spreadsheet(rows=[habit("Read")])
+    path = str(tmp_path / "tracker.db")
+    with server.install():
+        with OfflineTracker(DUMMY_CREDS, sid, path=path) as tracker:
+            tracker.sync()
+            tracker.add("Stretch")
+        with OfflineTracker(DUMMY_CREDS, sid, path=path) as tracker:
+            assert tracker.has_replica() and tracker.pending() == 1
+            assert [row[0] for row in tracker.list()] == ["Read", "Stretch"]
+            tracker.sync()
+    assert [row[0] for row in data_rows(server, sid)] == ["Read", "Stretch"]
+
+# Test: The offline menu works locally and syncs on exit
+def test_offline_menu(synced, monkeypatch, capsys):
+    server, sid, tracker = synced
+    answers = iter(["2", "1-2", "5", "8"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+    offline.menu(tracker)
+
+    output = capsys.readouterr().out
+    assert "Habit 'Run' marked as complete" in output and "Synced 2 change(s)" in output
+    assert [row[3] for row in data_rows(server, sid)] == ["✅", "✅", "❌"]
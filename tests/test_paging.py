@@ -0,0 +1,52 @@
+import builtins
+from itertools import islice
+import pytest
+from package_lab13 import google_sheets
+from package_lab13.fake_sheets import FakeSheetsServer
+
+DUMMY_CREDS = "dummy_credentials"
+
+def habits(count):
+    return [[f"Habit {i}", "d1", "TBD at TBD", "❌", "", f"id-{i}"] for i in range(1, count + 1)]
+
+# Test: The stream fetches one window per request, and only as far as it is read
+def test_iter_habit_rows_is_lazy():
+    server = FakeSheetsServer()
+    sid = server.add_spreadsheet(rows=habits(100_000))
+    with server.install():
+        first = list(islice(google_sheets.iter_habit_rows(DUMMY_CREDS, sid, window=50), 5))
+        assert [row[0] for row in first] == [f"Habit {i}" for i in range(1, 6)]
+        assert len(server.log) == 1 and server.log[0]["uri"].endswith("A2%3AF51?alt=json")
+
+    small = FakeSheetsServer()
+    sid = small.add_spreadsheet(rows=habits(1000))
+    with small.install():
+        assert sum(1 for _ in google_sheets.iter_habit_rows(DUMMY_CREDS, sid, window=300)) == 1000
+    assert len(small.log) == 4
+
+# Test: show_habits pages through a long list with next / prev / jump and only reads the page shown
+def test_show_habits_pages(monkeypatch, capsys):
+    server = FakeSheetsServer()
+    sid = server.add_spreadsheet(rows=habits(45))
+    inputs = iter(["n", "n", "n", "p", "j1", "j9", "q"])
+    monkeypatch.setattr(builtins, "input", lambda _: next(inputs))
+
+    with server.install():
+        google_sheets.show_habits(DUMMY_CREDS, sid, page_size=20)
+
+    out = capsys.readouterr().out
+    assert "Habit List (page 1):" in out and "  20. Habit 20 | d1" in out
+    assert "  41. Habit 41" in out and "Habit List (page 3):" in out
+    assert "No such page." in out and "There is no page 9." in out
+    assert "Habit 1 |" not in out.split("Habit List (page 2):")[1].split("Habit List")[0]  # pages don't overlap
+    assert "id-" not in out
+    assert len(server.log) == 6  # pages 1, 2, 3, 2, 1 and the empty page 9
+
+# Test: A list that fits on one page is printed without prompting
+def test_show_habits_single_page(monkeypatch, capsys):
+    server = FakeSheetsServer()
+    sid = server.add_spreadsheet(rows=habits(3))
+    monkeypatch.setattr(builtins, "input", lambda _: pytest.fail("a single page needs no prompt"))
+    with server.install():
+        google_sheets.show_habits(DUMMY_CREDS, sid)
+    assert "Habit List:" in capsys.readouterr().out
@@ -0,0 +1,59 @@
+import builtins
+from urllib.parse import parse_qs, urlsplit
+import pytest
+from package_lab13 import google_sheets
+from package_lab13.google_sheets import ID_COLUMN, STATUS_COLUMN, TASK_COLUMN
+from package_lab13.row_cache import habit_index
+
+DUMMY_CREDS = "dummy_credentials"
+NOTE = "Wednesday, April 23 at 02:37 PM " * 8  # long Date Created / Updated cells make the sheet wide
+
+# Fixture: 200 wide habits with IDs
+@pytest.fixture
+def sheet_rows():
+    return [[f"Habit {i}", NOTE, "TBD at TBD", "✅" if i % 2 else "❌", NOTE, f"id-{i}"] for i in range(200)]
+
+def ranges_of(entry):
+    query = parse_qs(urlsplit(entry["uri"]).query)
+    return query.get("ranges") or [urlsplit(entry["uri"]).path.split("/values/")[1]]
+
+# Test: Separate columns come back from one batchGet, shaped like full rows, at a fraction of the payload
+def test_projected_read_uses_batch_get(fake_sheet):
+    server, sid = fake_sheet
+    rows = google_sheets.get_sheet_data(DUMMY_CREDS, sid, columns=(TASK_COLUMN, STATUS_COLUMN))
+
+    assert [entry["op"] for entry in server.log] == ["values.batchGet"]
+    assert ranges_of(server.log[0]) == ["Habit Tracker!A2:A", "Habit Tracker!D2:D"]
+    assert len(rows) == 200 and rows[1] == ["Habit 1", "", "", "✅"]
+    projected_bytes = server.log[0]["response_bytes"]
+
+    google_sheets.get_sheet_data(DUMMY_CREDS, sid, columns=(STATUS_COLUMN,))  # a subset is served from the cache
+    assert len(server.log) == 1
+    google_sheets.get_sheet_data(DUMMY_CREDS, sid)  # every column is not
+    assert server.log[-1]["response_bytes"] > 5 * projected_bytes
+
+# Test: A row window reads just those rows and records their IDs without replacing the index
+def test_row_window(fake_sheet):
+    server, sid = fake_sheet
+    habit_index.add(sid, 0, ["id-0"])
+    rows = google_sheets.get_sheet_data(DUMMY_CREDS, sid, columns=(TASK_COLUMN, ID_COLUMN), start=10, count=3)
+
+    assert [row[TASK_COLUMN] for row in rows] == ["Habit 10", "Habit 11", "Habit 12"]
+    assert ranges_of(server.log[0]) == ["Habit Tracker!A12:A14", "Habit Tracker!F12:F14"]
+    assert habit_index.get(sid, "id-11") == 11 and habit_index.get(sid, "id-0") == 0
+    assert google_sheets.get_sheet_data(DUMMY_CREDS, sid, start=5, count=0) == []
+
+    google_sheets.get_sheet_data(DUMMY_CREDS, sid, columns=(TASK_COLUMN, ID_COLUMN), start=10, count=3)
+    assert len(server.log) == 2  # windows are not cached
+
+# Test: Marking a habit complete from the menu reads only the name, status and ID columns
+def test_mark_habit_complete_reads_only_what_it_uses(fake_sheet, monkeypatch):
+    server, sid = fake_sheet
+    monkeypatch.setattr(builtins, "input", lambda _: "3")
+
+    google_sheets.mark_habit_complete(DUMMY_CREDS, sid)
+
+    read = server.log[0]
+    assert read["op"] == "values.batchGet"
+    assert ranges_of(read) == ["Habit Tracker!A2:A", "Habit Tracker!D2:D", "Habit Tracker!F2:F"]
+    assert server.rows(sid)[3][STATUS_COLUMN] == "✅"
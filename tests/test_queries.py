@@ -0,0 +1,74 @@
+import json
+import pytest
+from datetime import datetime
+from package_lab13 import cli, queries, records
+from package_lab13.row_cache import habit_index
+
+DUMMY_CREDS = "dummy_credentials"
+
+def habits(count, open_every=1000):
+    return [[f"Habit {i}", "Wednesday, April 23 at 02:37 PM", "TBD at TBD", "❌" if i % open_every == 0 else "✅",
+             f"4/{1 + i % 28}/2025 at 2:37 PM", f"id-{i}"] for i in range(count)]
+
+# Fixture: 50k habits of which 50 are still open
+@pytest.fixture
+def sheet_rows():
+    return habits(50_000)
+
+# Test: Open habits are filtered by the sheet, so only they are transferred
+def test_incomplete_filtered_server_side(fake_sheet):
+    server, sid = fake_sheet
+    first = queries.find_incomplete_habits(DUMMY_CREDS, sid)  # adds the query tab
+    assert [entry["op"] for entry in server.log] == ["spreadsheets.get", "spreadsheets.batchUpdate", "values.batchUpdate", "values.get"]
+    server.reset_log()
+
+    matches = queries.find_incomplete_habits(DUMMY_CREDS, sid)
+
+    assert matches == first and len(matches) == 50
+    index, row = matches[1]
+    assert index == 1000 and server.rows(sid)[index + 1] == row
+    assert [entry["op"] for entry in server.log] == ["values.get"]
+    assert server.log[0]["response_bytes"] < 10_000
+    assert habit_index.get(sid, "id-49000") == 49000
+
+# Test: Name searches are case-insensitive and literal, and read only the Task column and the matching rows
+def test_name_search(fake_sheet):
+    server, sid = fake_sheet
+    matches = queries.find_habits_named(DUMMY_CREDS, sid, "habit 4999")
+    assert [row[0] for _, row in matches] == ["Habit 4999"] + [f"Habit 4999{i}" for i in range(10)]
+    assert all(server.rows(sid)[index + 1] == row for index, row in matches)
+    assert [entry["op"] for entry in server.log] == ["values.get", "values.batchGet"]  # nothing is written
+    assert queries.QUERY_SHEET not in server.spreadsheets[sid]["sheets"]
+
+    server.reset_log()
+    assert queries.find_habits_named(DUMMY_CREDS, sid, "Habit 1*") == []
+    assert server.log == []  # the names are cached
+    assert len(queries.find_habits(DUMMY_CREDS, sid, incomplete=True, name_contains="habit 4")) == 11  # Habit 4000 and Habit 40000 to 49000
+
+# Test: When the query tab gives no usable answer the filter runs locally
+def test_falls_back_to_local_scan(fake_sheet):
+    server, sid = fake_sheet
+    queries.ensure_query_sheet(DUMMY_CREDS, sid)
+    server.rows(sid, queries.QUERY_SHEET)[0][0] = "=SORT(A1)"
+    server.spreadsheets[sid]["sheets"][queries.QUERY_SHEET]["formulas"][(0, 0)] = "=SORT(A1)"  # an edit the fake can't evaluate
+    server.reset_log()
+
+    assert len(queries.find_incomplete_habits(DUMMY_CREDS, sid)) == 50
+    assert [entry["op"] for entry in server.log] == ["values.get", "values.get"]  # the query tab, then the full sheet
+
+    # With the rows cached, nothing is requested at all
+    server.reset_log()
+    since = datetime(2025, 4, 25)
+    matches = queries.find_habits(DUMMY_CREDS, sid, incomplete=True, updated_since=since)
+    assert matches and all(records.parse_updated(row[4]) >= since and row[3] == "❌" for _, row in matches)
+    assert server.log == []
+
+# Test: list takes the filters and reports each habit's number
+@pytest.mark.parametrize("sheet_rows", [habits(30, open_every=10)])
+def test_list_filters(fake_sheet, capsys):
+    _, sid = fake_sheet
+    assert cli.main(["--sheet", sid, "--json", "list", "--incomplete"], creds=DUMMY_CREDS) == 0
+    assert [(h["number"], h["task"]) for h in json.loads(capsys.readouterr().out)["habits"]] == [(1, "Habit 0"), (11, "Habit 10"), (21, "Habit 20")]
+    assert cli.main(["--sheet", sid, "list", "--updated-since", "2025-04-30"], creds=DUMMY_CREDS) == 0
+    assert "No habits found." in capsys.readouterr().out
+    assert cli.main(["--sheet", sid, "list", "--updated-since", "April"], creds=DUMMY_CREDS) == 1
@@ -0,0 +1,70 @@
+import pytest
+from googleapiclient.errors import HttpError
+from package_lab13 import google_sheets, sheets_client
+from package_lab13.fake_sheets import FakeSheetsServer
+from package_lab13.ratelimit import TokenBucket, bucket_for, configure_rate_limits
+
+# Fake clock so bucket waits are instant and observable
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+    def sleep(self, seconds):
+        self.now += seconds
+
+# Test: A full bucket allows a burst, then paces requests at the refill rate
+def test_token_bucket_paces_after_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(60, capacity=3, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(5)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == pytest.approx(1.0) and waits[4] == pytest.approx(1.0)
+    assert clock.now == pytest.approx(2.0)
+
+# Test: Reads and writes draw from separate buckets
+def test_bucket_for_operation():
+    configure_rate_limits(reads_per_minute=60, writes_per_minute=None)
+    assert bucket_for("values.get") is not None
+    assert bucket_for("values.batchUpdate") is None
+
+# Test: An append that fails with 503 is not retried (it may already have been applied)
+def test_append_not_retried_on_server_error(monkeypatch):
+    server = FakeSheetsServer()
+    spreadsheet_id = server.add_spreadsheet()
+    server.fail_next(1, status=503)
+    monkeypatch.setattr("builtins.input", lambda _: "")
+
+    with server.install(), pytest.raises(HttpError):
+        google_sheets.add_habit("creds", spreadsheet_id, "Stretch")
+    assert len(server.log) == 1
+
+# Test: A row delete the server applied but whose reply was lost is not sent again (it would delete the next row)
+def test_delete_not_retried_after_lost_reply():
+    server = FakeSheetsServer()
+    spreadsheet_id = server.add_spreadsheet(rows=[["h0", "", "", "❌", ""], ["h1", "", "", "❌", ""], ["h2", "", "", "❌", ""]])
+    with server.install():
+        google_sheets.get_sheet_id("creds", spreadsheet_id)
+        data = google_sheets.get_sheet_data("creds", spreadsheet_id)  # rows without IDs: only the delete itself is sent
+        server.drop_reply_next()
+        with pytest.raises(TimeoutError):
+            google_sheets.delete_habits("creds", spreadsheet_id, [2], data=data)
+    assert [row[0] for row in server.rows(spreadsheet_id)[1:]] == ["h0", "h2"]
+
+# Test: 5xx errors on other writes are retried with growing, jittered delays
+def test_backoff_retries_server_errors(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(sheets_client, "_sleep", sleeps.append)
+    monkeypatch.setattr(sheets_client, "_random", lambda: 1.0)
+    server = FakeSheetsServer()
+    spreadsheet_id = server.add_spreadsheet(rows=[["Drink water", "d1", "d2", "❌", ""]])
+    server.fail_next(3, status=503)
+
+    with server.install():
+        completed, _ = google_sheets.mark_habits_complete("creds", spreadsheet_id, [1])
+
+    assert completed == ["Drink water"]
+    assert sleeps == [1.0, 2.0, 4.0]
+    assert server.rows(spreadsheet_id)[1][3] == "✅"
@@ -0,0 +1,87 @@
+import json
+import sys
+from datetime import date, datetime
+from package_lab13 import records
+from package_lab13.records import Habit, HabitColumns, Status
+
+REFERENCE = date(2025, 5, 1)
+
+ROWS = [
+    ["Read", "Wednesday, April 23 at 02:37 PM", "Thursday, May 01 at 02:30 PM", "✅", "4/21/2025 at 8:29 PM", "0123456789ab"],
+    ["Run", "Unknown", "Friday, May 02 at TBD"],
+    ["Swim", "Wednesday, April 23 at 02:37 PM", "TBD at TBD", "❌", "", "00000000000f"],
+]
+
+# Test: Rows decode into typed records, with short rows padded and unreadable cells as None
+def test_decode_rows():
+    read, run, swim = records.decode_rows(ROWS, REFERENCE)
+    assert read == Habit("Read", datetime(2025, 4, 23, 14, 37), datetime(2025, 5, 1, 14, 30), Status.COMPLETE,
+                         datetime(2025, 4, 21, 20, 29), "0123456789ab")
+    assert run.created is None and run.target == date(2025, 5, 2) and run.status is Status.INCOMPLETE and run.habit_id == ""
+    assert swim.target is None and swim.updated is None and not swim.complete
+    assert read.is_due(date(2025, 5, 1)) and run.is_due(date(2025, 5, 2)) and not swim.is_due(REFERENCE)
+    assert not hasattr(read, "__dict__")  # __slots__ record
+
+# Test: The missing year is the nearest one where the day falls on the stored weekday
+def test_year_inference():
+    assert records.parse_display_date("Thursday, April 23", REFERENCE) == date(2026, 4, 23)
+    assert records.parse_display_date("Tuesday, April 23", REFERENCE) == date(2024, 4, 23)
+    assert records.parse_display_date("Thursday, February 29", REFERENCE) == date(2024, 2, 29)
+    assert records.parse_display_date("TBD", REFERENCE) is None
+    assert records.parse_display_date("Someday, May 01", REFERENCE) is None
+
+# Test: Each distinct cell value is parsed once per decode
+def test_distinct_values_parsed_once(monkeypatch):
+    calls = []
+    parse_target = records.parse_target
+    monkeypatch.setattr(records, "parse_target", lambda text, reference=None: calls.append(text) or parse_target(text, reference))
+    records.decode_rows([["Habit", "", "Thursday, May 01 at 02:30 PM"]] * 1000 + [["Other", "", "TBD at TBD"]], REFERENCE)
+    assert sorted(calls) == ["", "TBD at TBD", "Thursday, May 01 at 02:30 PM"]  # "" is the blank Date Created column
+
+# Test: The column container gives back the same records as decode_rows
+def test_columns_match_records():
+    columns = HabitColumns.from_rows(ROWS, REFERENCE)
+    assert len(columns) == 3 and list(columns) == records.decode_rows(ROWS, REFERENCE)
+    assert columns[-1].name == "Swim" and columns.habit_id(1) == ""
+    assert columns.count_complete() == 1
+    assert columns.due_on(date(2025, 5, 2)) == [1] and columns.due_on(date(2025, 5, 1)) == [0]
+
+# Test: 100k habits take far less memory as columns than as nested lists of strings
+def test_columns_are_compact():
+    rows = json.loads(json.dumps([[f"Habit {i}", "Wednesday, April 23 at 02:37 PM", "Thursday, May 01 at 02:30 PM",
+                                   "✅" if i % 3 else "❌", "4/21/2025 at 8:29 PM", f"{i:012x}"] for i in range(100_000)]))
+    row_bytes = sys.getsizeof(rows) + sum(sys.getsizeof(row) + sum(sys.getsizeof(cell) for cell in row) for row in rows)
+
+    columns = HabitColumns.from_rows(rows, REFERENCE)
+
+    assert columns.memory_bytes() * 10 < row_bytes
+    assert columns[99_999].name == "Habit 99999" and columns[99_999].habit_id == f"{99_999:012x}"
+
+# Test: ISO cells parse directly and are rendered readably; older display text still parses
+def test_iso_dates_and_display():
+    assert records.parse_target("2025-05-01T14:30") == datetime(2025, 5, 1, 14, 30)
+    assert records.parse_target("2025-05-01") == date(2025, 5, 1)
+    assert records.parse_target("T14:30") is None and records.parse_target("") is None
+    assert records.parse_updated("2025-04-21T20:29") == records.parse_updated("4/21/2025 at 8:29 PM")
+    assert records.display_row(["Read", "2025-04-23T14:37", "T14:30", "❌", "", "id"]) == [
+        "Read", "Wednesday, April 23, 2025 at 02:37 PM", "TBD at 02:30 PM", "❌", ""]
+    assert records.display_target("2025-05-01") == "Thursday, May 01, 2025" and records.display_target("") == "TBD"
+    assert records.display_target("Thursday, May 01 at 02:30 PM") == "Thursday, May 01 at 02:30 PM"
+
+# Test: migrate_dates rewrites old display-format cells as ISO in one batchUpdate and leaves the rest alone
+def test_migrate_dates():
+    from package_lab13 import google_sheets
+    from package_lab13.fake_sheets import FakeSheetsServer
+    server = FakeSheetsServer()
+    spreadsheet_id = server.add_spreadsheet(rows=ROWS + [["New", "2025-04-23T14:37", "T07:00", "❌", "", "id-new"]])
+    with server.install():
+        assert google_sheets.migrate_dates("creds", spreadsheet_id) == 3
+        assert [entry["op"] for entry in server.log] == ["values.batchGet", "values.batchUpdate"]
+        assert google_sheets.migrate_dates("creds", spreadsheet_id) == 0
+
+    rows = [row[1:5] for row in server.rows(spreadsheet_id)[1:]]
+    year = records.parse_display_date("Wednesday, April 23").year
+    assert rows[0] == [f"{year}-04-23T14:37", f"{records.parse_display_date('Thursday, May 01').year}-05-01T14:30", "✅",
+                       "2025-04-21T20:29"]
+    assert rows[1][:2] == ["Unknown", f"{records.parse_display_date('Friday, May 02').year}-05-02"]
+    assert rows[2][1] == "" and rows[3] == ["2025-04-23T14:37", "T07:00", "❌", ""]
@@ -0,0 +1,91 @@
+import json
+import pytest
+from package_lab13 import cli, google_sheets
+from package_lab13.row_cache import habit_index
+
+DUMMY_CREDS = "dummy_credentials"
+CREATED = "Wednesday, April 23 at 02:37 PM"
+HABITS = [["Drink water", CREATED, "TBD at TBD", "❌", "", "id-water"],
+          ["Stretch", CREATED, "TBD at TBD", "❌", "", "id-stretch"],
+          ["Read", CREATED, "TBD at TBD", "❌", "", "id-read"]]
+
+# Fixture: the sheet's habits already have IDs
+@pytest.fixture
+def sheet_rows():
+    return HABITS
+
+def ops(server):
+    return [entry["op"] for entry in server.log]
+
+# Test: A habit whose row moved since the list was read is still the one written
+def test_write_follows_moved_row(fake_sheet):
+    server, sid = fake_sheet
+    data = google_sheets.get_sheet_data(DUMMY_CREDS, sid)
+    del server.rows(sid)[1]  # someone else deletes "Drink water" in the browser
+    server.reset_log()
+
+    completed, _ = google_sheets.mark_habits_complete(DUMMY_CREDS, sid, [3], data=data)
+
+    assert completed == ["Read"]
+    assert server.rows(sid)[2][:4] == ["Read", CREATED, "TBD at TBD", "✅"]
+    assert server.rows(sid)[1][3] == "❌"  # "Stretch", now at the old position of "Read", is untouched
+    assert ops(server) == ["values.batchGet", "values.get", "values.batchUpdate"]
+
+# Test: When nothing moved, a write costs one single-row check instead of a full read
+def test_verified_write_skips_full_read(fake_sheet):
+    server, sid = fake_sheet
+    google_sheets.get_sheet_data(DUMMY_CREDS, sid)
+    server.reset_log()
+
+    google_sheets.update_habit(DUMMY_CREDS, sid, None, name="Read a chapter", habit_id="id-read")
+
+    assert ops(server) == ["values.batchGet", "values.batchUpdate"]
+    assert server.log[0]["uri"].count("ranges=") == 1
+    assert server.rows(sid)[3][0] == "Read a chapter" and server.rows(sid)[3][5] == "id-read"
+
+# Test: Deleting by ID shifts the index, so later rows are found without a re-read
+def test_delete_by_id_keeps_index_current(fake_sheet):
+    server, sid = fake_sheet
+    google_sheets.get_sheet_data(DUMMY_CREDS, sid)
+
+    assert google_sheets.delete_habits(DUMMY_CREDS, sid, None, habit_ids=["id-water"]) == ["Drink water"]
+    assert habit_index.get(sid, "id-read") == 1
+    server.reset_log()
+
+    google_sheets.mark_habits_complete(DUMMY_CREDS, sid, habit_ids=["id-read"])
+    assert ops(server) == ["values.batchGet", "values.batchUpdate"]
+    assert server.rows(sid)[2][3] == "✅"
+
+# Test: Unknown IDs are an error, not a write to some other row
+def test_unknown_id_raises(fake_sheet):
+    server, sid = fake_sheet
+    with pytest.raises(ValueError, match="id-missing"):
+        google_sheets.mark_habits_complete(DUMMY_CREDS, sid, habit_ids=["id-missing"])
+    assert "values.batchUpdate" not in ops(server)
+
+# Test: Rows from before IDs existed get one on their first write, and new habits get one when added
+@pytest.mark.parametrize("sheet_rows", [[row[:5] for row in HABITS]])
+def test_ids_assigned_to_old_and_new_rows(fake_sheet):
+    server, sid = fake_sheet
+    data = google_sheets.get_sheet_data(DUMMY_CREDS, sid)
+    google_sheets.mark_habits_complete(DUMMY_CREDS, sid, [2], data=data)
+    new_row = google_sheets.append_habit(DUMMY_CREDS, sid, "Walk")
+
+    stretch_id = server.rows(sid)[2][5]
+    assert len(stretch_id) == 12 and habit_index.get(sid, stretch_id) == 1
+    assert server.rows(sid)[4][5] == new_row[5] and habit_index.get(sid, new_row[5]) == 3
+
+# Test: list --json shows the IDs and complete/edit/delete accept --id
+def test_cli_id_options(fake_sheet, capsys):
+    server, sid = fake_sheet
+    assert cli.main(["--sheet", sid, "--json", "list"], creds=DUMMY_CREDS) == 0
+    assert [h["id"] for h in json.loads(capsys.readouterr().out)["habits"]] == ["id-water", "id-stretch", "id-read"]
+
+    assert cli.main(["--sheet", sid, "complete", "--id", "id-read", "--id", "id-water"], creds=DUMMY_CREDS) == 0
+    assert cli.main(["--sheet", sid, "edit", "--id", "id-stretch", "--time", "07:00"], creds=DUMMY_CREDS) == 0
+    capsys.readouterr()
+    assert cli.main(["--sheet", sid, "--json", "delete", "--id", "id-water"], creds=DUMMY_CREDS) == 0
+    assert json.loads(capsys.readouterr().out)["deleted"] == ["Drink water"]
+
+    assert [row[:4] for row in server.rows(sid)[1:]] == [["Stretch", CREATED, "T07:00", "❌"],
+                                                         ["Read", CREATED, "TBD at TBD", "✅"]]
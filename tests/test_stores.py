@@ -0,0 +1,95 @@
+import pytest
+from package_lab13 import main, stores
+from package_lab13.fake_sheets import FakeSheetsServer
+
+DUMMY_CREDS = "dummy_credentials"
+
+SEED = [
+    ["Read", "Wednesday, April 23 at 02:37 PM", "TBD at TBD", "❌", "", "id-read"],
+    ["Run", "Wednesday, April 23 at 02:37 PM", "TBD at TBD", "✅", "", "id-run"],
+    ["Swim", "Wednesday, April 23 at 02:37 PM", "TBD at TBD", "❌", "", "id-swim"],
+]
+
+# Fixture: every backend, seeded with the same three habits
+@pytest.fixture(params=stores.BACKENDS)
+def store(request):
+    if request.param == "sheets":
+        server = FakeSheetsServer()
+        spreadsheet_id = server.add_spreadsheet(rows=SEED)
+        with server.install():
+            yield stores.open_store("sheets", DUMMY_CREDS, spreadsheet_id)
+        return
+    with stores.open_store(request.param) as store:
+        store.append(SEED)
+        yield store
+
+def names(store):
+    return [row[0] for row in store.list()]
+
+# Test: Every backend gives the same results for the same operations
+def test_backends_agree(store):
+    row = store.add("Stretch", "2025-05-01", "14:30")
+    assert row[2] == "2025-05-01T14:30" and row[3] == "❌" and len(row[5]) == 12
+    assert names(store) == ["Read", "Run", "Swim", "Stretch"]
+
+    assert store.complete([1, 2]) == (["Read"], ["Run"])
+    edited = store.update(3, name="Swim laps")
+    assert edited[0] == "Swim laps" and edited[5] == "id-swim" and edited[4]
+
+    assert store.delete([2, 1]) == ["Read", "Run"]
+    rows = store.list()
+    assert [row[0] for row in rows] == ["Swim laps", "Stretch"]
+    assert rows[0][1] == SEED[2][1] and rows[0][3] == "❌"
+
+# Test: Unknown habit numbers are rejected without changing anything
+def test_unknown_numbers(store):
+    for operation in (lambda: store.complete([4]), lambda: store.delete([0]), lambda: store.update(9, name="x")):
+        with pytest.raises(ValueError):
+            operation()
+    assert names(store) == ["Read", "Run", "Swim"]
+
+# Test: The row primitives behave alike on every backend, so HabitStore's generic operations run on any of them
+def test_generic_operations_on_primitives(store):
+    stores.HabitStore.update(store, 1, status="✅")
+    assert stores.HabitStore.delete(store, [2]) == ["Run"]
+    assert [(row[0], row[3]) for row in store.list()] == [("Read", "✅"), ("Swim", "❌")]
+
+# Test: A backend missing a primitive fails when it is created, not halfway through an operation
+def test_incomplete_backend_is_rejected():
+    class ListOnly(stores.HabitStore):
+        def list(self):
+            return []
+    with pytest.raises(TypeError):
+        ListOnly()
+
+# Test: The SQLite backend keeps habits between runs
+def test_sqlite_persists(tmp_path):
+    path = str(tmp_path / "habits.db")
+    with stores.open_store("sqlite", path=path) as store:
+        store.append(SEED)
+        store.complete([3])
+    with stores.open_store("sqlite", path=path) as store:
+        assert [row[3] for row in store.list()] == ["❌", "✅", "✅"]
+
+# Test: The SQLite backend looks up any number of habits with one query
+def test_sqlite_get_is_one_query():
+    with stores.open_store("sqlite") as store:
+        store.append([row[:5] + [f"{row[5]}-{copy}"] for copy in range(50) for row in SEED])
+        statements = []
+        store.db.set_trace_callback(statements.append)
+        rows = store._get([150, 1, 2, 149])
+        assert [row[0] for row in rows] == ["Swim", "Read", "Run", "Run"]
+        assert len(statements) == 1
+
+# Test: main can run the menu on a local backend without signing in
+def test_main_with_memory_store(monkeypatch, capsys):
+    def no_sign_in():
+        raise AssertionError("local stores must not authenticate")
+    monkeypatch.setattr(main, "authenticate_user", no_sign_in)
+    answers = iter(["1", "Stretch", "", "", "5", "7"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+    main.main(["--store", "memory"])
+
+    output = capsys.readouterr().out
+    assert "Menu (memory)" in output and "1. Stretch | " in output and "Goodbye!" in output
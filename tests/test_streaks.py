@@ -0,0 +1,98 @@
+import random
+from datetime import date, datetime
+import pytest
+from package_lab13 import cli, google_sheets, history, streaks
+from package_lab13.fake_sheets import FakeSheetsServer
+from package_lab13.history import HISTORY_SHEET, history_log
+from package_lab13.streaks import StreakStats
+
+DUMMY_CREDS = "dummy_credentials"
+
+'''event builds a history row for habit_id done (or undone) on a day of May 2025.'''
+def event(day, habit_id="id-read", status="✅", hour=8):
+    return [datetime(2025, 5, day, hour).strftime("%Y-%m-%dT%H:%M"), habit_id, habit_id[3:].title(), status]
+
+# Fixture: runs a test once with the pure-Python rebuild and once with the NumPy one (skipped without NumPy)
+@pytest.fixture(params=[False, True], ids=["python", "numpy"])
+def use_numpy(request):
+    if request.param:
+        pytest.importorskip("numpy")
+    return request.param
+
+'''build_stats returns a StreakStats rebuilt from events on the given path.'''
+def build_stats(events, use_numpy):
+    stats = StreakStats()
+    stats.rebuild(events, use_numpy=use_numpy)
+    return stats
+
+# Test: Streaks, rates and weekly totals from a handful of events
+def test_streaks_and_rates(use_numpy):
+    stats = build_stats([event(1), event(2), event(2, hour=20), event(3, status="❌"), event(5), event(6), event(2, "id-run")], use_numpy)
+    read = stats.habit("id-read")
+    assert (read.completions, read.current, read.longest) == (5, 2, 2)
+    assert read.streak(date(2025, 5, 7)) == 2 and read.streak(date(2025, 5, 8)) == 0
+    assert read.rate(date(2025, 5, 10)) == 4 / 10 and read.rate(date(2025, 5, 10), window=5) == 1 / 5
+    assert stats.weekly_rollup() == [("2025-04-28", 4), ("2025-05-05", 2)]
+    assert stats.weekly_rollup("id-run") == [("2025-04-28", 1)]
+
+    stats.add([event(4)])  # arrives late: 4, 5 and 6 now form a run (the 3rd was only undone)
+    assert (read.current, read.longest) == (3, 3)
+    assert [row["task"] for row in stats.summary(date(2025, 5, 6))] == ["Read", "Run"]
+
+# Test: Adding events a few at a time, in any order, matches a full rebuild
+def test_incremental_matches_rebuild(use_numpy):
+    generator = random.Random(3)
+    events = [event(generator.randrange(1, 32), f"id-{generator.randrange(20)}", generator.choice("✅✅✅❌"))
+              for _ in range(3000)]
+    incremental = StreakStats()
+    for chunk in range(0, len(events), 7):
+        incremental.add(events[chunk:chunk + 7])
+
+    def figures(stats):
+        return {key: (list(h.days), h.completions, h.current, h.longest, dict(h.weeks)) for key, h in stats.habits.items()}
+
+    rebuilt = build_stats(events, use_numpy)
+    assert figures(incremental) == figures(rebuilt) and incremental.weekly == rebuilt.weekly
+
+# Test: Asking for the NumPy rebuild without NumPy installed is an error, and the default falls back to Python
+def test_numpy_missing(monkeypatch):
+    monkeypatch.setattr(streaks, "numpy", None)
+    with pytest.raises(RuntimeError):
+        StreakStats().rebuild([event(1)], use_numpy=True)
+    assert StreakStats([event(1)]).habit("id-read").completions == 1
+
+# Test: Completions are logged in batches to the history tab and feed the statistics
+def test_history_tab_and_engine():
+    server = FakeSheetsServer()
+    sid = server.add_spreadsheet(rows=[
+        ["Read", "2025-04-23T14:37", "", "❌", "", "id-read"],
+        ["Run", "2025-04-23T14:37", "", "❌", "", "id-run"],
+    ])
+    with server.install():
+        stats = streaks.engine_for(DUMMY_CREDS, sid)
+        google_sheets.mark_habits_complete(DUMMY_CREDS, sid, [1, 2])
+        google_sheets.update_habit(DUMMY_CREDS, sid, 2, status="❌")
+        assert stats.habit("id-read").completions == 1  # counted before anything was sent
+        assert HISTORY_SHEET not in server.spreadsheets[sid]["sheets"]
+
+        server.reset_log()
+        assert history_log.flush_all() == 3
+        assert [entry["op"] for entry in server.log] == ["spreadsheets.get", "spreadsheets.batchUpdate", "values.append"]  # look for the tab, add it, one append
+        assert server.rows(sid, HISTORY_SHEET)[0] == history.HEADER
+        assert [row[1:] for row in history.read_events(DUMMY_CREDS, sid)] == [
+            ["id-read", "Read", "✅"], ["id-run", "Run", "✅"], ["id-run", "Run", "❌"]]
+
+        assert cli.main(["--sheet", sid, "--json", "complete", "2"], creds=DUMMY_CREDS) == 0
+        assert len(history.read_events(DUMMY_CREDS, sid)) == 4  # sent when the command finished
+        assert stats.habit("id-run").completions == 2
+
+# Test: Editing a habit written before IDs existed logs its completion under the ID it is given
+def test_edit_logs_new_habit_id(monkeypatch):
+    server = FakeSheetsServer()
+    sid = server.add_spreadsheet(rows=[["Read", "2025-04-23T14:37", "", "❌", ""]])
+    inputs = iter(["1", "", "", "", "y"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    with server.install():
+        google_sheets.edit_habit(DUMMY_CREDS, sid)
+        habit_id = server.rows(sid)[1][5]
+        assert habit_id and [event[1:] for event in history_log.pending(sid)] == [[habit_id, "Read", "✅"]]
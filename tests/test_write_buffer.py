@@ -0,0 +1,50 @@
+from package_lab13.write_buffer import WriteBuffer
+
+# Test: Adjacent cells in a row merge into one range and later writes win
+def test_write_buffer_merges_adjacent_cells():
+    buffer = WriteBuffer()
+    buffer.set(2, 0, ["Drink water", "d1", "d2", "❌", ""])
+    buffer.set(2, 4, ["4/21/2025 at 8:29 PM"])
+
+    assert buffer.ranges() == [
+        {"range": "Habit Tracker!A2:E2", "values": [["Drink water", "d1", "d2", "❌", "4/21/2025 at 8:29 PM"]]}
+    ]
+
+# Test: Identical column spans on consecutive rows become one block, gaps stay separate
+def test_write_buffer_merges_consecutive_rows():
+    buffer = WriteBuffer()
+    for row in (2, 3, 4, 7):
+        buffer.set(row, 3, ["✅", f"ts{row}"])
+
+    assert buffer.ranges() == [
+        {"range": "Habit Tracker!D2:E4", "values": [["✅", "ts2"], ["✅", "ts3"], ["✅", "ts4"]]},
+        {"range": "Habit Tracker!D7:E7", "values": [["✅", "ts7"]]},
+    ]
+
+# Test: flush sends a single batchUpdate and empties the buffer
+def test_write_buffer_flush_single_request():
+    sent = []
+
+    class FakeValues:
+        def batchUpdate(self, spreadsheetId, body):
+            sent.append(body)
+            return self
+        def execute(self):
+            return {"totalUpdatedCells": 2}
+
+    class FakeSpreadsheets:
+        def values(self):
+            return FakeValues()
+
+    class FakeService:
+        def spreadsheets(self):
+            return FakeSpreadsheets()
+
+    buffer = WriteBuffer()
+    buffer.set(5, 3, ["✅"])
+    buffer.set(5, 4, ["now"])
+
+    assert buffer.flush(FakeService(), "sheet") == {"totalUpdatedCells": 2}
+    assert len(sent) == 1 and sent[0]["valueInputOption"] == "RAW"
+    assert len(buffer) == 0
+    assert buffer.flush(FakeService(), "sheet") is None